@@ -0,0 +1,233 @@
+"""
+Benchmarks das análises com históricos sintéticos de 3.5 mil a 1 milhão de concursos.
+
+Mede cada função pública de cycle_calculator, cycle_analysis,
+global_statistics, number_frequency, pip_config e game_suggestions, e os
+caminhos completos das requisições `/` (estrutura + todas as seções) e
+`/api/suggestions`, com o cache frio e com o cache quente. Os históricos
+são gerados por source/synthetic_history.py com semente fixa.
+
+Uma função que passa de --limite segundos em um tamanho não é executada
+nos tamanhos maiores (fica registrada como pulada). Os resultados vão para
+um JSON em benchmarks/results/ (não versionado: os tempos dependem da
+máquina); com --comparar, cada tempo é comparado com um resultado anterior
+(ex: de outro commit, medido na mesma máquina).
+
+Uso:
+    python benchmark.py
+    python benchmark.py --tamanhos 3500,50000 --repeticoes 5
+    python benchmark.py --filtro cycle_ --comparar benchmarks/results/<anterior>.json
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PADRAO = "3500,50000,500000,1000000"
+MODULOS = ["cycle_calculator", "cycle_analysis", "global_statistics",
+           "number_frequency", "pip_config", "game_suggestions"]
+DIRETORIO_RESULTADOS = os.path.join("benchmarks", "results")
+
+
+def public_functions():
+    """Funções públicas dos módulos medidos: lista de (nome, função)."""
+    funcoes = []
+    for nome_modulo in MODULOS:
+        modulo = importlib.import_module(f"source.{nome_modulo}")
+        for nome, funcao in inspect.getmembers(modulo, inspect.isfunction):
+            if funcao.__module__ == modulo.__name__ and not nome.startswith("_"):
+                funcoes.append((f"{nome_modulo}.{nome}", funcao))
+    return funcoes
+
+
+def measure(funcao, repeticoes, limite):
+    """
+    Executa `funcao` até `repeticoes` vezes e retorna o menor tempo.
+
+    Repetições param assim que o tempo acumulado passa do limite.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        random.seed(0)
+        np.random.seed(0)
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+        if sum(tempos) > limite:
+            break
+    return {'segundos': min(tempos), 'media': sum(tempos) / len(tempos), 'repeticoes': len(tempos)}
+
+
+def request_paths(df_processado, client, repeticoes, limite):
+    """Mede `/` (com todas as seções) e `/api/suggestions`, com cache frio e quente."""
+    import flask_app
+    import source.response_cache as rc
+    import source.snapshot as sn
+
+    def fresh_snapshot():
+        sn.use_snapshot(sn.build_snapshot(df_processado, sn.data_signature()))
+        rc.clear()
+
+    def pagina():
+        for url in ["/"] + [f"/sections/{nome}" for nome in flask_app.FRAGMENTOS]:
+            resposta = client.get(url)
+            if resposta.status_code != 200:
+                raise RuntimeError(f"{url} retornou {resposta.status_code}")
+
+    def sugestoes():
+        resposta = client.get("/api/suggestions")
+        if resposta.status_code != 200:
+            raise RuntimeError(f"/api/suggestions retornou {resposta.status_code}")
+
+    resultados = {}
+    inicio = time.perf_counter()
+    fresh_snapshot()
+    resultados['snapshot.build_snapshot'] = {'segundos': time.perf_counter() - inicio, 'media': None, 'repeticoes': 1}
+
+    for nome, caminho in (("/", pagina), ("/api/suggestions", sugestoes)):
+        fresh_snapshot()
+        inicio = time.perf_counter()
+        caminho()
+        resultados[f"request {nome} (frio)"] = {'segundos': time.perf_counter() - inicio, 'media': None, 'repeticoes': 1}
+        resultados[f"request {nome} (cache)"] = measure(caminho, repeticoes, limite)
+    return resultados
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(resultados, anterior):
+    """Imprime a razão entre os tempos atuais e os de um resultado anterior."""
+    print(f"\nComparação com {anterior['meta'].get('commit')} ({anterior['meta'].get('data')}):")
+    for nome, por_tamanho in resultados.items():
+        for tamanho, atual in por_tamanho.items():
+            antes = anterior['resultados'].get(nome, {}).get(tamanho)
+            if not antes or 'segundos' not in antes or 'segundos' not in atual:
+                continue
+            razao = atual['segundos'] / antes['segundos'] if antes['segundos'] else float('inf')
+            marca = "  <-- mais lento" if razao > 1.2 else ""
+            print(f"  {nome:<60} {tamanho:>8}  {antes['segundos']:10.4f}s -> {atual['segundos']:10.4f}s  x{razao:.2f}{marca}")
+
+
+def run(tamanhos, seed, repeticoes, limite, filtro=None):
+    # Nada de dados reais: arquivo inexistente e cache em diretório temporário
+    tmp = tempfile.mkdtemp(prefix="lotopy-bench-")
+    os.environ["LOTOPY_DATA_PATH"] = os.path.join(tmp, "inexistente.xlsx")
+    os.environ["LOTOPY_CACHE_DIR"] = os.path.join(tmp, "cache")
+
+    import flask_app
+    import source.cycle_calculator as cc
+    import source.pip_config as pip
+    import source.synthetic_history as sh
+
+    client = flask_app.app.test_client()
+    funcoes = [(nome, f) for nome, f in public_functions() if not filtro or filtro in nome]
+    resultados = {}
+    lentas = set()
+
+    for tamanho in tamanhos:
+        print(f"\n=== {tamanho} concursos ===")
+        df_bruto = sh.generate_history(tamanho, seed)
+        df = pip.calculate_pip_config(cc.calculate_cycle(df_bruto.copy()))
+
+        for nome, funcao in funcoes:
+            por_tamanho = resultados.setdefault(nome, {})
+            if nome in lentas:
+                por_tamanho[str(tamanho)] = {'pulado': f"passou de {limite}s em um tamanho menor"}
+                continue
+
+            # calculate_cycle e calculate_pip_config recebem o histórico sem as colunas calculadas
+            entrada = df_bruto if nome in ("cycle_calculator.calculate_cycle", "pip_config.calculate_pip_config") else df
+            try:
+                medida = measure(lambda: funcao(entrada.copy()), repeticoes, limite)
+            except Exception as e:
+                por_tamanho[str(tamanho)] = {'erro': str(e)}
+                print(f"  {nome:<60} ERRO: {e}")
+                continue
+            por_tamanho[str(tamanho)] = medida
+            print(f"  {nome:<60} {medida['segundos']:10.4f}s")
+            if medida['segundos'] > limite:
+                lentas.add(nome)
+
+        if filtro and not any(filtro in nome for nome in ("request", "snapshot")):
+            continue
+        if "request" in lentas:
+            for nome in ("snapshot.build_snapshot", "request / (frio)", "request / (cache)",
+                         "request /api/suggestions (frio)", "request /api/suggestions (cache)"):
+                resultados.setdefault(nome, {})[str(tamanho)] = {'pulado': f"passou de {limite}s em um tamanho menor"}
+            continue
+        for nome, medida in request_paths(df, client, repeticoes, limite).items():
+            resultados.setdefault(nome, {})[str(tamanho)] = medida
+            print(f"  {nome:<60} {medida['segundos']:10.4f}s")
+            if medida['segundos'] > limite:
+                lentas.add("request")
+
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks com históricos sintéticos")
+    parser.add_argument("--tamanhos", default=TAMANHOS_PADRAO, help="Tamanhos dos históricos (separados por vírgula)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do histórico sintético")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições por medida (vale o menor tempo)")
+    parser.add_argument("--limite", type=float, default=120.0,
+                        help="Segundos a partir dos quais a função não roda nos tamanhos maiores")
+    parser.add_argument("--filtro", default=None, help="Mede apenas as funções cujo nome contém o texto")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    parser.add_argument("--comparar", default=None, help="JSON de um resultado anterior para comparação")
+    args = parser.parse_args()
+
+    tamanhos = [int(t) for t in args.tamanhos.split(",") if t.strip()]
+    inicio = time.time()
+    resultados = run(tamanhos, args.seed, args.repeticoes, args.limite, args.filtro)
+
+    commit = git_commit()
+    saida = args.saida or os.path.join(
+        DIRETORIO_RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'sem-commit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'data': datetime.now().isoformat(timespec="seconds"),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'plataforma': platform.platform(),
+                'seed': args.seed,
+                'tamanhos': tamanhos,
+                'repeticoes': args.repeticoes,
+                'limite': args.limite,
+                'duracao_total': round(time.time() - inicio, 1)
+            },
+            'resultados': resultados
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            compare(resultados, json.load(f))
+
+
+if __name__ == "__main__":
+    # Adicionar diretório atual ao path para imports funcionarem
+    sys.path.append(os.getcwd())
+    main()
@@ -1,271 +1,345 @@
-from flask import Flask, render_template, redirect, url_for, flash, request
-import pandas as pd
-import source.db_update as dbu
-import source.adjust_table as at
-import source.cycle_calculator as cc
-import source.pip_config as pip
-import source.number_frequency as nf
-import source.game_suggestions as gs
-import source.geographic_analysis as ga
-
-import source.global_statistics as gstats
-import source.cycle_analysis as ca
+from flask import Flask, render_template, redirect, url_for, flash, request, jsonify, Response, session, send_file
+import json
+
+import source.ticket_evaluation as te
+import source.combination_index as ci
+import source.monte_carlo as mc
+import source.ticket_sampler as ts
+import source.cooccurrence as co
+import source.delay_analysis as da
+import source.repetition_analysis as ra
+import source.snapshot as sn
+import source.contest_history as ch
+import source.response_cache as rc
+import source.refresh_jobs as rj
+import source.metrics as mt
+import source.profiling as prof
+import source.static_build as sb
+import source.compact_format as cf
+import click
 import os
 import secrets
+import time
+from urllib.parse import urlencode
 
 app = Flask(__name__)
 # Use variável de ambiente para secret_key
 app.secret_key = os.environ.get("SECRET_KEY", secrets.token_hex(32))
 
+# Conferência em lote: acima deste número de jogos a resposta é enviada em NDJSON
+LIMITE_JOGOS_JSON = 1000
+MAX_JOGOS_LOTE = 100000
+
+# Simulação Monte Carlo: limite de sorteios simulados por requisição (roda no
+# próprio worker; o resultado fica em cache por (n, seed) e versão dos dados)
+MAX_SORTEIOS_SIMULACAO = 2_000_000
+
+# Geração aleatória com restrições: limite de jogos por requisição
+MAX_JOGOS_GERADOS = 1_000_000
+
 
 def load_data():
     """Carrega e processa os dados da Lotofácil."""
-    df = at.adjust_table()
-    df = cc.calculate_cycle(df)
-    df = pip.calculate_pip_config(df)
-    return df
+    return sn.load_data()
+
+
+@app.before_request
+def start_timing():
+    """Inicia a medição da requisição (etapas em Server-Timing)."""
+    request.inicio_requisicao = time.perf_counter()
+    mt.start_request()
+    sn.start_request()
+    if prof.enabled() and not request.path.startswith('/admin/'):
+        request.perfil = prof.start(request.args.get(prof.PARAMETRO) or request.headers.get(prof.CABECALHO))
+
+
+@app.after_request
+def add_server_timing(response):
+    """Envia os tempos das etapas (Server-Timing) e a versão dos dados servida (X-Data-Version)."""
+    inicio = getattr(request, 'inicio_requisicao', None)
+    if inicio is None:
+        return response
+
+    total = time.perf_counter() - inicio
+    endpoint = request.endpoint or 'desconhecido'
+    mt.observe('lotopy_request_duration_seconds', total, endpoint=endpoint)
+    mt.inc('lotopy_requests_total', endpoint=endpoint, status=response.status_code)
+    response.headers['Server-Timing'] = mt.server_timing(total)
+    versao = sn.served_version()
+    if versao is not None:
+        response.headers['X-Data-Version'] = versao
+
+    perfil = getattr(request, 'perfil', None)
+    if perfil is not None:
+        request.perfil = None
+        # O token não vai para o disco junto com o caminho
+        params = [(k, v) for k, v in request.args.items(multi=True) if k != prof.PARAMETRO]
+        caminho = request.path + ('?' + urlencode(params) if params else '')
+        perfil_id = prof.new_id(caminho)
+        response.headers['X-Profile-Id'] = perfil_id
+        metodo, status = request.method, response.status_code
+        if response.is_streamed:
+            # NDJSON/CSV: o corpo é gerado depois daqui; o perfil é salvo ao fim do envio
+            response.call_on_close(lambda: prof.stop(
+                perfil, metodo, caminho, status, time.perf_counter() - inicio, perfil_id
+            ))
+        else:
+            prof.stop(perfil, metodo, caminho, status, total, perfil_id)
+    return response
+
+
+@app.teardown_request
+def stop_profiler(exc):
+    """Garante que o profiler pare mesmo quando a requisição termina em exceção."""
+    perfil = getattr(request, 'perfil', None)
+    if perfil is not None:
+        request.perfil = None
+        prof.stop(perfil, request.method, request.path, 500,
+                  time.perf_counter() - request.inicio_requisicao)
+
+
+@app.route('/metrics')
+def metrics():
+    """Métricas do processo no formato texto do Prometheus."""
+    return Response(mt.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _admin_token():
+    return request.headers.get(prof.CABECALHO) or request.args.get('token')
+
+
+@app.route('/admin/profiles')
+def admin_profiles():
+    """
+    Lista os perfis de requisições salvos (requer LOTOPY_PROFILING=1 e o token de administrador).
+
+    Exemplo de uso:
+        curl -H "X-Lotopy-Profile: $LOTOPY_ADMIN_TOKEN" http://localhost:5000/admin/profiles
+
+    Para perfilar uma requisição:
+        curl -H "X-Lotopy-Profile: $LOTOPY_ADMIN_TOKEN" http://localhost:5000/api/suggestions
+        (o identificador do perfil volta no cabeçalho X-Profile-Id)
+
+    Retorna:
+        {
+            "success": true,
+            "perfis": [
+                {"id": "20250101-120000-4242-a1b2c3-api_suggestions", "metodo": "GET",
+                 "caminho": "/api/suggestions", "status": 200, "duracao_ms": 812.4, ...}
+            ]
+        }
+    """
+    if not prof.enabled():
+        return jsonify({'success': False, 'error': 'Profiling desligado.'}), 404
+    if not prof.check_token(_admin_token()):
+        return jsonify({'success': False, 'error': 'Token de administrador inválido.'}), 403
+    return jsonify({'success': True, 'perfis': prof.list_profiles()})
+
+
+@app.route('/admin/profiles/<perfil_id>')
+def admin_profile(perfil_id):
+    """
+    Resumo de um perfil (texto do pstats) ou o arquivo .prof com ?formato=prof.
+
+    Parâmetros:
+        ordenar: cumulative (padrão), tottime ou ncalls
+        limite: Quantidade de funções no resumo (padrão 40)
+        formato: texto (padrão) ou prof
+    """
+    if not prof.enabled():
+        return jsonify({'success': False, 'error': 'Profiling desligado.'}), 404
+    if not prof.check_token(_admin_token()):
+        return jsonify({'success': False, 'error': 'Token de administrador inválido.'}), 403
+    try:
+        if request.args.get('formato') == 'prof':
+            return send_file(prof.profile_path(perfil_id), mimetype='application/octet-stream',
+                             as_attachment=True, download_name=f"{perfil_id}.prof")
+        limite = _optional_int(request.args.get('limite'), 'limite')
+        texto = prof.summary(perfil_id, request.args.get('ordenar', 'cumulative'),
+                             40 if limite is None else limite)
+        return Response(texto, mimetype='text/plain')
+    except FileNotFoundError:
+        return jsonify({'success': False, 'error': 'Perfil não encontrado.'}), 404
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+# Fragmentos HTML da página: nome -> (template, {variável do template: seção do snapshot})
+FRAGMENTOS = {
+    'contests': ('sections/contests.html', {'concursos': 'contests'}),
+    'numbers': ('sections/numbers.html', {'numeros_info': 'numbers'}),
+    'geographic': ('sections/geographic.html', {'consolidated_geo': 'geographic', 'heat_map': 'heatmap'}),
+    'cycle-patterns': ('sections/cycle_patterns.html', {'cycle_patterns': 'cycle-patterns'}),
+    'pip-distribution': ('sections/pip_distribution.html', {'global_pip_dist': 'pip-distribution'}),
+    'cycle-new-numbers': ('sections/cycle_new_numbers.html', {'dist_novos_display': 'cycle-new-numbers'}),
+    'cycle-step-frequency': ('sections/cycle_step_frequency.html', {'freq_by_step_display': 'cycle-step-frequency'}),
+    'heatmap': ('sections/heatmap.html', {'heat_map': 'heatmap'}),
+    'suggestions': ('sections/suggestions.html', {'sugestoes': 'suggestions-page'}),
+}
+
+# Fragmentos com variante compacta (?compacto=1): cartelas montadas no navegador
+FRAGMENTOS_COMPACTOS = {
+    'contests': 'sections/contests_compact.html',
+    'suggestions': 'sections/suggestions_compact.html',
+}
+
+# Quantidade de sugestões exibidas na página
+SUGESTOES_PAGINA = 9
+
+
+def _page_limit():
+    """Lê o parâmetro 'limit' da página (5, 10, 15, 20 ou 25; padrão 15)."""
+    limit = request.args.get('limit', default=15, type=int)
+    if limit not in [5, 10, 15, 20, 25]:
+        limit = 15
+    return limit
 
 
 @app.route('/')
 def index():
-    """Página principal com visualização dos dados."""
-    try:
-        # Carregar dados
-        df = load_data()
-        
-        # Pegar parâmetro de limite (padrão: 15)
-        limit = request.args.get('limit', default=15, type=int)
-        
-        # Validar limite
-        if limit not in [5, 10, 15, 20, 25]:
-            limit = 15
-        
-        # Pegar últimos N concursos
-        df_ultimos = df.tail(limit).copy()
-        
-        # Preparar dados para o template
-        concursos = []
-        for index, row in df_ultimos.iterrows():
-            numeros = [
-                int(row[f"Bola{i}"]) for i in range(1, 16)
-                if pd.notna(row[f"Bola{i}"])
-            ]
-            numeros.sort()
-            
-            # Calcular distribuição geográfica
-            geo_dist = ga.analyze_geographic_distribution(numeros)
-            
-            # Análise de quadrantes e cruz
-            quadrante1 = {1, 2, 6, 7}
-            quadrante2 = {4, 5, 9, 10}
-            quadrante3 = {16, 17, 21, 22}
-            quadrante4 = {19, 20, 24, 25}
-            cruz = {3, 8, 11, 12, 13, 14, 15, 18, 23}
-            
-            q1 = sum(1 for n in numeros if n in quadrante1)
-            q2 = sum(1 for n in numeros if n in quadrante2)
-            q3 = sum(1 for n in numeros if n in quadrante3)
-            q4 = sum(1 for n in numeros if n in quadrante4)
-
-            cruz_count = sum(1 for n in numeros if n in cruz)
-            
-            # Análise de Novos vs Repetidos no Ciclo
-            ciclo_atual_row = int(row['ciclo'])
-            concurso_atual_row = int(row['Concurso'])
-            
-            # Pegar todos os sorteios ANTERIORES do MESMO ciclo
-            df_ciclo_ant = df[(df['ciclo'] == ciclo_atual_row) & (df['Concurso'] < concurso_atual_row)]
-            
-            numeros_acumulados_ciclo = set()
-            lst_campos = [f"Bola{i}" for i in range(1, 16)]
-            
-            for _, r_ant in df_ciclo_ant.iterrows():
-                for campo in lst_campos:
-                    if pd.notna(r_ant[campo]):
-                        numeros_acumulados_ciclo.add(int(r_ant[campo]))
-            
-            # Calcular quantos dos números atuais são novos (não estavam nos acumulados)
-            numeros_novos_ciclo = 0
-            numeros_repetidos_ciclo = 0
-            
-            # Se não tem acumulados, todos são novos (primeiro do ciclo)
-            # Mas o problema pede "novos" vs "já saíram".
-            # No primeiro sorteio, todos são "novos" no ciclo.
-            
-            for n in numeros:
-                if n in numeros_acumulados_ciclo:
-                    numeros_repetidos_ciclo += 1
-                else:
-                    numeros_novos_ciclo += 1
-
-            # Formatar data corretamente
-            data_sorteio = row['Data Sorteio']
-            if pd.notna(data_sorteio):
-                if hasattr(data_sorteio, 'strftime'):
-                    data_formatada = data_sorteio.strftime('%d/%m/%Y')
-                else:
-                    data_formatada = str(data_sorteio)
-            else:
-                data_formatada = ''
-            
-            concursos.append({
-                'concurso': int(row['Concurso']),
-                'data': data_formatada,
-                'numeros': numeros,
-                'ciclo': int(row['ciclo']),
-                'config_pip': row['config_pip'],
-                'moldura': geo_dist['moldura'],
-                'miolo': geo_dist['miolo'],
-                'linha1': geo_dist['linha1'],
-                'linha2': geo_dist['linha2'],
-                'linha3': geo_dist['linha3'],
-                'linha4': geo_dist['linha4'],
-                'linha5': geo_dist['linha5'],
-                'distribuicao_linhas': geo_dist['distribuicao_linhas'],
-                'q1': q1,
-                'q2': q2,
-                'q3': q3,
-                'q4': q4,
-                'q4': q4,
-                'cruz': cruz_count,
-                'q4': q4,
-                'cruz': cruz_count,
-                'novos_ciclo': numeros_novos_ciclo,
-                'repetidos_ciclo': numeros_repetidos_ciclo,
-                'novos_set': list(numeros_acumulados_ciclo.symmetric_difference(set(numeros) | numeros_acumulados_ciclo)) # Números que NÃO estavam nos acumulados (são novos)
-            })
+    """
+    Página principal: estrutura leve, sem análises.
 
+    Cada seção é carregada de forma assíncrona (static/script.js) a partir de
+    /sections/<nome>, então a primeira renderização não espera a análise
+    mais lenta.
+    """
+    try:
+        # Dados base da versão atual (as seções são calculadas sob demanda)
+        snapshot = sn.get_snapshot()
+        limit = _page_limit()
+        compacto = cf.enabled(request.args.get('compacto'))
         
-        # Reverter para mostrar os mais recentes primeiro
-        concursos.reverse()
-        
-        # Pegar dados dos 25 números
-        df_numeros = nf.get_numbers_status_in_cycle(df)
-        
-        # Calcular total de aparições para percentuais
-        total_aparicoes = df_numeros['frequencia'].sum()
-        
-        numeros_info = []
-        for index, row in df_numeros.iterrows():
-            numeros_info.append({
-                'numero': int(row['numero']),
-                'frequencia': int(row['frequencia']),
-                'percentual': round((int(row['frequencia']) / total_aparicoes) * 100, 2),
-                'no_ciclo': row['no_ciclo_atual']
-            })
-        
-        
-        # Informações adicionais
-        total_concursos = len(df)
-        ciclo_atual = int(df['ciclo'].max())
-        
-        # Calcular estatísticas globais
-        consolidated_geo = gstats.calculate_consolidated_geographic_analysis(df)
-        global_pip_dist = gstats.calculate_global_pip_distribution(df)
-        global_pip_dist = gstats.calculate_global_pip_distribution(df)
-        heat_map = gstats.calculate_heat_map(df)
-        
-        # Análise de Ciclos (Novas implementações)
-        # Padrões de saída (ex: 15-5-3-2)
-        df_cycle_patterns = ca.analyze_cycle_exit_patterns(df)
-        cycle_patterns = df_cycle_patterns.head(10).to_dict('records')
-        
-        # Distribuição de Novos Números por Passo do Ciclo
-        dist_novos_stats = ca.analyze_new_numbers_distribution(df)
-        
-        # Converter para formato amigável para o template (lista de objetos)
-        dist_novos_display = []
-        for passo, df_dist in dist_novos_stats.items():
-            dist_novos_display.append({
-                'passo': passo,
-                'dados': df_dist.to_dict('records')
-            })
-            
-        # Ordenar por passo
-        dist_novos_display.sort(key=lambda x: x['passo'])
-        
-        # Análise de Frequência por Rodada do Ciclo
-        freq_by_step = ca.analyze_frequency_by_cycle_step(df, max_steps=4)
-        freq_by_step_display = []
-        for step, df_freq in freq_by_step.items():
-            freq_by_step_display.append({
-                'step': step,
-                'dados': df_freq.head(10).to_dict('records') # Top 10 por rodada
-            })
-        freq_by_step_display.sort(key=lambda x: x['step'])
-        
-        # Gerar sugestões de jogos
-
-        sugestoes = gs.generate_suggestions(df, num_games=9)
+        def render():
+            with mt.stage('template.index'):
+                return render_template(
+                    'index.html',
+                    total_concursos=snapshot['total_concursos'],
+                    ciclo_atual=snapshot['ciclo_atual'],
+                    limit=limit,
+                    compacto=compacto
+                )
         
-        # Adicionar análise completa para cada sugestão
-        for sugestao in sugestoes:
-            numeros = sugestao['numeros']
-            
-            # Análise geográfica
-            geo_dist = ga.analyze_geographic_distribution(numeros)
-            sugestao['moldura'] = geo_dist['moldura']
-            sugestao['miolo'] = geo_dist['miolo']
-            sugestao['distribuicao_linhas'] = geo_dist['distribuicao_linhas']
-            
-            # Análise de ciclo
-            lst_campos = [f"Bola{i}" for i in range(1, 16)]
-            numeros_no_ciclo = sum(1 for n in numeros if n in df[df['ciclo'] == ciclo_atual][lst_campos].values.flatten())
-            sugestao['ciclo_count'] = numeros_no_ciclo
-            
-            # Análise P-I-NP
-            pares = sum(1 for n in numeros if n % 2 == 0)
-            impares = sum(1 for n in numeros if n % 2 != 0)
-            primos_set = {2, 3, 5, 7, 11, 13, 17, 19, 23}
-            primos = sum(1 for n in numeros if n in primos_set)
-            sugestao['config_pip'] = f"{pares}P-{impares}I-{primos}NP"
-            
-            # Análise de quadrantes e cruz
-            quadrante1 = {1, 2, 6, 7}
-            quadrante2 = {4, 5, 9, 10}
-            quadrante3 = {16, 17, 21, 22}
-            quadrante4 = {19, 20, 24, 25}
-            cruz = {3, 8, 11, 12, 13, 14, 15, 18, 23}
-            
-            sugestao['q1'] = sum(1 for n in numeros if n in quadrante1)
-            sugestao['q2'] = sum(1 for n in numeros if n in quadrante2)
-            sugestao['q3'] = sum(1 for n in numeros if n in quadrante3)
-            sugestao['q4'] = sum(1 for n in numeros if n in quadrante4)
-            sugestao['cruz'] = sum(1 for n in numeros if n in cruz)
+        # Mensagens flash dependem da sessão: renderizar sem cache
+        if '_flashes' in session:
+            return render()
         
-        return render_template(
-            'index.html',
-            concursos=concursos,
-            numeros_info=numeros_info,
-            total_concursos=total_concursos,
-            ciclo_atual=ciclo_atual,
-            sugestoes=sugestoes,
-
-            limit=limit,
-            consolidated_geo=consolidated_geo,
-            global_pip_dist=global_pip_dist,
-            heat_map=heat_map,
-            cycle_patterns=cycle_patterns,
-            dist_novos_display=dist_novos_display,
-            freq_by_step_display=freq_by_step_display
-        )
+        # ETag/304 e corpo (gzip) em cache por (limite, versão dos dados)
+        params = {'limit': limit, 'compacto': 1} if compacto else {'limit': limit}
+        return rc.cached_response('index', params, snapshot['versao'], render)
     
     except Exception as e:
         return f"Erro ao carregar dados: {str(e)}", 500
 
 
+@app.route('/sections/<nome>')
+def section_fragment(nome):
+    """
+    Fragmento HTML de uma seção da página (em cache por seção e versão dos dados).
+
+    Com ?compacto=1, concursos e sugestões vêm no formato compacto
+    (source/compact_format.py) e as cartelas são montadas pelo static/script.js.
+    """
+    if nome not in FRAGMENTOS:
+        return "Seção não encontrada", 404
+
+    try:
+        snapshot = sn.get_snapshot()
+        template, variaveis = FRAGMENTOS[nome]
+        params = {'limit': _page_limit()} if nome == 'contests' else {}
+        compacto = nome in FRAGMENTOS_COMPACTOS and cf.enabled(request.args.get('compacto'))
+        if compacto:
+            template = FRAGMENTOS_COMPACTOS[nome]
+            params['compacto'] = 1
+
+        def render():
+            contexto = {
+                variavel: sn.get_section(secao, snapshot)
+                for variavel, secao in variaveis.items()
+            }
+            if nome == 'contests':
+                contexto['concursos'] = contexto['concursos'][:params['limit']]
+            if nome == 'suggestions':
+                contexto['sugestoes'] = contexto['sugestoes'][:SUGESTOES_PAGINA]
+            if compacto:
+                contexto = {'compacto': cf.encode_contests(contexto['concursos']) if nome == 'contests'
+                            else cf.encode_suggestions(contexto['sugestoes'])}
+            with mt.stage('template.' + nome):
+                return render_template(template, **contexto)
+
+        return rc.cached_response('section:' + nome, params, snapshot['versao'], render)
+
+    except Exception as e:
+        return f"Erro ao carregar seção: {str(e)}", 500
+
+
 @app.route('/atualizar')
 def atualizar_banco():
-    """Atualiza o banco de dados com novos concursos."""
+    """Inicia a atualização do banco de dados em segundo plano."""
     try:
-        dbu.update_db(save_path="./data/D_lotfac.xlsx")
-        flash('Banco de dados atualizado com sucesso!', 'success')
+        job = rj.start_refresh(origem="manual")
+        flash(f'Atualização do banco de dados iniciada (job {job["id"]}). '
+              f'Acompanhe em /api/refresh/{job["id"]}.', 'success')
     except Exception as e:
         flash(f'Erro ao atualizar banco de dados: {str(e)}', 'error')
     
     return redirect(url_for('index'))
 
 
+@app.route('/api/refresh', methods=['POST'])
+def api_refresh():
+    """
+    Inicia a atualização do banco de dados em segundo plano.
+
+    Exemplo de uso:
+        curl -X POST http://localhost:5000/api/refresh
+
+    Retorna (202):
+        {
+            "success": true,
+            "job": {"id": "3f2a9c1b7d4e", "status": "pendente", ...}
+        }
+    """
+    try:
+        job = rj.start_refresh(origem="api")
+        return jsonify({'success': True, 'job': job}), 202
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/refresh/<job_id>')
+def api_refresh_status(job_id):
+    """
+    Consulta o estado de uma atualização.
+
+    Exemplo de uso:
+        curl http://localhost:5000/api/refresh/3f2a9c1b7d4e
+
+    Retorna:
+        {
+            "success": true,
+            "job": {
+                "id": "3f2a9c1b7d4e",
+                "status": "concluido",      # pendente, executando, concluido ou erro
+                "atualizado": true,         # false se a planilha não mudou
+                "versao": "9f1c...",
+                "novos_concursos": 1,
+                ...
+            }
+        }
+    """
+    job = rj.get_job(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job não encontrado.'
+        }), 404
+    return jsonify({'success': True, 'job': job})
+
+
 @app.route('/api/suggestions')
 def api_suggestions():
     """
@@ -275,6 +349,14 @@ def api_suggestions():
     
     Exemplo de uso:
         curl http://localhost:5000/api/suggestions
+        curl http://localhost:5000/api/suggestions?as_of=2500
+        curl http://localhost:5000/api/suggestions?compacto=1
+    
+    Parâmetros:
+        as_of: Número de um concurso; retorna as sugestões como seriam
+            geradas logo após ele (opcional)
+        compacto: 1 para receber cada jogo como máscara de 25 bits
+            (source/compact_format.py; opcional)
     
     Retorna:
         {
@@ -294,34 +376,717 @@ def api_suggestions():
     try:
         from flask import jsonify
 
-        # Carregar dados
-        df = load_data()
+        # Sugestões calculadas uma vez por versão dos dados
+        snapshot = sn.get_snapshot()
+        concurso = _optional_int(request.args.get('as_of'), 'as_of')
+        compacto = cf.enabled(request.args.get('compacto'))
+
+        def render():
+            if concurso is None:
+                response = {
+                    'success': True,
+                    'total_concursos': snapshot['total_concursos'],
+                    'ciclo_atual': snapshot['ciclo_atual'],
+                    'sugestoes': list(sn.get_section('suggestions', snapshot)[:6])
+                }
+            else:
+                posicao = sn.as_of(concurso, snapshot)
+                response = {
+                    'success': True,
+                    'as_of': concurso,
+                    'total_concursos': posicao['total_concursos'],
+                    'ciclo_atual': posicao['ciclo_atual'],
+                    'sugestoes': list(sn.get_section_as_of('suggestions', concurso, snapshot)[:6])
+                }
+            if compacto:
+                response.update(cf.encode_suggestions(response['sugestoes']))
+            return jsonify(response).get_data()
+
+        params = {} if concurso is None else {'as_of': concurso}
+        if compacto:
+            params['compacto'] = 1
+        return rc.cached_response('api_suggestions', params, snapshot['versao'], render,
+                                  mimetype='application/json')
+
+    except ValueError as e:
+        from flask import jsonify
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        from flask import jsonify
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _optional_int(valor, nome):
+    """Converte um parâmetro opcional para inteiro, validando o formato."""
+    if valor is None or valor == '':
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Parâmetro '{nome}' deve ser um número inteiro.")
+
+
+@app.route('/api/tickets/evaluate', methods=['POST'])
+def api_evaluate_tickets():
+    """
+    API REST para conferência em lote de jogos.
+
+    Aceita os jogos como listas de números ou como máscaras de bits (inteiros
+    de 25 bits, bit n-1 = número n) e confere contra um concurso, um intervalo
+    de concursos ou o histórico completo (sem filtros).
 
-        # Gerar sugestões
-        sugestoes = gs.generate_suggestions(df, num_games=6)
+    Exemplo de uso:
+        curl -X POST http://localhost:5000/api/tickets/evaluate \\
+             -H "Content-Type: application/json" \\
+             -d '{"concurso": 3500, "jogos": [[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15], 32767]}'
+
+    Corpo (JSON):
+        jogos: lista de jogos com 15 a 20 números (obrigatório); os prêmios de
+            um jogo com mais de 15 números somam as C(k, 15) apostas simples
+            contidas nele
+        concurso: concurso específico (opcional)
+        concurso_inicial / concurso_final: intervalo de concursos (opcional)
+        formato: "json" ou "ndjson" (padrão: NDJSON acima de 1000 jogos)
+
+    Retorna:
+        {
+            "success": true,
+            "resumo": {"total_jogos": 2, "total_concursos": 1, "jogos_premiados": 1,
+                       "premios": {"11": 1, "12": 0, "13": 0, "14": 0, "15": 0}},
+            "jogos": [
+                {"indice": 0, "max_acertos": 11, "acertos": 11,
+                 "premios": {"11": 1, "12": 0, "13": 0, "14": 0, "15": 0}},
+                ...
+            ]
+        }
+
+        No formato NDJSON, cada linha é o resultado de um jogo e a última
+        linha contém o resumo ({"resumo": {...}}).
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        jogos = payload.get('jogos')
+        if isinstance(jogos, list) and len(jogos) > MAX_JOGOS_LOTE:
+            raise ValueError(f"Máximo de {MAX_JOGOS_LOTE} jogos por requisição.")
 
-        # Informações adicionais
-        total_concursos = len(df)
-        ciclo_atual = int(df['ciclo'].max())
+        ticket_masks = te.parse_tickets(jogos)
+
+        formato = payload.get('formato')
+        if formato is None:
+            aceita_ndjson = 'application/x-ndjson' in request.headers.get('Accept', '')
+            formato = 'ndjson' if aceita_ndjson or len(ticket_masks) > LIMITE_JOGOS_JSON else 'json'
+        if formato not in ('json', 'ndjson'):
+            raise ValueError("Parâmetro 'formato' deve ser 'json' ou 'ndjson'.")
+
+        snapshot = sn.get_snapshot()
+        _, draw_masks = te.select_draws(
+            snapshot['df'],
+            concurso=_optional_int(payload.get('concurso'), 'concurso'),
+            concurso_inicial=_optional_int(payload.get('concurso_inicial'), 'concurso_inicial'),
+            concurso_final=_optional_int(payload.get('concurso_final'), 'concurso_final'),
+            masks=snapshot['masks']
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    if formato == 'ndjson':
+        def gerar_linhas():
+            for item in te.evaluate_tickets(ticket_masks, draw_masks):
+                yield json.dumps(item) + "\n"
+
+        return Response(gerar_linhas(), mimetype='application/x-ndjson')
+
+    resultados = list(te.evaluate_tickets(ticket_masks, draw_masks))
+    resumo = resultados.pop()['resumo']
+
+    return jsonify({
+        'success': True,
+        'resumo': resumo,
+        'jogos': resultados
+    })
+
+
+@app.route('/api/combination')
+def api_combination():
+    """
+    API REST para consultar se uma combinação de 15 números já foi sorteada.
+
+    A combinação pode ser informada pelos números ou pelo rank no sistema
+    combinatorial (0 a 3.268.759).
+
+    Exemplo de uso:
+        curl "http://localhost:5000/api/combination?numeros=1,2,3,4,5,6,7,8,9,10,11,12,13,14,15"
+        curl "http://localhost:5000/api/combination?rank=0"
+
+    Retorna:
+        {
+            "success": true,
+            "numeros": [1, 2, 3, ...],
+            "rank": 0,
+            "sorteado": false,
+            "concursos": []
+        }
+    """
+    try:
+        numeros_param = request.args.get('numeros')
+        rank = _optional_int(request.args.get('rank'), 'rank')
+
+        if numeros_param:
+            try:
+                numeros = [int(n) for n in numeros_param.split(',') if n.strip()]
+            except ValueError:
+                raise ValueError("Parâmetro 'numeros' deve ser uma lista de inteiros separados por vírgula.")
+            rank = ci.combination_rank(numeros)
+        elif rank is not None:
+            numeros = ci.combination_unrank(rank)
+        else:
+            raise ValueError("Informe o parâmetro 'numeros' ou 'rank'.")
+
+        indice = sn.get_snapshot()['indice_sorteados']
+        concursos = ci.get_drawn_contests(indice, numeros)
+
+        return jsonify({
+            'success': True,
+            'numeros': sorted(numeros),
+            'rank': rank,
+            'sorteado': len(concursos) > 0,
+            'concursos': concursos
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/simulate')
+def api_simulate():
+    """
+    API REST para simular as estratégias de sugestão contra sorteios aleatórios.
+
+    Estima, para o jogo de cada estratégia, a probabilidade de cada faixa de
+    premiação e o retorno esperado por aposta, com intervalos de confiança de 95%.
+
+    Exemplo de uso:
+        curl "http://localhost:5000/api/simulate?n=1000000&seed=42"
+
+    Parâmetros:
+        n: quantidade de sorteios simulados (padrão 1.000.000, máximo 2.000.000)
+        seed: semente do gerador aleatório (padrão 42)
+
+    Os jogos são os da seção 'suggestions' do snapshot; a simulação roda no
+    próprio worker (sem processos extras) e a resposta fica em cache por
+    (n, seed) e versão dos dados.
+
+    Retorna:
+        {
+            "success": true,
+            "sorteios_simulados": 1000000,
+            "seed": 42,
+            "estrategias": [
+                {
+                    "estrategia": "🔥 Áreas Mais Quentes",
+                    "numeros": [...],
+                    "faixas": {"11": {"ocorrencias": ..., "probabilidade": ..., "ic_95": [...],
+                                      "probabilidade_exata": ...}, ...},
+                    "retorno_esperado": 1.57,
+                    "ic_95_retorno": [...],
+                    "retorno_liquido": -1.93
+                },
+                ...
+            ]
+        }
+    """
+    try:
+        n_sorteios = _optional_int(request.args.get('n'), 'n')
+        if n_sorteios is None:
+            n_sorteios = 1_000_000
+        seed = _optional_int(request.args.get('seed'), 'seed')
+        if seed is None:
+            seed = 42
+        if n_sorteios < 1 or n_sorteios > MAX_SORTEIOS_SIMULACAO:
+            raise ValueError(f"Parâmetro 'n' deve estar entre 1 e {MAX_SORTEIOS_SIMULACAO}.")
+
+        snapshot = sn.get_snapshot()
+
+        def render():
+            estrategias = mc.simulate_strategies(
+                snapshot['df'], n_sorteios=n_sorteios, seed=seed, processos=1,
+                sugestoes=sn.get_section('suggestions', snapshot)
+            )
+            return jsonify({
+                'success': True,
+                'sorteios_simulados': n_sorteios,
+                'seed': seed,
+                'estrategias': estrategias
+            }).get_data()
+
+        return rc.cached_response('api_simulate', {'n': n_sorteios, 'seed': seed}, snapshot['versao'],
+                                  render, mimetype='application/json')
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/generate')
+def api_generate():
+    """
+    API REST para gerar jogos aleatórios que respeitam restrições.
+
+    Exemplo de uso:
+        curl "http://localhost:5000/api/generate?n=10&seed=1&config_pip=7P-8I-5NP&moldura=9-10"
+
+    Parâmetros:
+        n: quantidade de jogos (padrão 10, máximo 1.000.000)
+        seed: semente do gerador aleatório (opcional)
+        config_pip: configuração P-I-NP (ex: 7P-8I-5NP)
+        moldura / miolo: quantidade ou intervalo (ex: 9 ou 8-10)
+        linhas: distribuição por linhas (ex: 3-3-3-3-3)
+        soma_min / soma_max: faixa da soma dos números
+        incluir / excluir: números obrigatórios / proibidos (ex: 1,2,3)
+        incluir_sorteados: "1" para permitir combinações que já saíram
+        formato: "json" ou "ndjson" (padrão: NDJSON acima de 1000 jogos)
+
+    Retorna:
+        {
+            "success": true,
+            "total": 10,
+            "completo": true,
+            "jogos": [[1, 2, 3, ...], ...]
+        }
+
+        No formato NDJSON, cada linha contém um jogo ({"numeros": [...]}) e
+        a última linha contém o resumo ({"resumo": {"total": ..., "solicitados": ...,
+        "completo": ...}}); completo=false indica que a geração parou antes de
+        n jogos (restrições muito restritivas ou combinações esgotadas).
+    """
+    try:
+        n = _optional_int(request.args.get('n'), 'n')
+        if n is None:
+            n = 10
+        if n < 1 or n > MAX_JOGOS_GERADOS:
+            raise ValueError(f"Parâmetro 'n' deve estar entre 1 e {MAX_JOGOS_GERADOS}.")
+        seed = _optional_int(request.args.get('seed'), 'seed')
+        formato = request.args.get('formato') or ('ndjson' if n > LIMITE_JOGOS_JSON else 'json')
+        if formato not in ('json', 'ndjson'):
+            raise ValueError("Parâmetro 'formato' deve ser 'json' ou 'ndjson'.")
+
+        restricoes = ts.build_constraints(
+            config_pip=request.args.get('config_pip'),
+            moldura=request.args.get('moldura'),
+            miolo=request.args.get('miolo'),
+            linhas=request.args.get('linhas'),
+            soma_min=_optional_int(request.args.get('soma_min'), 'soma_min'),
+            soma_max=_optional_int(request.args.get('soma_max'), 'soma_max'),
+            incluir=request.args.get('incluir'),
+            excluir=request.args.get('excluir')
+        )
+
+        indice = None
+        if request.args.get('incluir_sorteados') != '1':
+            indice = sn.get_snapshot()['indice_sorteados']
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    jogos = ts.iter_tickets(n, restricoes, seed=seed, indice_sorteados=indice)
+
+    if formato == 'ndjson':
+        def gerar_linhas():
+            total = 0
+            for numeros in jogos:
+                total += 1
+                yield json.dumps({'numeros': numeros}) + "\n"
+            yield json.dumps({'resumo': {'total': total, 'solicitados': n, 'completo': total == n}}) + "\n"
+
+        return Response(gerar_linhas(), mimetype='application/x-ndjson')
+
+    lista_jogos = list(jogos)
+    return jsonify({
+        'success': True,
+        'total': len(lista_jogos),
+        'completo': len(lista_jogos) == n,
+        'jogos': lista_jogos
+    })
+
+
+@app.route('/api/cooccurrence')
+def api_cooccurrence():
+    """
+    API REST com as duplas e trios de números que mais saem juntos.
+
+    Exemplo de uso:
+        curl "http://localhost:5000/api/cooccurrence?tipo=trios&ultimos=100&top=10"
+
+    Parâmetros:
+        tipo: "duplas" (padrão) ou "trios"
+        ultimos: considera apenas os últimos N concursos (padrão: todos)
+        top: quantidade de combinações retornadas (padrão 20, máximo 2300)
+        matriz: "1" para incluir a matriz 25x25 completa de duplas
+
+    Retorna:
+        {
+            "success": true,
+            "tipo": "duplas",
+            "concursos_analisados": 3575,
+            "combinacoes": [{"numeros": [11, 20], "frequencia": 1362}, ...]
+        }
+    """
+    try:
+        tipo = request.args.get('tipo', 'duplas')
+        if tipo not in ('duplas', 'trios'):
+            raise ValueError("Parâmetro 'tipo' deve ser 'duplas' ou 'trios'.")
+        ultimos = _optional_int(request.args.get('ultimos'), 'ultimos')
+        if ultimos is not None and ultimos < 1:
+            raise ValueError("Parâmetro 'ultimos' deve ser maior que zero.")
+        top = _optional_int(request.args.get('top'), 'top') or 20
+        top = max(1, min(top, co.TOTAL_TRIOS))
+
+        snapshot = sn.get_snapshot()
+        masks = snapshot['masks']
+
+        estado = sn.get_section('cooccurrence', snapshot)
+        duplas, trios = co.window_counts(estado, masks, ultimos)
 
-        # Preparar resposta
         response = {
             'success': True,
-            'total_concursos': total_concursos,
-            'ciclo_atual': ciclo_atual,
-            'sugestoes': sugestoes
+            'tipo': tipo,
+            'concursos_analisados': min(ultimos or len(masks), len(masks)),
+            'combinacoes': co.top_pairs(duplas, top) if tipo == 'duplas' else co.top_triples(trios, top)
         }
+        if tipo == 'duplas' and request.args.get('matriz') == '1':
+            response['matriz'] = duplas.tolist()
 
         return jsonify(response)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/delays')
+def api_delays():
+    """
+    API REST com atrasos, sequências e risco de retorno de cada número.
+
+    Exemplo de uso:
+        curl "http://localhost:5000/api/delays?max_k=10"
 
+    Parâmetros:
+        max_k: maior quantidade de ausências considerada no risco (padrão 15, máximo 100)
+
+    Retorna:
+        {
+            "success": true,
+            "concursos_analisados": 3575,
+            "numeros": [
+                {"numero": 1, "atraso_atual": 2, "atraso_maximo": 12, "atraso_medio": 1.98,
+                 "sequencia_atual": 0, "sequencia_maxima": 19, "sequencia_media": 2.49,
+                 "risco": [{"k": 0, "probabilidade": 0.6, "amostras": 2140}, ...]},
+                ...
+            ],
+            "risco_geral": [{"k": 0, "probabilidade": 0.6, "amostras": 53600}, ...]
+        }
+    """
+    try:
+        max_k = _optional_int(request.args.get('max_k'), 'max_k')
+        if max_k is None:
+            max_k = 15
+        if max_k < 0 or max_k > 100:
+            raise ValueError("Parâmetro 'max_k' deve estar entre 0 e 100.")
+
+        estado = sn.get_section('delays')
+
+        response = {'success': True}
+        response.update(da.delay_statistics(estado, max_k))
+        return jsonify(response)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/repetitions')
+def api_repetitions():
+    """
+    API REST com as repetições de números entre concursos consecutivos.
+
+    Exemplo de uso:
+        curl "http://localhost:5000/api/repetitions"
+
+    Parâmetros:
+        matrizes: "1" para incluir as matrizes de transição completas
+
+    Retorna:
+        {
+            "success": true,
+            "concursos_analisados": 3574,
+            "media": 9.0,
+            "distribuicao": [{"repeticoes": 9, "frequencia": 1100, "percentual": 30.78}, ...],
+            "ultimo_concurso": {"repeticoes": 8, "config_pip": "7P-8I-5NP"},
+            "proximo_provavel": 9,
+            "dado_repeticoes_anteriores": [...],
+            "dado_config_pip_anterior": [...]
+        }
+    """
+    try:
+        indice = sn.get_section('repetitions')
+
+        response = {'success': True}
+        response.update(ra.repetition_statistics(indice))
+        if request.args.get('matrizes') == '1':
+            response['transicoes'] = indice['transicoes'].tolist()
+            response['transicoes_pip'] = {
+                ra.pip_code_to_config(codigo): linha.tolist()
+                for codigo, linha in enumerate(indice['transicoes_pip'])
+                if linha.any()
+            }
+
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+# Parâmetros da paginação por chave de /api/contests
+LIMITE_PADRAO_HISTORICO = 25
+LIMITE_MAXIMO_HISTORICO = 1000
+PARAMETROS_HISTORICO = ('from', 'to', 'cursor', 'ordem', 'formato')
+
+
+@app.route('/api/contests')
+def api_contests():
+    """
+    API REST com os concursos: últimos exibidos na página, páginas do
+    histórico completo ou exportação em NDJSON/CSV.
+
+    Exemplo de uso:
+        curl "http://localhost:5000/api/contests?limit=5"
+        curl "http://localhost:5000/api/contests?from=3000&to=3100&limit=50"
+        curl "http://localhost:5000/api/contests?cursor=3051&limit=50"
+        curl "http://localhost:5000/api/contests?formato=csv" -o concursos.csv
+        curl "http://localhost:5000/api/contests?limit=25&compacto=1"
+
+    Parâmetros:
+        limit: Sem os parâmetros abaixo: 5, 10, 15, 20 ou 25 (padrão 15).
+            Na paginação: 1 a 1000 (padrão 25)
+        from, to: Intervalo de concursos (inclusive, opcionais)
+        cursor: 'proximo_cursor' da página anterior
+        ordem: 'desc' (padrão, mais recentes primeiro) ou 'asc'
+        formato: 'ndjson' ou 'csv' para exportar todo o intervalo (ordem crescente)
+        compacto: 1 para receber cada concurso como [concurso, data, mask,
+            novos, ciclo] (source/compact_format.py; apenas em JSON)
+
+    Retorna:
+        {
+            "success": true,
+            "concursos": [{"concurso": 3575, "data": "29/12/2025", "numeros": [...], ...}, ...],
+            "proximo_cursor": 3551   (apenas na paginação; null na última página)
+        }
+    """
+    try:
+        snapshot = sn.get_snapshot()
+        compacto = cf.enabled(request.args.get('compacto'))
+
+        if not any(p in request.args for p in PARAMETROS_HISTORICO):
+            limit = _page_limit()
+
+            def render():
+                concursos = list(sn.get_section('contests', snapshot)[:limit])
+                if compacto:
+                    return jsonify({'success': True, **cf.encode_contests(concursos)}).get_data()
+                return jsonify({'success': True, 'concursos': concursos}).get_data()
+
+            params = {'limit': limit, 'compacto': 1} if compacto else {'limit': limit}
+            return rc.cached_response('api_contests', params, snapshot['versao'], render,
+                                      mimetype='application/json')
+
+        de = _optional_int(request.args.get('from'), 'from')
+        ate = _optional_int(request.args.get('to'), 'to')
+        cursor = _optional_int(request.args.get('cursor'), 'cursor')
+        limite = _optional_int(request.args.get('limit'), 'limit')
+        if limite is None:
+            limite = LIMITE_PADRAO_HISTORICO
+        ordem = request.args.get('ordem', 'desc')
+        formato = request.args.get('formato', 'json')
+
+        if not 1 <= limite <= LIMITE_MAXIMO_HISTORICO:
+            raise ValueError(f"Parâmetro 'limit' deve estar entre 1 e {LIMITE_MAXIMO_HISTORICO}.")
+        if ordem not in ('asc', 'desc'):
+            raise ValueError("Parâmetro 'ordem' deve ser 'asc' ou 'desc'.")
+        if formato not in ('json', 'ndjson', 'csv'):
+            raise ValueError("Parâmetro 'formato' deve ser 'json', 'ndjson' ou 'csv'.")
+        if compacto and formato != 'json':
+            raise ValueError("Parâmetro 'compacto' só vale para o formato 'json'.")
+
+        historico = sn.get_section('history', snapshot)
+
+        # Exportação: gerada em blocos, sem montar o arquivo inteiro na memória
+        if formato == 'ndjson':
+            return Response(ch.iter_ndjson(historico, de, ate), mimetype='application/x-ndjson')
+        if formato == 'csv':
+            return Response(ch.iter_csv(historico, de, ate), mimetype='text/csv', headers={
+                'Content-Disposition': f"attachment; filename=lotofacil_{snapshot['versao'][:12]}.csv"
+            })
+
+        params = {'from': de, 'to': ate, 'cursor': cursor, 'limit': limite, 'ordem': ordem, 'compacto': compacto}
+
+        def render_pagina():
+            concursos, proximo = ch.page(historico, de, ate, cursor, limite, decrescente=(ordem == 'desc'))
+            resposta = {'success': True, 'concursos': concursos}
+            if compacto:
+                resposta.update(cf.encode_contests(concursos))
+            resposta['proximo_cursor'] = proximo
+            return jsonify(resposta).get_data()
+
+        return rc.cached_response('api_contests_page', params, snapshot['versao'], render_pagina,
+                                  mimetype='application/json')
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
-        from flask import jsonify
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
+# Seções da página com API própria em /api/<secao>
+SECOES_API = ('numbers', 'geographic', 'heatmap', 'pip-distribution', 'cycle-patterns',
+              'cycle-new-numbers', 'cycle-step-frequency')
+
+
+@app.route("/api/<any(%s):secao>" % ", ".join(repr(secao) for secao in SECOES_API))
+def api_section(secao):
+    """
+    API REST com os dados de uma seção da página principal.
+
+    Exemplo de uso:
+        curl http://localhost:5000/api/heatmap
+        curl http://localhost:5000/api/cycle-patterns
+        curl http://localhost:5000/api/heatmap?as_of=2500
+
+    Seções:
+        numbers, geographic, heatmap, pip-distribution, cycle-patterns,
+        cycle-new-numbers, cycle-step-frequency
+
+    Parâmetros:
+        as_of: Número de um concurso; retorna a seção como estava logo após
+            ele (opcional)
+
+    Retorna:
+        {
+            "success": true,
+            "secao": "heatmap",
+            "dados": {...}
+        }
+    """
+    try:
+        snapshot = sn.get_snapshot()
+        concurso = _optional_int(request.args.get('as_of'), 'as_of')
+
+        def render():
+            if concurso is None:
+                resposta = {'success': True, 'secao': secao, 'dados': sn.get_section(secao, snapshot)}
+            else:
+                dados = sn.get_section_as_of(secao, concurso, snapshot)
+                resposta = {'success': True, 'secao': secao, 'as_of': concurso, 'dados': dados}
+            return jsonify(resposta).get_data()
+
+        params = {} if concurso is None else {'as_of': concurso}
+        return rc.cached_response('api_section:' + secao, params, snapshot['versao'], render,
+                                  mimetype='application/json')
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def build_static(forcar=False):
+    """
+    Pré-renderiza a página e as APIs de leitura da versão atual em dist/<versao>/.
+
+    Args:
+        forcar: Gera novamente mesmo que a versão já exista
+
+    Returns:
+        dict: Manifesto do build (ver source/static_build.py)
+    """
+    snapshot = sn.get_snapshot(esperar=True)
+    urls = sb.build_urls(FRAGMENTOS, SECOES_API)
+    return sb.build(app.test_client(), snapshot['versao'], urls,
+                    static_dir=app.static_folder, forcar=forcar)
+
+
+@app.cli.command('build-static')
+@click.option('--forcar', is_flag=True, help="Gera novamente mesmo que a versão já exista.")
+def build_static_command(forcar):
+    """Pré-renderiza o site estático da versão atual dos dados (dist/<versao>/)."""
+    manifesto = build_static(forcar)
+    click.echo(f"Versão {manifesto['versao']}: {manifesto['arquivos']} arquivos "
+               f"({manifesto['bytes'] / 1024:.0f} KiB) em {os.path.join(sb.DIST_DIR, manifesto['versao'])}")
+
+
+# Build estático após cada atualização com dados novos (desligado por padrão)
+if os.environ.get("LOTOPY_BUILD_ESTATICO") == "1":
+    rj.on_update(lambda snapshot: build_static())
+
+
 if __name__ == "__main__":
     # Configurações de segurança
     port = int(os.environ.get("PORT", 5000))
@@ -333,4 +1098,8 @@ if __name__ == "__main__":
     # Desabilitar debug em produção
     debug = os.environ.get("FLASK_ENV") == "development"
 
+    # Agendador de atualização da base (no gunicorn, iniciado nos workers pelo hook post_fork)
+    if rj.scheduler_enabled():
+        rj.start_scheduler()
+
     app.run(host=host, port=port, debug=debug)
@@ -0,0 +1,40 @@
+"""
+Configuração do gunicorn.
+
+Com preload_app, a aplicação é importada uma única vez no processo master,
+que carrega (ou abre a versão já publicada em data/cache/store) e aquece o
+snapshot antes de criar os workers. Os workers herdam o snapshot pronto e,
+quando uma nova versão dos dados é publicada por qualquer processo, trocam
+para ela sem reiniciar (ver source/shared_store.py).
+
+O agendador de atualizações (LOTOPY_AGENDAR_ATUALIZACAO=1) é iniciado em
+cada worker, e não no master: apenas o worker que obtém a trava
+'agendador' agenda, e outro assume se ele terminar. O master só carrega o
+snapshot; atualizações e recálculos rodam nos workers.
+
+Uso:
+    gunicorn --config gunicorn.conf.py flask_app:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '4201')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+timeout = 120
+preload_app = True
+
+
+def when_ready(server):
+    # Roda no master, depois do preload e antes de criar os workers
+    import source.snapshot as sn
+
+    snapshot = sn.warm()
+    server.log.info("Snapshot %s pronto (%d concursos)", snapshot['versao'], snapshot['total_concursos'])
+
+
+def post_fork(server, worker):
+    # Roda em cada worker logo após o fork
+    import source.refresh_jobs as rj
+
+    if rj.scheduler_enabled():
+        rj.start_scheduler()
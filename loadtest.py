@@ -0,0 +1,368 @@
+"""
+Teste de carga local das rotas web, com percentis de latência.
+
+Dispara requisições concorrentes contra flask_app:app, direto pelo WSGI
+(test_client, um por thread) ou contra um gunicorn local iniciado com
+gunicorn.conf.py, e mede vazão e latências p50/p95/p99 por rota e no
+total. A mistura padrão combina `/`, `/?limit=N`, as seções da página,
+`/api/suggestions` e as APIs em lote (conferência e geração de jogos).
+
+Cenários:
+    frio:   diretório de cache novo (sem shared_store nem arrays), snapshot
+            e cache de respostas vazios; as primeiras requisições pagam o
+            cálculo. No gunicorn, o when_ready ainda aquece o snapshot antes
+            dos workers, como em produção.
+    quente: depois de uma passada por todas as rotas.
+
+Os resultados vão para benchmarks/loadtest/<data>-<commit>.json e podem ser
+comparados com um resultado anterior (--comparar).
+
+Uso:
+    python loadtest.py
+    python loadtest.py --concorrencia 16 --requisicoes 2000 --cenarios quente
+    python loadtest.py --modo gunicorn --workers 4 --mix index=1,suggestions=1
+    python loadtest.py --comparar benchmarks/loadtest/<anterior>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+
+from benchmark import git_commit
+
+DIRETORIO_RESULTADOS = os.path.join("benchmarks", "loadtest")
+
+JOGOS_LOTE = [list(range(i, i + 15)) for i in range(1, 11)] * 10
+
+# Rotas disponíveis: nome -> (método, url, corpo JSON)
+ROTAS = {
+    'index': ('GET', '/', None),
+    'index_limit5': ('GET', '/?limit=5', None),
+    'index_limit25': ('GET', '/?limit=25', None),
+    'section_contests': ('GET', '/sections/contests?limit=15', None),
+    'section_heatmap': ('GET', '/sections/heatmap', None),
+    'section_suggestions': ('GET', '/sections/suggestions', None),
+    'suggestions': ('GET', '/api/suggestions', None),
+    'evaluate': ('POST', '/api/tickets/evaluate', {'jogos': JOGOS_LOTE}),
+    'generate': ('GET', '/api/generate?n=100&seed=7', None),
+    'contests_page': ('GET', '/api/contests?limit=100', None),
+}
+
+MIX_PADRAO = ("index=3,index_limit5=1,index_limit25=1,section_contests=2,section_heatmap=1,"
+              "section_suggestions=1,suggestions=3,evaluate=2,generate=2,contests_page=1")
+
+
+def parse_mix(texto):
+    """
+    Lê a mistura de rotas no formato "rota=peso,rota=peso".
+
+    Returns:
+        tuple: (lista de nomes, lista de pesos)
+    """
+    nomes, pesos = [], []
+    for item in texto.split(","):
+        if not item.strip():
+            continue
+        nome, _, peso = item.partition("=")
+        nome = nome.strip()
+        if nome not in ROTAS:
+            raise ValueError(f"Rota desconhecida: {nome} (disponíveis: {', '.join(ROTAS)})")
+        nomes.append(nome)
+        pesos.append(float(peso or 1))
+    if not nomes:
+        raise ValueError("A mistura de rotas está vazia.")
+    return nomes, pesos
+
+
+class WsgiClient:
+    """Cliente que chama o app diretamente (um test_client por thread)."""
+
+    def __init__(self):
+        import flask_app
+        self._app = flask_app.app
+        self._local = threading.local()
+
+    def request(self, metodo, url, corpo):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self._app.test_client()
+        resposta = client.open(url, method=metodo, json=corpo)
+        resposta.get_data()
+        return resposta.status_code
+
+
+class HttpClient:
+    """Cliente HTTP para um servidor local (gunicorn)."""
+
+    def __init__(self, base):
+        self.base = base
+
+    def request(self, metodo, url, corpo):
+        dados = json.dumps(corpo).encode() if corpo is not None else None
+        req = urllib.request.Request(self.base + url, data=dados, method=metodo,
+                                     headers={'Content-Type': 'application/json'} if dados else {})
+        try:
+            with urllib.request.urlopen(req, timeout=300) as resposta:
+                resposta.read()
+                return resposta.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(workers, env):
+    """
+    Inicia um gunicorn local com gunicorn.conf.py e aguarda ele responder.
+
+    Returns:
+        tuple: (processo, url base)
+    """
+    porta = _free_port()
+    env = dict(env, PORT=str(porta), WEB_CONCURRENCY=str(workers))
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "flask_app:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{porta}"
+    limite = time.time() + 600
+    while time.time() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError("gunicorn terminou antes de responder.")
+        try:
+            with urllib.request.urlopen(base + "/metrics", timeout=5):
+                return processo, base
+        except OSError:
+            time.sleep(0.5)
+    processo.terminate()
+    raise RuntimeError("gunicorn não respondeu em 10 minutos.")
+
+
+def _reset_process(cache):
+    """No modo wsgi: aponta os caches em disco para `cache` e descarta snapshot e respostas."""
+    import source.array_cache as ac
+    import source.profiling as prof
+    import source.refresh_jobs as rj
+    import source.response_cache as rc
+    import source.shared_store as ss
+    import source.snapshot as sn
+
+    # Caminhos calculados na importação a partir de CACHE_DIR
+    ac.CACHE_DIR = cache
+    ss.STORE_DIR = os.path.join(cache, "store")
+    ss.PONTEIRO = os.path.join(ss.STORE_DIR, "CURRENT")
+    rj.JOBS_DIR = os.path.join(cache, "jobs")
+    rj.ATIVO = os.path.join(rj.JOBS_DIR, "ATIVO")
+    prof.PROFILE_DIR = os.environ["LOTOPY_PROFILE_DIR"]
+    sn.invalidate()
+    rc.clear()
+
+
+def run_load(cliente, nomes, pesos, requisicoes, concorrencia, seed):
+    """
+    Executa `requisicoes` requisições com `concorrencia` threads.
+
+    Returns:
+        dict: Duração total e, por requisição, (rota, latência, status)
+    """
+    sorteio = random.Random(seed)
+    fila = sorteio.choices(nomes, weights=pesos, k=requisicoes)
+    proxima = iter(range(requisicoes))
+    trava = threading.Lock()
+    amostras = []
+
+    def trabalhador():
+        while True:
+            with trava:
+                i = next(proxima, None)
+            if i is None:
+                return
+            metodo, url, corpo = ROTAS[fila[i]]
+            inicio = time.perf_counter()
+            try:
+                status = cliente.request(metodo, url, corpo)
+            except Exception:
+                status = None
+            duracao = time.perf_counter() - inicio
+            with trava:
+                amostras.append((fila[i], duracao, status))
+
+    threads = [threading.Thread(target=trabalhador) for _ in range(concorrencia)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {'duracao': time.perf_counter() - inicio, 'amostras': amostras}
+
+
+def _stats(latencias, erros, duracao=None):
+    latencias = np.array(latencias) * 1000
+    resultado = {
+        'requisicoes': int(len(latencias)),
+        'erros': erros,
+        'p50_ms': round(float(np.percentile(latencias, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencias, 95)), 2),
+        'p99_ms': round(float(np.percentile(latencias, 99)), 2),
+        'max_ms': round(float(latencias.max()), 2),
+        'media_ms': round(float(latencias.mean()), 2),
+    }
+    if duracao is not None:
+        resultado['duracao_s'] = round(duracao, 3)
+        resultado['vazao_rps'] = round(len(latencias) / duracao, 1)
+    return resultado
+
+
+def summarize(execucao):
+    """Vazão e percentis no total e por rota."""
+    amostras = execucao['amostras']
+    por_rota = {}
+    for rota, duracao, status in amostras:
+        por_rota.setdefault(rota, []).append((duracao, status))
+
+    def erros(itens):
+        return sum(1 for _, status in itens if status is None or status >= 500)
+
+    todas = [(d, s) for _, d, s in amostras]
+    return {
+        'total': _stats([d for d, _ in todas], erros(todas), execucao['duracao']),
+        'rotas': {rota: _stats([d for d, _ in itens], erros(itens)) for rota, itens in sorted(por_rota.items())}
+    }
+
+
+def print_summary(cenario, resumo):
+    total = resumo['total']
+    print(f"\n=== {cenario}: {total['requisicoes']} requisições em {total['duracao_s']}s "
+          f"({total['vazao_rps']} req/s, {total['erros']} erros) ===")
+    print(f"  {'rota':<22} {'n':>6} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+    for rota, s in list(resumo['rotas'].items()) + [('TOTAL', total)]:
+        print(f"  {rota:<22} {s['requisicoes']:>6} {s['p50_ms']:>8.1f}ms {s['p95_ms']:>8.1f}ms "
+              f"{s['p99_ms']:>8.1f}ms {s['max_ms']:>8.1f}ms")
+
+
+def compare(resultados, anterior):
+    """Imprime a razão entre os percentis atuais e os de um resultado anterior."""
+    print(f"\nComparação com {anterior['meta'].get('commit')} ({anterior['meta'].get('data')}):")
+    for cenario, resumo in resultados.items():
+        antes = anterior['resultados'].get(cenario)
+        if not antes:
+            continue
+        print(f"  {cenario}: vazão {antes['total']['vazao_rps']} -> {resumo['total']['vazao_rps']} req/s")
+        for rota, atual in list(resumo['rotas'].items()) + [('TOTAL', resumo['total'])]:
+            velho = antes['total'] if rota == 'TOTAL' else antes['rotas'].get(rota)
+            if not velho:
+                continue
+            razoes = "  ".join(
+                f"{p} {velho[p]:.1f}->{atual[p]:.1f}ms" for p in ('p50_ms', 'p95_ms', 'p99_ms')
+            )
+            marca = "  <-- mais lento" if velho['p95_ms'] and atual['p95_ms'] > velho['p95_ms'] * 1.2 else ""
+            print(f"    {rota:<22} {razoes}{marca}")
+
+
+def run(args):
+    nomes, pesos = parse_mix(args.mix)
+    resultados = {}
+
+    for cenario in args.cenarios.split(","):
+        if cenario not in ("frio", "quente"):
+            raise ValueError(f"Cenário desconhecido: {cenario}")
+
+        # Diretório de cache novo: nada publicado no shared_store nem arrays em disco
+        cache = tempfile.mkdtemp(prefix="lotopy-loadtest-")
+        os.environ["LOTOPY_CACHE_DIR"] = cache
+        os.environ["LOTOPY_PROFILE_DIR"] = os.path.join(cache, "profiles")
+        processo = None
+        try:
+            if args.modo == "gunicorn":
+                processo, base = start_gunicorn(args.workers, os.environ)
+                cliente = HttpClient(base)
+            else:
+                cliente = WsgiClient()
+                _reset_process(cache)
+
+            if cenario == "quente":
+                for nome in nomes:
+                    cliente.request(*ROTAS[nome])
+
+            execucao = run_load(cliente, nomes, pesos, args.requisicoes, args.concorrencia, args.seed)
+        finally:
+            if processo is not None:
+                processo.terminate()
+                processo.wait(timeout=60)
+            shutil.rmtree(cache, ignore_errors=True)
+
+        resultados[cenario] = summarize(execucao)
+        print_summary(cenario, resultados[cenario])
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga local das rotas web")
+    parser.add_argument("--modo", choices=("wsgi", "gunicorn"), default="wsgi",
+                        help="wsgi: chama o app direto; gunicorn: sobe um gunicorn local")
+    parser.add_argument("--workers", type=int, default=2, help="Workers do gunicorn (modo gunicorn)")
+    parser.add_argument("--concorrencia", type=int, default=8, help="Requisições simultâneas")
+    parser.add_argument("--requisicoes", type=int, default=500, help="Requisições por cenário")
+    parser.add_argument("--cenarios", default="frio,quente", help="Cenários: frio, quente")
+    parser.add_argument("--mix", default=MIX_PADRAO, help=f"Rotas e pesos (rotas: {', '.join(ROTAS)})")
+    parser.add_argument("--seed", type=int, default=42, help="Semente da ordem das requisições")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída")
+    parser.add_argument("--comparar", default=None, help="JSON de um resultado anterior para comparação")
+    args = parser.parse_args()
+
+    try:
+        resultados = run(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    commit = git_commit()
+    saida = args.saida or os.path.join(
+        DIRETORIO_RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'sem-commit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'data': datetime.now().isoformat(timespec="seconds"),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'cpus': os.cpu_count(),
+                'modo': args.modo,
+                'workers': args.workers if args.modo == "gunicorn" else None,
+                'concorrencia': args.concorrencia,
+                'requisicoes': args.requisicoes,
+                'mix': args.mix,
+                'seed': args.seed
+            },
+            'resultados': resultados
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            compare(resultados, json.load(f))
+
+
+if __name__ == "__main__":
+    # Adicionar diretório atual ao path para imports funcionarem
+    sys.path.append(os.getcwd())
+    main()
@@ -1,8 +1,8 @@
 import pandas as pd
 
-def adjust_table():
+def adjust_table(path="data/D_lotfac.xlsx"):
     """Função para ajustar a tabela do banco de dados."""
-    df = pd.read_excel("data/D_lotfac.xlsx")
+    df = pd.read_excel(path)
     df = df[
         [
             "Concurso",
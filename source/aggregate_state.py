@@ -0,0 +1,307 @@
+"""
+Módulo de estado agregado incremental das estatísticas do histórico.
+
+O mapa de calor, os totais por região, a distribuição P-I-NP, as
+distribuições por linha e moldura/miolo, as frequências por passo do ciclo
+e os padrões dos ciclos fechados são somas sobre os concursos. O estado
+guarda essas contagens (mais o ciclo em aberto) e pode ser estendido só com
+os concursos novos:
+
+    estado = build_state(df)               # histórico completo, uma vez
+    estado = update_state(estado, df_novo) # df_novo = df + concursos novos
+    heat_map(estado)                       # == global_statistics.calculate_heat_map(df_novo)
+
+As contagens são dicionários na ordem da primeira ocorrência de cada chave,
+a mesma ordem do Counter usado pelas implementações de referência; assim os
+resultados derivados do estado são idênticos (inclusive nos empates) aos de
+global_statistics e cycle_analysis sobre o histórico completo. Isso é
+conferido por verify_aggregates.py.
+
+O estado é um dicionário simples (pode ser gravado com pickle) e não é
+modificado por update_state, que retorna um novo estado.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import source.array_cache as ac
+import source.draw_masks as dm
+import source.fast_analysis as fa
+
+_MOLDURA = np.isin(np.arange(26), list(fa.MOLDURA))
+_MIOLO = np.isin(np.arange(26), list(fa.MIOLO))
+
+
+def _empty_cycle(numero):
+    return {'numero': numero, 'passo': 0, 'acumulado': 0, 'novos': []}
+
+
+def covers(estado, concursos, masks):
+    """
+    Verifica se o estado foi calculado sobre o início deste histórico.
+
+    Args:
+        estado: Estado retornado por build_state/update_state
+        concursos: Array com os números dos concursos do histórico
+        masks: Array com as máscaras dos sorteios do histórico
+
+    Returns:
+        bool: True se os primeiros concursos do histórico são os do estado
+    """
+    n = estado['total_concursos']
+    return n <= len(masks) and ac.data_version(concursos, masks, n) == estado['versao']
+
+
+def build_state(df, masks=None, versao=None):
+    """
+    Calcula o estado agregado de um histórico completo.
+
+    Args:
+        df: DataFrame processado (com as colunas ciclo e config_pip)
+        masks: Máscaras dos sorteios (padrão: calculadas do DataFrame)
+        versao: Versão dos dados (padrão: array_cache.data_version)
+
+    Returns:
+        dict: Estado agregado (contagens e ciclo em aberto)
+    """
+    if masks is None:
+        masks = dm.calculate_masks(df)
+    df = fa._with_cycle(df)
+    bolas = fa._bolas(df)
+    validos = bolas != 0
+    numeros = fa._drawn_numbers(bolas)
+
+    por_linha = np.stack([(validos & ((bolas - 1) // 5 == linha)).sum(axis=1) for linha in range(5)], axis=1)
+    moldura = _MOLDURA[bolas].sum(axis=1)
+    miolo = _MIOLO[bolas].sum(axis=1)
+    codigos_linhas = por_linha @ np.array([16 ** 4, 16 ** 3, 16 ** 2, 16, 1])
+
+    configs = df['config_pip'].dropna().tolist() if 'config_pip' in df.columns else []
+
+    ordem, ciclos, passos, novos, _, depois = fa._cycle_steps(df)
+    bolas_ciclo = bolas[ordem]
+    inicios = np.flatnonzero(passos == 1).tolist()
+    fins = inicios[1:] + [len(passos)]
+    lista_novos = novos.tolist()
+
+    padroes = Counter(
+        "-".join(map(str, lista_novos[inicio:fim]))
+        for inicio, fim in zip(inicios, fins)
+        if depois[fim - 1] == dm.MASCARA_TODOS
+    )
+
+    novos_por_passo = {}
+    for passo, qtd in zip(passos.tolist(), lista_novos):
+        if passo > 1:
+            contagem = novos_por_passo.setdefault(passo, {})
+            contagem[qtd] = contagem.get(qtd, 0) + 1
+
+    frequencia_por_passo = {}
+    for passo in range(1, int(passos.max()) + 1 if len(passos) else 1):
+        sorteados = fa._drawn_numbers(bolas_ciclo[passos == passo])
+        if len(sorteados):
+            frequencia_por_passo[passo] = dict(fa._items(*fa._counter_items(sorteados)))
+
+    # Ciclo em aberto: o último, se ainda não completou os 25 números
+    if not len(passos):
+        ciclo = _empty_cycle(1)
+    elif depois[-1] == dm.MASCARA_TODOS:
+        ciclo = _empty_cycle(int(ciclos[-1]) + 1)
+    else:
+        ciclo = {
+            'numero': int(ciclos[-1]),
+            'passo': int(passos[-1]),
+            'acumulado': int(depois[-1]),
+            'novos': lista_novos[inicios[-1]:]
+        }
+
+    return {
+        'versao': versao or ac.data_version(df['Concurso'].to_numpy(), masks),
+        'total_concursos': len(df),
+        'contagens': np.bincount(numeros, minlength=26).tolist(),
+        'total_numeros': int(validos.sum()),
+        'linhas': por_linha.sum(axis=0).tolist(),
+        'moldura': int(moldura.sum()),
+        'miolo': int(miolo.sum()),
+        'distribuicoes_linhas': dict(fa._items(*fa._counter_items(codigos_linhas))),
+        'distribuicoes_moldura': dict(fa._items(*fa._counter_items(moldura * 16 + miolo))),
+        'config_pip': dict(Counter(configs)),
+        'padroes_ciclo': dict(padroes),
+        'novos_por_passo': novos_por_passo,
+        'frequencia_por_passo': frequencia_por_passo,
+        'ciclo': ciclo
+    }
+
+
+def _add(contagens, chave, qtd=1):
+    contagens[chave] = contagens.get(chave, 0) + qtd
+
+
+def _copy(estado):
+    """Cópia do estado com novas instâncias de tudo o que update_state modifica."""
+    novo = dict(estado)
+    for chave in ('contagens', 'linhas'):
+        novo[chave] = list(estado[chave])
+    for chave in ('distribuicoes_linhas', 'distribuicoes_moldura', 'config_pip', 'padroes_ciclo'):
+        novo[chave] = dict(estado[chave])
+    for chave in ('novos_por_passo', 'frequencia_por_passo'):
+        novo[chave] = {passo: dict(contagens) for passo, contagens in estado[chave].items()}
+    novo['ciclo'] = dict(estado['ciclo'], novos=list(estado['ciclo']['novos']))
+    return novo
+
+
+def _new_rows(df, n):
+    """Bolas dos concursos a partir da linha n (0 onde não há número)."""
+    if len(df) - n > 64:
+        return fa._bolas(df.iloc[n:]).tolist()
+    # Poucos concursos: ler célula a célula evita converter as colunas inteiras
+    colunas = [df[campo] for campo in dm.LST_CAMPOS]
+    return [
+        [0 if pd.isna(valor) else int(valor) for valor in (coluna.iat[i] for coluna in colunas)]
+        for i in range(n, len(df))
+    ]
+
+
+def update_state(estado, df, masks=None, versao=None, conferir=True):
+    """
+    Estende o estado com os concursos do histórico que ele ainda não inclui.
+
+    Apenas os concursos novos são percorridos; o custo não depende do
+    tamanho do histórico (exceto pela conferência da versão). Com
+    conferir=False (ex: checkpoints de as_of_index, que partem do checkpoint
+    anterior do mesmo histórico) a conferência é omitida e o custo depende
+    só dos concursos novos; a versão do novo estado é a informada (None se
+    omitida), então ele não passa em covers() sem uma versão real.
+
+    Args:
+        estado: Estado calculado sobre o início deste histórico
+        df: DataFrame processado com o histórico completo
+        masks: Máscaras dos sorteios do histórico (padrão: calculadas do DataFrame)
+        versao: Versão dos dados do histórico (padrão: array_cache.data_version)
+        conferir: Se False, confia que o estado é do início deste histórico
+
+    Returns:
+        dict: Novo estado, igual a build_state(df) (exceto 'versao' sem conferência)
+
+    Raises:
+        ValueError: Se o estado não corresponde ao início do histórico
+    """
+    n = estado['total_concursos']
+    if masks is None:
+        masks = dm.calculate_masks(df)
+    if conferir:
+        concursos = df['Concurso'].to_numpy()
+        if not covers(estado, concursos, masks):
+            raise ValueError("O estado agregado não corresponde ao início deste histórico.")
+        versao = versao or ac.data_version(concursos, masks)
+
+    novo = _copy(estado)
+    novo['versao'] = versao
+    novo['total_concursos'] = len(df)
+
+    bolas = _new_rows(df, n)
+    configs = df['config_pip'].iloc[n:].tolist() if 'config_pip' in df.columns else [None] * len(bolas)
+    ciclo = novo['ciclo']
+
+    for linha, mask, config in zip(bolas, masks[n:].tolist(), configs):
+        sorteados = [num for num in linha if num]
+        por_linha = [0] * 5
+        for num in sorteados:
+            novo['contagens'][num] += 1
+            por_linha[(num - 1) // 5] += 1
+        moldura = sum(1 for num in sorteados if num in fa.MOLDURA)
+        miolo = sum(1 for num in sorteados if num in fa.MIOLO)
+
+        novo['total_numeros'] += len(sorteados)
+        novo['linhas'] = [total + qtd for total, qtd in zip(novo['linhas'], por_linha)]
+        novo['moldura'] += moldura
+        novo['miolo'] += miolo
+        _add(novo['distribuicoes_linhas'], sum(qtd * 16 ** (4 - i) for i, qtd in enumerate(por_linha)))
+        _add(novo['distribuicoes_moldura'], moldura * 16 + miolo)
+        if config is not None and config == config:  # ignora NaN
+            _add(novo['config_pip'], config)
+
+        # Ciclo em aberto
+        qtd_novos = bin(mask & ~ciclo['acumulado']).count("1")
+        ciclo['acumulado'] |= mask
+        ciclo['passo'] += 1
+        ciclo['novos'].append(qtd_novos)
+        passo = ciclo['passo']
+        if passo > 1:
+            _add(novo['novos_por_passo'].setdefault(passo, {}), qtd_novos)
+        frequencias = novo['frequencia_por_passo'].setdefault(passo, {})
+        for num in sorteados:
+            _add(frequencias, num)
+
+        if ciclo['acumulado'] == dm.MASCARA_TODOS:
+            _add(novo['padroes_ciclo'], "-".join(map(str, ciclo['novos'])))
+            ciclo = novo['ciclo'] = _empty_cycle(ciclo['numero'] + 1)
+
+    return novo
+
+
+# --- resultados derivados --------------------------------------------------------
+
+def heat_map(estado):
+    """Mesmo resultado de global_statistics.calculate_heat_map."""
+    return fa._heat_map_result(estado['contagens'], estado['total_numeros'], estado['total_concursos'])
+
+
+def geographic(estado):
+    """Mesmo resultado de global_statistics.calculate_consolidated_geographic_analysis."""
+    return fa._geographic_result(
+        estado['linhas'], estado['moldura'], estado['miolo'],
+        estado['total_numeros'], estado['total_concursos'],
+        list(estado['distribuicoes_linhas'].items()), list(estado['distribuicoes_moldura'].items())
+    )
+
+
+def numbers_status(estado):
+    """Mesmo resultado de number_frequency.get_numbers_status_in_cycle."""
+    ciclo = estado['ciclo']
+    if ciclo['passo']:
+        no_ciclo = ciclo['acumulado']
+    else:
+        # Último concurso fechou o ciclo: o "último ciclo" é o fechado (todos os números)
+        no_ciclo = dm.MASCARA_TODOS if estado['total_concursos'] else 0
+    numeros_no_ciclo = set(dm.mask_to_numbers(no_ciclo))
+
+    df_freq = pd.DataFrame([
+        {"numero": num, "frequencia": estado['contagens'][num]}
+        for num in range(1, 26)
+    ])
+    df_freq["no_ciclo_atual"] = df_freq["numero"].apply(lambda x: x in numeros_no_ciclo)
+    return df_freq
+
+
+def pip_distribution(estado):
+    """Mesmo resultado de global_statistics.calculate_global_pip_distribution."""
+    total = sum(estado['config_pip'].values())
+    return {
+        'total_concursos': total,
+        'distribuicao': [
+            {'config': config, 'frequencia': count, 'percentual': round((count / total) * 100, 2)}
+            for config, count in fa._most_common_items(estado['config_pip'].items(), 10)
+        ]
+    }
+
+
+def cycle_exit_patterns(estado):
+    """Mesmo resultado de cycle_analysis.analyze_cycle_exit_patterns."""
+    return fa._exit_patterns_result(estado['padroes_ciclo'])
+
+
+def new_numbers_distribution(estado):
+    """Mesmo resultado de cycle_analysis.analyze_new_numbers_distribution."""
+    return fa._new_numbers_result({
+        passo: list(contagens.items()) for passo, contagens in estado['novos_por_passo'].items()
+    })
+
+
+def frequency_by_cycle_step(estado, max_steps=4):
+    """Mesmo resultado de cycle_analysis.analyze_frequency_by_cycle_step."""
+    return fa._step_frequency_result({
+        passo: list(contagens.items()) for passo, contagens in estado['frequencia_por_passo'].items()
+    }, max_steps)
@@ -0,0 +1,39 @@
+"""
+Módulo da versão dos dados e do diretório de cache em disco.
+
+A versão dos dados é um hash dos números dos concursos e das máscaras dos
+sorteios. Como o histórico só cresce no final, a versão dos primeiros N
+concursos permite conferir se um estado calculado para uma versão anterior
+continua válido quando novos concursos chegam — basta estendê-lo com os
+concursos novos em vez de recalcular tudo (ver snapshot._extend_sections).
+As estruturas calculadas são guardadas como seções do snapshot, em
+shared_store.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+# Diretório dos arquivos de cache (pode ser alterado pela variável de ambiente)
+CACHE_DIR = os.environ.get("LOTOPY_CACHE_DIR", os.path.join("data", "cache"))
+
+
+def data_version(concursos, masks, n=None):
+    """
+    Calcula a versão (hash) dos dados considerando os primeiros n concursos.
+
+    Args:
+        concursos: Array com os números dos concursos
+        masks: Array uint32 com as máscaras dos sorteios
+        n: Quantidade de concursos considerada (padrão: todos)
+
+    Returns:
+        str: Hash hexadecimal de 16 caracteres
+    """
+    if n is None:
+        n = len(masks)
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(concursos[:n], dtype=np.int64).tobytes())
+    h.update(np.ascontiguousarray(masks[:n], dtype=np.uint32).tobytes())
+    return h.hexdigest()[:16]
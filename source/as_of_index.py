@@ -0,0 +1,126 @@
+"""
+Módulo de consultas "como estava após o concurso N" (as_of).
+
+Para pesquisa e backtesting, as estatísticas e as sugestões podem ser vistas
+exatamente como a página as mostraria logo após um concurso anterior. Em vez
+de recortar o DataFrame e recalcular tudo, o índice guarda o estado agregado
+(source/aggregate_state.py) a cada PASSO_CHECKPOINT concursos:
+
+    indice = build_index(df, masks)
+    k = position(indice, 2500)                  # concursos até o 2500, inclusive
+    estado = state_at(indice, df, masks, k)     # checkpoint + no máximo 127 concursos
+    aggregate_state.heat_map(estado)            # == calculate_heat_map(df.iloc[:k])
+
+O ciclo em aberto faz parte do estado, e o ciclo de cada concurso já está
+na coluna `ciclo`. Cada checkpoint parte do anterior sem reconferir a versão
+do histórico (update_state com conferir=False): montar o índice é O(n) e
+uma consulta percorre no máximo PASSO_CHECKPOINT - 1 concursos.
+
+As sugestões NÃO partem dos checkpoints: as estratégias dependem de mais
+do que as contagens do estado (janelas recentes, transições de repetição,
+combinações já sorteadas), então suggestions_at executa as versões
+vetorizadas das estratégias (fast_analysis) sobre o prefixo do histórico,
+com custo O(k). As respostas de /api/suggestions?as_of=N ficam no cache de
+respostas por concurso e versão dos dados.
+"""
+
+import numpy as np
+
+import source.aggregate_state as agg
+import source.combination_index as ci
+import source.fast_analysis as fa
+import source.game_suggestions as gs
+
+# Intervalo (em concursos) entre dois checkpoints do estado agregado
+PASSO_CHECKPOINT = 128
+
+# Versões vetorizadas das estratégias (as demais seguem a implementação de game_suggestions)
+FUNCOES_VETORIZADAS = {
+    nome: getattr(fa, nome)
+    for nome in dir(fa) if nome.startswith("generate_") and hasattr(gs, nome)
+}
+
+
+def build_index(df, masks):
+    """
+    Monta o índice de checkpoints do estado agregado.
+
+    Args:
+        df: DataFrame processado (com as colunas ciclo e config_pip)
+        masks: Máscaras dos sorteios
+
+    Returns:
+        dict: {'concursos': array com os números dos concursos,
+               'checkpoints': estados após 0, PASSO, 2*PASSO, ... concursos}
+    """
+    estado = agg.build_state(df.iloc[:0], masks[:0])
+    checkpoints = [estado]
+    for fim in range(PASSO_CHECKPOINT, len(df) + 1, PASSO_CHECKPOINT):
+        estado = agg.update_state(estado, df.iloc[:fim], masks[:fim], conferir=False)
+        checkpoints.append(estado)
+    return {
+        'concursos': df['Concurso'].to_numpy(),
+        'checkpoints': checkpoints
+    }
+
+
+def position(indice, concurso):
+    """
+    Quantidade de concursos do histórico até o concurso informado (inclusive).
+
+    Args:
+        indice: Índice retornado por build_index
+        concurso: Número do concurso
+
+    Returns:
+        int: Tamanho do prefixo do histórico
+
+    Raises:
+        ValueError: Se o concurso não existe no histórico
+    """
+    encontrados = np.flatnonzero(indice['concursos'] == concurso)
+    if not len(encontrados):
+        raise ValueError(f"Concurso {concurso} não encontrado no histórico.")
+    return int(encontrados[0]) + 1
+
+
+def state_at(indice, df, masks, k):
+    """
+    Estado agregado dos primeiros k concursos.
+
+    Args:
+        indice: Índice retornado por build_index
+        df: DataFrame usado em build_index
+        masks: Máscaras usadas em build_index
+        k: Tamanho do prefixo (ver position)
+
+    Returns:
+        dict: Estado igual a aggregate_state.build_state(df.iloc[:k]), sem
+        a versão dos dados ('versao' é None, exceto no estado inicial)
+    """
+    estado = indice['checkpoints'][k // PASSO_CHECKPOINT]
+    if estado['total_concursos'] == k:
+        return estado
+    return agg.update_state(estado, df.iloc[:k], masks[:k], conferir=False)
+
+
+def suggestions_at(df, k, masks=None):
+    """
+    Sugestões que a página mostraria com os primeiros k concursos.
+
+    Recalcula as estratégias sobre o prefixo (O(k)); ver a nota do módulo.
+
+    Args:
+        df: DataFrame processado
+        k: Tamanho do prefixo (ver position)
+        masks: Máscaras dos sorteios do histórico (padrão: calculadas do prefixo)
+
+    Returns:
+        list: Mesmo resultado de game_suggestions.generate_suggestions(df.iloc[:k], num_games=None)
+    """
+    prefixo = df.iloc[:k]
+    masks = masks[:k] if masks is not None else None
+    return gs.generate_suggestions(
+        prefixo, num_games=None, funcoes=FUNCOES_VETORIZADAS, masks=masks,
+        indice_sorteados=ci.build_drawn_index(prefixo, masks)
+    )
@@ -0,0 +1,222 @@
+"""
+Módulo de índice das combinações de 15 números da Lotofácil.
+
+Cada combinação de 15 números é mapeada para sua posição (rank) no sistema
+combinatorial de numeração (ordem colexicográfica), um inteiro único entre
+0 e C(25, 15) - 1 = 3.268.759:
+
+    rank = C(c1, 1) + C(c2, 2) + ... + C(c15, 15)
+
+onde c1 < c2 < ... < c15 são os números da combinação menos 1 (0 a 24).
+
+O rank serve como identificador compacto de um jogo (cabe em um int32) e
+permite indexar todos os sorteios já realizados para responder em O(1)
+se uma combinação já saiu e para excluir resultados passados das sugestões.
+"""
+
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+
+import source.draw_masks as dm
+
+NUMEROS_POR_JOGO = 15
+
+# Total de combinações possíveis: C(25, 15) = 3.268.760
+TOTAL_COMBINACOES = comb(25, NUMEROS_POR_JOGO)
+
+# Tabela de coeficientes binomiais: _BINOM[n, k] = C(n, k)
+_BINOM = np.array(
+    [[comb(n, k) for k in range(NUMEROS_POR_JOGO + 2)] for n in range(26)],
+    dtype=np.int64
+)
+
+
+def combination_rank(numeros):
+    """
+    Calcula o rank colexicográfico de uma combinação de 15 números.
+
+    Args:
+        numeros: Lista com 15 números distintos de 1 a 25
+
+    Returns:
+        int: Rank entre 0 e 3.268.759
+
+    Raises:
+        ValueError: Se a combinação não tiver 15 números distintos entre 1 e 25
+    """
+    valores = sorted(set(int(n) for n in numeros))
+    if len(valores) != NUMEROS_POR_JOGO or valores[0] < 1 or valores[-1] > 25:
+        raise ValueError("A combinação deve ter 15 números distintos entre 1 e 25.")
+
+    return sum(comb(numero - 1, i) for i, numero in enumerate(valores, 1))
+
+
+def combination_unrank(rank):
+    """
+    Converte um rank colexicográfico de volta para a combinação de 15 números.
+
+    Args:
+        rank: Inteiro entre 0 e 3.268.759
+
+    Returns:
+        list: Lista ordenada com os 15 números da combinação
+
+    Raises:
+        ValueError: Se o rank estiver fora do intervalo válido
+    """
+    rank = int(rank)
+    if rank < 0 or rank >= TOTAL_COMBINACOES:
+        raise ValueError(f"Rank deve estar entre 0 e {TOTAL_COMBINACOES - 1}.")
+
+    numeros = []
+    c = 25
+    for i in range(NUMEROS_POR_JOGO, 0, -1):
+        # Maior c tal que C(c, i) <= rank
+        c -= 1
+        while comb(c, i) > rank:
+            c -= 1
+        rank -= comb(c, i)
+        numeros.append(c + 1)
+
+    return sorted(numeros)
+
+
+def masks_to_ranks(masks):
+    """
+    Calcula o rank de várias combinações (máscaras de 15 bits ligados) de forma vetorizada.
+
+    Args:
+        masks: Array de máscaras de bits com 15 números cada
+
+    Returns:
+        np.ndarray: Array int32 com o rank de cada máscara
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    bits = ((masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1).astype(np.int64)
+
+    # Posição (1-based) de cada bit ligado dentro da combinação
+    posicoes = np.cumsum(bits, axis=1)
+    posicoes = np.minimum(posicoes, NUMEROS_POR_JOGO + 1)
+
+    termos = _BINOM[np.arange(25), posicoes] * bits
+    return termos.sum(axis=1).astype(np.int32)
+
+
+def ranks_to_masks(ranks):
+    """
+    Converte vários ranks em máscaras de bits de forma vetorizada.
+
+    Args:
+        ranks: Array de ranks entre 0 e 3.268.759
+
+    Returns:
+        np.ndarray: Array uint32 com a máscara de cada combinação
+    """
+    restante = np.asarray(ranks, dtype=np.int64).copy()
+    masks = np.zeros(len(restante), dtype=np.uint32)
+
+    for i in range(NUMEROS_POR_JOGO, 0, -1):
+        # Maior c tal que C(c, i) <= restante (a coluna é não decrescente em c)
+        c = np.searchsorted(_BINOM[:25, i], restante, side="right") - 1
+        restante -= _BINOM[c, i]
+        masks |= np.left_shift(np.uint32(1), c.astype(np.uint32))
+
+    return masks
+
+
+@lru_cache(maxsize=1)
+def all_combination_masks():
+    """
+    Retorna a tabela com as máscaras de todas as 3.268.760 combinações, indexada pelo rank.
+
+    A tabela ocupa cerca de 13 MB e é calculada uma única vez por processo.
+    Sortear um rank uniforme e consultar a tabela equivale a sortear um
+    concurso aleatório da Lotofácil.
+
+    Returns:
+        np.ndarray: Array uint32 (somente leitura) onde o índice é o rank
+    """
+    masks = ranks_to_masks(np.arange(TOTAL_COMBINACOES, dtype=np.int64))
+    masks.flags.writeable = False
+    return masks
+
+
+def build_drawn_index(df, masks=None):
+    """
+    Cria o índice de todas as combinações já sorteadas.
+
+    Args:
+        df: DataFrame com as colunas Concurso, Bola1, ..., Bola15
+        masks: Máscaras já calculadas (opcional, na ordem do DataFrame)
+
+    Returns:
+        dict: Dicionário com:
+            - ranks: array int32 ordenado com os ranks distintos já sorteados
+            - concursos: dicionário {rank: [concursos em que a combinação saiu]}
+    """
+    if masks is None:
+        masks = dm.calculate_masks(df)
+    masks = np.asarray(masks, dtype=np.uint32)
+    completos = dm.popcount(masks) == NUMEROS_POR_JOGO
+    ranks = masks_to_ranks(masks[completos])
+    concursos = df["Concurso"].to_numpy()[completos]
+
+    concursos_por_rank = {}
+    for rank, concurso in zip(ranks.tolist(), concursos.tolist()):
+        concursos_por_rank.setdefault(rank, []).append(int(concurso))
+
+    return {
+        'ranks': np.unique(ranks),
+        'concursos': concursos_por_rank
+    }
+
+
+def get_drawn_contests(index, numeros):
+    """
+    Retorna os concursos em que uma combinação já foi sorteada.
+
+    Args:
+        index: Índice criado por build_drawn_index()
+        numeros: Lista com 15 números
+
+    Returns:
+        list: Concursos em que a combinação saiu (vazia se nunca saiu)
+    """
+    return list(index['concursos'].get(combination_rank(numeros), []))
+
+
+def is_drawn(index, numeros):
+    """
+    Verifica em O(1) se uma combinação de 15 números já foi sorteada.
+
+    Args:
+        index: Índice criado por build_drawn_index()
+        numeros: Lista com 15 números
+
+    Returns:
+        bool: True se a combinação já saiu em algum concurso
+    """
+    return combination_rank(numeros) in index['concursos']
+
+
+def filter_not_drawn(index, masks):
+    """
+    Indica, de forma vetorizada, quais combinações ainda não foram sorteadas.
+
+    Args:
+        index: Índice criado por build_drawn_index()
+        masks: Array de máscaras com 15 números cada
+
+    Returns:
+        np.ndarray: Array booleano (True = combinação nunca sorteada)
+    """
+    ranks = masks_to_ranks(masks)
+    sorteados = index['ranks']
+    if len(sorteados) == 0:
+        return np.ones(len(ranks), dtype=bool)
+
+    posicoes = np.searchsorted(sorteados, ranks)
+    posicoes = np.minimum(posicoes, len(sorteados) - 1)
+    return sorteados[posicoes] != ranks
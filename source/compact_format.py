@@ -0,0 +1,80 @@
+"""
+Módulo do formato compacto de concursos e jogos (?compacto=1).
+
+No formato normal cada concurso leva a lista dos 15 números, a lista dos
+novos no ciclo e uma dúzia de contagens (P-I-NP, moldura/miolo, linhas,
+quadrantes, cruz), e cada cartela da página são 25 células de HTML. Todas
+essas contagens são função da máscara de 25 bits do sorteio
+(source/draw_masks.py), então o formato compacto envia só:
+
+    {
+        "formato": "compacto",
+        "regioes": {"pares": 11184810, ..., "cruz": 4357252},
+        "campos": ["concurso", "data", "mask", "novos", "ciclo"],
+        "concursos": [[3575, "30/12/2025", 20020186, 2106178, 759], ...]
+    }
+
+Cada linha é um array na ordem de "campos"; "mask" e "novos" são máscaras
+(bit n - 1 = número n) e as regiões vão uma única vez no cabeçalho. O
+navegador (static/script.js) recupera números e contagens com operações de
+bits: números = bits ligados de mask, moldura = popcount(mask & regioes.moldura),
+novos/repetidos = popcount(novos) e 15 - popcount(novos), e assim por diante.
+"""
+
+import source.draw_masks as dm
+
+# Campos de cada linha no formato compacto
+CAMPOS_CONCURSO = ['concurso', 'data', 'mask', 'novos', 'ciclo']
+CAMPOS_SUGESTAO = ['estrategia', 'descricao', 'mask']
+CAMPOS_SUGESTAO_PAGINA = CAMPOS_SUGESTAO + ['ciclo_count']
+
+
+def enabled(valor):
+    """Interpreta o parâmetro 'compacto' da requisição (1/true/sim)."""
+    return str(valor or '').lower() in ('1', 'true', 'sim')
+
+
+def _header(campos):
+    return {'formato': 'compacto', 'regioes': dict(dm.REGIOES), 'campos': list(campos)}
+
+
+def encode_contests(concursos):
+    """
+    Codifica linhas de concursos (seção 'contests' ou contest_history) no formato compacto.
+
+    Args:
+        concursos: Linhas com concurso, data, numeros, novos_set e ciclo
+
+    Returns:
+        dict: Cabeçalho (formato, regioes, campos) e 'concursos' (uma lista por concurso)
+    """
+    compacto = _header(CAMPOS_CONCURSO)
+    compacto['concursos'] = [
+        [linha['concurso'], linha['data'], dm.numbers_to_mask(linha['numeros']),
+         dm.numbers_to_mask(linha['novos_set']), linha['ciclo']]
+        for linha in concursos
+    ]
+    return compacto
+
+
+def encode_suggestions(sugestoes):
+    """
+    Codifica sugestões de jogos no formato compacto.
+
+    Sugestões da página (com 'ciclo_count') levam também essa contagem, que
+    depende do ciclo atual e não só da máscara do jogo.
+
+    Args:
+        sugestoes: Sugestões com estrategia, descricao e numeros
+
+    Returns:
+        dict: Cabeçalho (formato, regioes, campos) e 'sugestoes' (uma lista por jogo)
+    """
+    campos = CAMPOS_SUGESTAO_PAGINA if sugestoes and 'ciclo_count' in sugestoes[0] else CAMPOS_SUGESTAO
+    compacto = _header(campos)
+    compacto['sugestoes'] = [
+        [sugestao['estrategia'], sugestao['descricao'], dm.numbers_to_mask(sugestao['numeros'])]
+        + ([sugestao['ciclo_count']] if 'ciclo_count' in campos else [])
+        for sugestao in sugestoes
+    ]
+    return compacto
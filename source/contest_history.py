@@ -0,0 +1,210 @@
+"""
+Módulo de consulta e exportação do histórico completo de concursos.
+
+O histórico é mantido como arrays (concurso, data, máscara, ciclo e máscara
+acumulada do ciclo). As linhas enriquecidas — números, ciclo, P-I-NP,
+moldura/miolo, linhas, quadrantes, cruz e novos/repetidos no ciclo — são
+calculadas de forma vetorizada em blocos e entregues por geradores, então
+paginar ou exportar todo o histórico usa memória constante.
+
+A paginação é por chave (keyset) no número do concurso: o cursor é o último
+concurso entregue e a próxima página começa logo depois dele.
+"""
+
+import csv
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+import source.draw_masks as dm
+
+# Linhas enriquecidas calculadas por bloco nos geradores
+TAMANHO_BLOCO = 1024
+
+# Colunas da exportação CSV (números em uma coluna, separados por "-")
+COLUNAS_CSV = [
+    'concurso', 'data', 'numeros', 'ciclo', 'config_pip', 'moldura', 'miolo',
+    'linha1', 'linha2', 'linha3', 'linha4', 'linha5', 'distribuicao_linhas',
+    'q1', 'q2', 'q3', 'q4', 'cruz', 'novos_ciclo', 'repetidos_ciclo'
+]
+
+
+def _format_date(data_sorteio):
+    """Formata a data do sorteio como na página principal."""
+    if pd.notna(data_sorteio):
+        if hasattr(data_sorteio, 'strftime'):
+            return data_sorteio.strftime('%d/%m/%Y')
+        return str(data_sorteio)
+    return ''
+
+
+def build_history(df, masks=None):
+    """
+    Monta os arrays do histórico, ordenados por concurso.
+
+    Args:
+        df: DataFrame com as colunas Concurso, Data Sorteio e Bola1..Bola15
+        masks: Máscaras já calculadas (opcional, na ordem do DataFrame)
+
+    Returns:
+        dict: Arrays concursos, datas, masks, ciclos e acumulados
+    """
+    if masks is None:
+        masks = dm.calculate_masks(df)
+    concursos = df['Concurso'].to_numpy(dtype=np.int64)
+
+    ordem = np.argsort(concursos, kind='stable')
+    masks = np.asarray(masks, dtype=np.uint32)[ordem]
+    ciclos, acumulados = dm.calculate_cycles(masks)
+
+    return {
+        'concursos': concursos[ordem],
+        'datas': np.array([_format_date(d) for d in df['Data Sorteio'].to_numpy()[ordem]], dtype=object),
+        'masks': masks,
+        'ciclos': ciclos,
+        'acumulados': acumulados
+    }
+
+
+def _block_rows(historico, indices):
+    """Calcula as linhas enriquecidas dos índices informados (vetorizado)."""
+    masks = historico['masks'][indices]
+    acumulados = historico['acumulados'][indices]
+    regioes = dm.region_counts(masks)
+    novos = dm.popcount(masks & ~acumulados)
+    numeros = dm.masks_to_number_matrix(masks).tolist()
+    masks_novos = (masks & ~acumulados).tolist()
+
+    colunas = {nome: valores.tolist() for nome, valores in regioes.items()}
+    concursos = historico['concursos'][indices].tolist()
+    datas = historico['datas'][indices].tolist()
+    ciclos = historico['ciclos'][indices].tolist()
+    novos = novos.tolist()
+
+    for i in range(len(concursos)):
+        linhas = [colunas[f'linha{k}'][i] for k in range(1, 6)]
+        yield {
+            'concurso': concursos[i],
+            'data': datas[i],
+            'numeros': numeros[i],
+            'ciclo': ciclos[i],
+            'config_pip': f"{colunas['pares'][i]}P-{colunas['impares'][i]}I-{colunas['primos'][i]}NP",
+            'moldura': colunas['moldura'][i],
+            'miolo': colunas['miolo'][i],
+            'linha1': linhas[0],
+            'linha2': linhas[1],
+            'linha3': linhas[2],
+            'linha4': linhas[3],
+            'linha5': linhas[4],
+            'distribuicao_linhas': '-'.join(str(q) for q in linhas),
+            'q1': colunas['q1'][i],
+            'q2': colunas['q2'][i],
+            'q3': colunas['q3'][i],
+            'q4': colunas['q4'][i],
+            'cruz': colunas['cruz'][i],
+            'novos_ciclo': novos[i],
+            'repetidos_ciclo': len(numeros[i]) - novos[i],
+            'novos_set': dm.mask_to_numbers(masks_novos[i])
+        }
+
+
+def _range(historico, de=None, ate=None):
+    """Intervalo [início, fim) de índices com concurso entre `de` e `ate` (inclusive)."""
+    concursos = historico['concursos']
+    inicio = 0 if de is None else int(np.searchsorted(concursos, de, side='left'))
+    fim = len(concursos) if ate is None else int(np.searchsorted(concursos, ate, side='right'))
+    return inicio, max(inicio, fim)
+
+
+def iter_rows(historico, de=None, ate=None, decrescente=False):
+    """
+    Gera as linhas enriquecidas de um intervalo de concursos, em blocos.
+
+    Args:
+        historico: Histórico criado por build_history()
+        de: Primeiro concurso (inclusive, padrão: o primeiro)
+        ate: Último concurso (inclusive, padrão: o último)
+        decrescente: Se True, do concurso mais recente para o mais antigo
+
+    Yields:
+        dict: Linha enriquecida de cada concurso
+    """
+    inicio, fim = _range(historico, de, ate)
+    if decrescente:
+        for bloco_fim in range(fim, inicio, -TAMANHO_BLOCO):
+            indices = np.arange(bloco_fim - 1, max(inicio, bloco_fim - TAMANHO_BLOCO) - 1, -1)
+            yield from _block_rows(historico, indices)
+    else:
+        for bloco_inicio in range(inicio, fim, TAMANHO_BLOCO):
+            yield from _block_rows(historico, np.arange(bloco_inicio, min(fim, bloco_inicio + TAMANHO_BLOCO)))
+
+
+def page(historico, de=None, ate=None, cursor=None, limite=25, decrescente=True):
+    """
+    Retorna uma página do histórico com paginação por chave (keyset).
+
+    Args:
+        historico: Histórico criado por build_history()
+        de: Primeiro concurso do intervalo (inclusive)
+        ate: Último concurso do intervalo (inclusive)
+        cursor: Último concurso da página anterior (a página começa depois dele)
+        limite: Quantidade máxima de concursos na página
+        decrescente: Ordem da página (padrão: mais recentes primeiro)
+
+    Returns:
+        tuple: (lista de linhas, próximo cursor ou None se não houver mais páginas)
+    """
+    inicio, fim = _range(historico, de, ate)
+    concursos = historico['concursos']
+
+    if cursor is not None:
+        if decrescente:
+            fim = min(fim, int(np.searchsorted(concursos, cursor, side='left')))
+        else:
+            inicio = max(inicio, int(np.searchsorted(concursos, cursor, side='right')))
+
+    if decrescente:
+        indices = np.arange(fim - 1, max(inicio, fim - limite) - 1, -1)
+        restantes = max(0, fim - limite - inicio)
+    else:
+        indices = np.arange(inicio, min(fim, inicio + limite))
+        restantes = max(0, fim - (inicio + limite))
+
+    linhas = list(_block_rows(historico, indices)) if len(indices) else []
+    proximo = linhas[-1]['concurso'] if linhas and restantes > 0 else None
+    return linhas, proximo
+
+
+def iter_ndjson(historico, de=None, ate=None):
+    """
+    Exporta o histórico enriquecido em NDJSON (uma linha JSON por concurso).
+
+    Yields:
+        str: Linhas NDJSON, em ordem crescente de concurso
+    """
+    for linha in iter_rows(historico, de, ate):
+        yield json.dumps(linha, ensure_ascii=False) + "\n"
+
+
+def iter_csv(historico, de=None, ate=None):
+    """
+    Exporta o histórico enriquecido em CSV, um bloco de linhas por vez.
+
+    Yields:
+        str: Cabeçalho e blocos de linhas CSV, em ordem crescente de concurso
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUNAS_CSV)
+
+    for i, linha in enumerate(iter_rows(historico, de, ate), start=1):
+        linha = dict(linha, numeros='-'.join(str(n) for n in linha['numeros']))
+        writer.writerow([linha[coluna] for coluna in COLUNAS_CSV])
+        if i % TAMANHO_BLOCO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
@@ -0,0 +1,252 @@
+"""
+Módulo de coocorrência de números (duplas e trios) nos sorteios da Lotofácil.
+
+Mantém a contagem de quantas vezes cada dupla e cada trio de números saiu
+no mesmo concurso:
+
+- duplas: matriz 25x25 simétrica (a diagonal é a frequência de cada número)
+- trios: vetor com as C(25, 3) = 2300 combinações de três números, indexadas
+  pelo rank colexicográfico C(a, 1) + C(b, 2) + C(c, 3) (a < b < c, base 0)
+
+As contagens completas são calculadas de forma vetorizada a partir das
+máscaras de bits. Para consultas em janelas (ex: últimos N concursos) são
+guardadas somas de prefixo a cada ESPACAMENTO concursos; uma janela é a
+diferença entre dois pontos de prefixo mais as bordas (menos de
+ESPACAMENTO concursos cada), calculadas diretamente. Um concurso novo
+atualiza as contagens em O(1) (105 duplas e 455 trios).
+"""
+
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+# Espaçamento (em concursos) entre os pontos de soma de prefixo
+ESPACAMENTO = 256
+
+# Quantidade de linhas processadas por bloco na contagem vetorizada
+TAMANHO_BLOCO = 1 << 16
+
+TOTAL_TRIOS = comb(25, 3)
+
+# Índices (base 0) das duplas a < b, na ordem usada pela contagem de trios
+_DUPLAS = np.array(list(combinations(range(25), 2)), dtype=np.int64)
+
+# Mapeamento (a, b, c) -> índice do trio, para os pares de _DUPLAS e todo c
+_INDICE_TRIO = np.full((len(_DUPLAS), 25), -1, dtype=np.int64)
+for _i, (_a, _b) in enumerate(_DUPLAS):
+    for _c in range(_b + 1, 25):
+        _INDICE_TRIO[_i, _c] = comb(_a, 1) + comb(_b, 2) + comb(_c, 3)
+_VALIDOS_TRIO = _INDICE_TRIO >= 0
+
+
+def triple_index(a, b, c):
+    """
+    Retorna o índice do trio (a, b, c) no vetor de trios.
+
+    Args:
+        a, b, c: Números distintos de 1 a 25 (em qualquer ordem)
+
+    Returns:
+        int: Índice entre 0 e 2299
+    """
+    x, y, z = sorted((a - 1, b - 1, c - 1))
+    return comb(x, 1) + comb(y, 2) + comb(z, 3)
+
+
+def triple_numbers(indice):
+    """
+    Converte um índice de trio de volta para os três números.
+
+    Args:
+        indice: Índice entre 0 e 2299
+
+    Returns:
+        tuple: (a, b, c) com a < b < c (números de 1 a 25)
+    """
+    numeros = []
+    restante = int(indice)
+    c = 25
+    for k in (3, 2, 1):
+        c -= 1
+        while comb(c, k) > restante:
+            c -= 1
+        restante -= comb(c, k)
+        numeros.append(c + 1)
+    return tuple(sorted(numeros))
+
+
+def _bits(masks):
+    """Matriz [n x 25] de 0/1 (float64, para multiplicação exata via BLAS)."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return ((masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1).astype(np.float64)
+
+
+def count_range(masks):
+    """
+    Conta duplas e trios de um conjunto de sorteios de forma vetorizada.
+
+    Args:
+        masks: Array de máscaras dos sorteios
+
+    Returns:
+        tuple: (matriz int64 25x25 de duplas, vetor int64 de 2300 trios)
+    """
+    duplas = np.zeros((25, 25), dtype=np.float64)
+    trios = np.zeros(TOTAL_TRIOS, dtype=np.float64)
+
+    for inicio in range(0, len(masks), TAMANHO_BLOCO):
+        x = _bits(masks[inicio:inicio + TAMANHO_BLOCO])
+        duplas += x.T @ x
+
+        # Produto de cada dupla (a, b) com todos os números c: [300 x 25]
+        produto_duplas = x[:, _DUPLAS[:, 0]] * x[:, _DUPLAS[:, 1]]
+        por_dupla = produto_duplas.T @ x
+        np.add.at(trios, _INDICE_TRIO[_VALIDOS_TRIO], por_dupla[_VALIDOS_TRIO])
+
+    return duplas.astype(np.int64), trios.astype(np.int64)
+
+
+def build_cooccurrence(masks):
+    """
+    Calcula as contagens completas e as somas de prefixo do histórico.
+
+    Args:
+        masks: Array de máscaras dos sorteios (em ordem de concurso)
+
+    Returns:
+        dict: Estado com:
+            - n: quantidade de concursos
+            - duplas: matriz 25x25 de contagens
+            - trios: vetor de 2300 contagens
+            - prefixo_duplas: contagens acumuladas a cada ESPACAMENTO concursos
+            - prefixo_trios: idem para trios
+    """
+    n = len(masks)
+    pontos = n // ESPACAMENTO
+
+    prefixo_duplas = np.zeros((pontos + 1, 25, 25), dtype=np.int64)
+    prefixo_trios = np.zeros((pontos + 1, TOTAL_TRIOS), dtype=np.int64)
+    for p in range(pontos):
+        bloco = masks[p * ESPACAMENTO:(p + 1) * ESPACAMENTO]
+        duplas_bloco, trios_bloco = count_range(bloco)
+        prefixo_duplas[p + 1] = prefixo_duplas[p] + duplas_bloco
+        prefixo_trios[p + 1] = prefixo_trios[p] + trios_bloco
+
+    duplas_resto, trios_resto = count_range(masks[pontos * ESPACAMENTO:])
+
+    return {
+        'n': n,
+        'duplas': prefixo_duplas[-1] + duplas_resto,
+        'trios': prefixo_trios[-1] + trios_resto,
+        'prefixo_duplas': prefixo_duplas,
+        'prefixo_trios': prefixo_trios
+    }
+
+
+def update_cooccurrence(estado, novas_masks):
+    """
+    Atualiza o estado com novos concursos em O(1) por concurso.
+
+    Args:
+        estado: Estado criado por build_cooccurrence() (modificado no lugar)
+        novas_masks: Máscaras dos concursos novos (em ordem)
+
+    Returns:
+        dict: O próprio estado atualizado
+    """
+    for mask in np.asarray(novas_masks, dtype=np.uint32).tolist():
+        numeros = [i for i in range(25) if mask & (1 << i)]
+
+        idx = np.array(numeros)
+        estado['duplas'][np.ix_(idx, idx)] += 1
+        for a, b, c in combinations(numeros, 3):
+            estado['trios'][comb(a, 1) + comb(b, 2) + comb(c, 3)] += 1
+
+        estado['n'] += 1
+        if estado['n'] % ESPACAMENTO == 0:
+            estado['prefixo_duplas'] = np.concatenate([estado['prefixo_duplas'], estado['duplas'][None]])
+            estado['prefixo_trios'] = np.concatenate([estado['prefixo_trios'], estado['trios'][None]])
+
+    return estado
+
+
+def extend_cooccurrence(estado, masks):
+    """
+    Estende o estado de um prefixo do histórico até o histórico completo.
+
+    O estado recebido não é modificado (pode ser a seção de outra versão do
+    snapshot, ainda em uso): as contagens são copiadas e apenas os concursos
+    novos são aplicados.
+
+    Args:
+        estado: Estado dos primeiros estado['n'] concursos deste histórico
+        masks: Array de máscaras de todo o histórico
+
+    Returns:
+        dict: Estado de coocorrência de masks (ver build_cooccurrence)
+    """
+    novo = {chave: valor.copy() if isinstance(valor, np.ndarray) else valor for chave, valor in estado.items()}
+    return update_cooccurrence(novo, masks[estado['n']:])
+
+
+def _prefix_counts(estado, masks, fim):
+    """Contagens acumuladas dos concursos [0, fim) usando o ponto de prefixo mais próximo."""
+    p = min(fim // ESPACAMENTO, len(estado['prefixo_duplas']) - 1)
+    duplas_resto, trios_resto = count_range(masks[p * ESPACAMENTO:fim])
+    return estado['prefixo_duplas'][p] + duplas_resto, estado['prefixo_trios'][p] + trios_resto
+
+
+def window_counts(estado, masks, ultimos=None):
+    """
+    Retorna as contagens de duplas e trios dos últimos N concursos.
+
+    Args:
+        estado: Estado de coocorrência
+        masks: Array de máscaras dos sorteios (o mesmo usado no estado)
+        ultimos: Quantidade de concursos mais recentes (padrão: histórico completo)
+
+    Returns:
+        tuple: (matriz 25x25 de duplas, vetor de 2300 trios)
+    """
+    n = estado['n']
+    if ultimos is None or ultimos >= n:
+        return estado['duplas'], estado['trios']
+
+    inicio = n - max(0, ultimos)
+    duplas_ini, trios_ini = _prefix_counts(estado, masks, inicio)
+    return estado['duplas'] - duplas_ini, estado['trios'] - trios_ini
+
+
+def top_pairs(duplas, top=20):
+    """
+    Lista as duplas mais frequentes.
+
+    Args:
+        duplas: Matriz 25x25 de contagens
+        top: Quantidade de duplas retornadas
+
+    Returns:
+        list: Lista de dicionários {'numeros': [a, b], 'frequencia': int}
+    """
+    contagens = duplas[_DUPLAS[:, 0], _DUPLAS[:, 1]]
+    ordem = np.argsort(-contagens, kind="stable")[:top]
+    return [
+        {'numeros': [int(_DUPLAS[i, 0]) + 1, int(_DUPLAS[i, 1]) + 1], 'frequencia': int(contagens[i])}
+        for i in ordem
+    ]
+
+
+def top_triples(trios, top=20):
+    """
+    Lista os trios mais frequentes.
+
+    Args:
+        trios: Vetor de 2300 contagens
+        top: Quantidade de trios retornados
+
+    Returns:
+        list: Lista de dicionários {'numeros': [a, b, c], 'frequencia': int}
+    """
+    ordem = np.argsort(-trios, kind="stable")[:top]
+    return [{'numeros': list(triple_numbers(i)), 'frequencia': int(trios[i])} for i in ordem]
@@ -1,15 +1,66 @@
 import os
+import tempfile
+
 import requests
 
+# Endereço de download dos resultados (pode ser alterado pela variável de ambiente)
+DATA_URL = os.environ.get(
+    "LOTOPY_DATA_URL",
+    "https://servicebus2.caixa.gov.br/portaldeloterias/api/resultados/download?modalidade=Lotof%C3%A1cil"
+)
+
+# Tempo máximo (segundos) para conectar / para cada leitura do download
+TIMEOUT_DOWNLOAD = (10, 60)
+
+
 def download_url(url, save_path, chunk_size=128):
-    r = requests.get(url, stream=True)
+    r = requests.get(url, stream=True, timeout=TIMEOUT_DOWNLOAD)
+    r.raise_for_status()
     with open(save_path, "wb") as fd:
         for chunk in r.iter_content(chunk_size=chunk_size):
             fd.write(chunk)
 
 
-def update_db(save_path):
-    url = "https://servicebus2.caixa.gov.br/portaldeloterias/api/resultados/download?modalidade=Lotof%C3%A1cil"
-    payload = {}
-    headers = {}
-    download_url(url, save_path)
+def update_db(save_path, url=None):
+    """
+    Baixa a planilha de resultados e substitui o arquivo de dados de forma atômica.
+
+    O download é feito em um arquivo temporário no mesmo diretório e só
+    substitui o arquivo atual (os.replace) se parecer uma planilha válida;
+    quem estiver lendo o arquivo nunca vê um arquivo pela metade.
+
+    Args:
+        save_path: Caminho do arquivo de dados
+        url: Endereço de download (padrão: DATA_URL)
+
+    Returns:
+        bool: True se o conteúdo mudou, False se é idêntico ao atual
+
+    Raises:
+        ValueError: Se o arquivo baixado não for uma planilha XLSX
+        requests.RequestException: Em falhas de rede ou respostas de erro
+    """
+    diretorio = os.path.dirname(os.path.abspath(save_path))
+    os.makedirs(diretorio, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=diretorio, suffix=".xlsx.tmp")
+    os.close(fd)
+    try:
+        download_url(url or DATA_URL, tmp, chunk_size=1 << 16)
+
+        with open(tmp, "rb") as f:
+            novo = f.read()
+        # XLSX é um arquivo ZIP
+        if not novo.startswith(b"PK"):
+            raise ValueError("O arquivo baixado não é uma planilha XLSX.")
+
+        if os.path.exists(save_path):
+            with open(save_path, "rb") as f:
+                if f.read() == novo:
+                    return False
+
+        os.replace(tmp, save_path)
+        return True
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,250 @@
+"""
+Módulo de análise de atrasos e sequências de cada número da Lotofácil.
+
+Para cada número (1-25) calcula:
+- atraso atual: há quantos concursos o número não sai
+- atraso máximo e médio: considerando todos os períodos de ausência
+- sequências: quantos concursos seguidos o número saiu
+- risco empírico (hazard): probabilidade de o número voltar a sair no
+  próximo concurso dado que está ausente há exatamente k concursos
+  (k = 0 significa que saiu no concurso anterior)
+
+O estado é calculado em uma única passada vetorizada sobre as máscaras de
+bits e, quando novos concursos são adicionados, atualizado incrementalmente
+(O(25) por concurso) a partir do estado da versão anterior dos dados.
+"""
+
+import numpy as np
+
+
+def _bits(masks):
+    """Matriz booleana [n x 25] indicando se cada número saiu em cada concurso."""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return ((masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1).astype(bool)
+
+
+def _grow(hist, tamanho):
+    """Aumenta a quantidade de colunas de um histograma [25 x k], se necessário."""
+    if hist.shape[1] >= tamanho:
+        return hist
+    maior = np.zeros((25, tamanho), dtype=np.int64)
+    maior[:, :hist.shape[1]] = hist
+    return maior
+
+
+def build_delay_state(masks):
+    """
+    Calcula o estado de atrasos e sequências de todo o histórico.
+
+    Args:
+        masks: Array de máscaras dos sorteios (em ordem de concurso)
+
+    Returns:
+        dict: Estado com:
+            - n: quantidade de concursos
+            - ultimo_visto: índice do último concurso em que cada número saiu (-1 se nunca)
+            - sequencia_atual: concursos seguidos em que cada número está saindo
+            - hist_atrasos: [25 x K] contagem de ausências encerradas com k concursos
+            - hist_sequencias: [25 x S] contagem de sequências encerradas com s concursos
+    """
+    x = _bits(masks)
+    n = len(x)
+
+    ultimo_visto = np.full(25, -1, dtype=np.int64)
+    sequencia_atual = np.zeros(25, dtype=np.int64)
+    atrasos_por_numero = []
+    sequencias_por_numero = []
+
+    for j in range(25):
+        posicoes = np.flatnonzero(x[:, j])
+        if len(posicoes) == 0:
+            atrasos_por_numero.append(np.zeros(0, dtype=np.int64))
+            sequencias_por_numero.append(np.zeros(0, dtype=np.int64))
+            continue
+
+        ultimo_visto[j] = posicoes[-1]
+        atrasos_por_numero.append(np.diff(posicoes) - 1)
+
+        # Sequências: trechos de posições consecutivas
+        quebras = np.flatnonzero(np.diff(posicoes) > 1)
+        inicios = np.concatenate([[0], quebras + 1])
+        fins = np.concatenate([quebras, [len(posicoes) - 1]])
+        tamanhos = fins - inicios + 1
+
+        # A última sequência continua aberta se o número saiu no último concurso
+        if posicoes[-1] == n - 1:
+            sequencia_atual[j] = tamanhos[-1]
+            tamanhos = tamanhos[:-1]
+        sequencias_por_numero.append(tamanhos)
+
+    largura_atrasos = max([int(a.max()) + 1 for a in atrasos_por_numero if len(a)] + [1])
+    largura_sequencias = max([int(s.max()) + 1 for s in sequencias_por_numero if len(s)] + [1])
+
+    hist_atrasos = np.zeros((25, largura_atrasos), dtype=np.int64)
+    hist_sequencias = np.zeros((25, largura_sequencias), dtype=np.int64)
+    for j in range(25):
+        hist_atrasos[j] = np.bincount(atrasos_por_numero[j], minlength=largura_atrasos)
+        hist_sequencias[j] = np.bincount(sequencias_por_numero[j], minlength=largura_sequencias)
+
+    return {
+        'n': n,
+        'ultimo_visto': ultimo_visto,
+        'sequencia_atual': sequencia_atual,
+        'hist_atrasos': hist_atrasos,
+        'hist_sequencias': hist_sequencias
+    }
+
+
+def update_delay_state(estado, novas_masks):
+    """
+    Atualiza o estado com novos concursos (O(25) por concurso).
+
+    Args:
+        estado: Estado criado por build_delay_state() (modificado no lugar)
+        novas_masks: Máscaras dos concursos novos (em ordem)
+
+    Returns:
+        dict: O próprio estado atualizado
+    """
+    numeros = np.arange(25)
+
+    for presentes in _bits(novas_masks):
+        t = estado['n']
+        ultimo_visto = estado['ultimo_visto']
+        sequencia_atual = estado['sequencia_atual']
+
+        # Ausências encerradas: números que voltaram a sair
+        voltaram = presentes & (ultimo_visto >= 0)
+        atrasos = t - ultimo_visto[voltaram] - 1
+        if len(atrasos):
+            estado['hist_atrasos'] = _grow(estado['hist_atrasos'], int(atrasos.max()) + 1)
+            estado['hist_atrasos'][numeros[voltaram], atrasos] += 1
+
+        # Sequências encerradas: números que estavam saindo e não saíram agora
+        encerradas = ~presentes & (sequencia_atual > 0)
+        tamanhos = sequencia_atual[encerradas]
+        if len(tamanhos):
+            estado['hist_sequencias'] = _grow(estado['hist_sequencias'], int(tamanhos.max()) + 1)
+            estado['hist_sequencias'][numeros[encerradas], tamanhos] += 1
+
+        sequencia_atual[encerradas] = 0
+        sequencia_atual[presentes] += 1
+        ultimo_visto[presentes] = t
+        estado['n'] = t + 1
+
+    return estado
+
+
+def extend_delay_state(estado, masks):
+    """
+    Estende o estado de um prefixo do histórico até o histórico completo.
+
+    O estado recebido não é modificado (pode ser a seção de outra versão do
+    snapshot, ainda em uso): os arrays são copiados e apenas os concursos
+    novos são aplicados.
+
+    Args:
+        estado: Estado dos primeiros estado['n'] concursos deste histórico
+        masks: Array de máscaras de todo o histórico
+
+    Returns:
+        dict: Estado de atrasos de masks (ver build_delay_state)
+    """
+    novo = {chave: valor.copy() if isinstance(valor, np.ndarray) else valor for chave, valor in estado.items()}
+    return update_delay_state(novo, masks[estado['n']:])
+
+
+def _hazard(hist_atrasos, atraso_aberto, max_k):
+    """
+    Contagens do risco empírico de um número voltar a sair após k ausências.
+
+    Em risco no passo k: ausências encerradas com k ou mais concursos mais a
+    ausência ainda aberta, se já passou de k concursos (censura à direita).
+
+    Returns:
+        tuple: (voltas em k, em risco em k) para k = 0..max_k
+    """
+    largura = max(len(hist_atrasos), max_k + 1)
+    hist = np.zeros(largura, dtype=np.int64)
+    hist[:len(hist_atrasos)] = hist_atrasos
+
+    em_risco = np.cumsum(hist[::-1])[::-1]
+    em_risco[:atraso_aberto] += 1
+
+    return hist[:max_k + 1], em_risco[:max_k + 1]
+
+
+def delay_statistics(estado, max_k=15):
+    """
+    Monta as estatísticas de atraso, sequência e risco de cada número.
+
+    Args:
+        estado: Estado de atrasos
+        max_k: Maior quantidade de ausências considerada no risco
+
+    Returns:
+        dict: Dicionário com:
+            - concursos_analisados: quantidade de concursos do estado
+            - numeros: lista (um item por número) com atraso_atual, atraso_maximo,
+              atraso_medio, sequencia_atual, sequencia_maxima, sequencia_media
+              e risco ([{k, probabilidade, amostras}, ...])
+            - risco_geral: risco agregado de todos os números
+    """
+    n = estado['n']
+    hist_atrasos = estado['hist_atrasos']
+    hist_sequencias = estado['hist_sequencias']
+    valores_atraso = np.arange(hist_atrasos.shape[1])
+    valores_sequencia = np.arange(hist_sequencias.shape[1])
+
+    numeros = []
+    sucessos_geral = np.zeros(max_k + 1, dtype=np.int64)
+    em_risco_geral = np.zeros(max_k + 1, dtype=np.int64)
+
+    for j in range(25):
+        ultimo = int(estado['ultimo_visto'][j])
+        atraso_atual = n - 1 - ultimo if ultimo >= 0 else n
+
+        # Atrasos: ausências de pelo menos um concurso
+        ausencias = hist_atrasos[j, 1:]
+        total_ausencias = int(ausencias.sum())
+        atraso_medio = float((ausencias * valores_atraso[1:]).sum() / total_ausencias) if total_ausencias else 0.0
+        atraso_maximo = int(valores_atraso[hist_atrasos[j] > 0].max()) if hist_atrasos[j].any() else 0
+
+        sequencias = hist_sequencias[j]
+        total_sequencias = int(sequencias.sum())
+        sequencia_atual = int(estado['sequencia_atual'][j])
+        sequencia_media = float((sequencias * valores_sequencia).sum() / total_sequencias) if total_sequencias else 0.0
+        sequencia_maxima = int(valores_sequencia[sequencias > 0].max()) if sequencias.any() else 0
+
+        sucessos, em_risco = _hazard(hist_atrasos[j], atraso_atual if ultimo >= 0 else 0, max_k)
+        sucessos_geral += sucessos
+        em_risco_geral += em_risco
+
+        numeros.append({
+            'numero': j + 1,
+            'atraso_atual': atraso_atual,
+            'atraso_maximo': max(atraso_maximo, atraso_atual),
+            'atraso_medio': round(atraso_medio, 2),
+            'sequencia_atual': sequencia_atual,
+            'sequencia_maxima': max(sequencia_maxima, sequencia_atual),
+            'sequencia_media': round(sequencia_media, 2),
+            'risco': _format_hazard(sucessos, em_risco)
+        })
+
+    return {
+        'concursos_analisados': n,
+        'numeros': numeros,
+        'risco_geral': _format_hazard(sucessos_geral, em_risco_geral)
+    }
+
+
+def _format_hazard(sucessos, em_risco):
+    """Converte contagens de risco em lista de dicionários com a probabilidade por k."""
+    return [
+        {
+            'k': k,
+            'probabilidade': round(float(sucessos[k] / em_risco[k]), 4) if em_risco[k] else None,
+            'amostras': int(em_risco[k])
+        }
+        for k in range(len(sucessos))
+    ]
@@ -0,0 +1,203 @@
+"""
+Módulo para representar sorteios e jogos da Lotofácil como máscaras de bits.
+
+Cada conjunto de números é codificado em um inteiro de 25 bits, onde o bit
+(n - 1) indica a presença do número n na cartela:
+
+    numero:  25 24 ... 3 2 1
+    bit:     24 23 ... 2 1 0
+
+Com essa representação, contar acertos entre um jogo e um sorteio é apenas
+um AND seguido de contagem de bits (popcount), o que permite processar
+milhares de jogos contra todo o histórico com operações vetorizadas do NumPy.
+"""
+
+import numpy as np
+
+LST_CAMPOS = [f"Bola{i}" for i in range(1, 16)]
+
+# Máscara com os 25 números da cartela
+MASCARA_TODOS = (1 << 25) - 1
+
+# Tabela de popcount para 16 bits (usada quando np.bitwise_count não existe)
+_POPCOUNT_16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+
+def numbers_to_mask(numeros):
+    """
+    Converte uma lista de números (1-25) em máscara de bits.
+
+    Args:
+        numeros: Lista ou conjunto de números de 1 a 25
+
+    Returns:
+        int: Máscara de 25 bits
+    """
+    mask = 0
+    for numero in numeros:
+        mask |= 1 << (int(numero) - 1)
+    return mask
+
+
+# Máscaras das regiões da cartela (mesmos conjuntos de pip_config,
+# geographic_analysis e global_statistics)
+MASCARA_PARES = numbers_to_mask(range(2, 26, 2))
+MASCARA_IMPARES = numbers_to_mask(range(1, 26, 2))
+MASCARA_PRIMOS = numbers_to_mask([2, 3, 5, 7, 11, 13, 17, 19, 23])
+MASCARA_MOLDURA = numbers_to_mask([1, 2, 3, 4, 5, 21, 22, 23, 24, 25, 6, 10, 11, 15, 16, 20])
+MASCARA_MIOLO = numbers_to_mask([7, 8, 9, 12, 13, 14, 17, 18, 19])
+MASCARAS_LINHAS = [numbers_to_mask(range((linha - 1) * 5 + 1, linha * 5 + 1)) for linha in range(1, 6)]
+MASCARAS_QUADRANTES = [
+    numbers_to_mask([1, 2, 6, 7]),
+    numbers_to_mask([4, 5, 9, 10]),
+    numbers_to_mask([16, 17, 21, 22]),
+    numbers_to_mask([19, 20, 24, 25]),
+]
+MASCARA_CRUZ = numbers_to_mask([3, 8, 11, 12, 13, 14, 15, 18, 23])
+
+# Regiões contadas por region_counts (nome -> máscara), na ordem das colunas
+REGIOES = {
+    'pares': MASCARA_PARES,
+    'impares': MASCARA_IMPARES,
+    'primos': MASCARA_PRIMOS,
+    'moldura': MASCARA_MOLDURA,
+    'miolo': MASCARA_MIOLO,
+    **{f'linha{i}': mascara for i, mascara in enumerate(MASCARAS_LINHAS, start=1)},
+    **{f'q{i}': mascara for i, mascara in enumerate(MASCARAS_QUADRANTES, start=1)},
+    'cruz': MASCARA_CRUZ,
+}
+
+# Tabelas por byte para somar os números de uma máscara: _SOMA_BYTE[k][b] é a
+# soma dos números representados pelo byte b na posição k da máscara
+_SOMA_BYTE = np.array(
+    [[sum(8 * k + bit + 1 for bit in range(8) if b & (1 << bit)) for b in range(256)] for k in range(4)],
+    dtype=np.int32
+)
+
+
+def mask_to_numbers(mask):
+    """
+    Converte uma máscara de bits em lista ordenada de números.
+
+    Args:
+        mask: Inteiro de 25 bits
+
+    Returns:
+        list: Lista ordenada com os números presentes na máscara
+    """
+    mask = int(mask)
+    return [n for n in range(1, 26) if mask & (1 << (n - 1))]
+
+
+def masks_to_number_matrix(masks, qtd_numeros=15):
+    """
+    Converte várias máscaras com a mesma quantidade de números em uma matriz de números.
+
+    Args:
+        masks: Array de máscaras de bits, todas com qtd_numeros bits ligados
+        qtd_numeros: Quantidade de números de cada máscara
+
+    Returns:
+        np.ndarray: Matriz int [len(masks) x qtd_numeros] com os números em ordem crescente
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    bits = (masks[:, None] >> np.arange(25, dtype=np.uint32)) & 1
+    _, colunas = np.nonzero(bits)
+    return (colunas + 1).reshape(len(masks), qtd_numeros)
+
+
+def calculate_masks(df):
+    """
+    Calcula a máscara de bits de cada concurso de forma vetorizada.
+
+    Args:
+        df: DataFrame com as colunas Bola1, Bola2, ..., Bola15
+
+    Returns:
+        np.ndarray: Array uint32 com uma máscara por concurso (na ordem do DataFrame)
+    """
+    bolas = df[LST_CAMPOS].fillna(0).to_numpy(dtype=np.int64)
+    validos = (bolas >= 1) & (bolas <= 25)
+    bits = np.where(validos, np.left_shift(1, np.where(validos, bolas - 1, 0)), 0)
+    return np.bitwise_or.reduce(bits, axis=1).astype(np.uint32)
+
+
+def popcount(masks):
+    """
+    Conta os bits ligados de cada máscara (quantidade de números).
+
+    Args:
+        masks: Array de inteiros sem sinal (até 32 bits)
+
+    Returns:
+        np.ndarray: Array uint8 com a contagem de bits de cada elemento
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks)
+    return _POPCOUNT_16[masks & 0xFFFF] + _POPCOUNT_16[masks >> 16]
+
+
+def mask_sums(masks):
+    """
+    Calcula a soma dos números de cada máscara de forma vetorizada.
+
+    Args:
+        masks: Array de máscaras de bits
+
+    Returns:
+        np.ndarray: Array int32 com a soma dos números de cada máscara
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    return (
+        _SOMA_BYTE[0][masks & 0xFF]
+        + _SOMA_BYTE[1][(masks >> 8) & 0xFF]
+        + _SOMA_BYTE[2][(masks >> 16) & 0xFF]
+        + _SOMA_BYTE[3][masks >> 24]
+    )
+
+
+def region_counts(masks):
+    """
+    Conta quantos números de cada máscara caem em cada região da cartela.
+
+    Args:
+        masks: Array de máscaras de bits
+
+    Returns:
+        dict: Arrays com as contagens: pares, impares, primos, moldura, miolo,
+        linha1..linha5, q1..q4 e cruz
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    return {nome: popcount(masks & np.uint32(mascara)) for nome, mascara in REGIOES.items()}
+
+
+def calculate_cycles(masks):
+    """
+    Calcula o ciclo de cada concurso e os números já sorteados no ciclo antes dele.
+
+    Mesma regra de cycle_calculator.calculate_cycle: um ciclo termina quando
+    todos os 25 números foram sorteados.
+
+    Args:
+        masks: Array de máscaras dos sorteios (em ordem de concurso)
+
+    Returns:
+        tuple: (array int64 com o ciclo de cada concurso, começando em 1;
+        array uint32 com a máscara acumulada do ciclo antes de cada concurso)
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    ciclos = np.empty(len(masks), dtype=np.int64)
+    acumulados = np.empty(len(masks), dtype=np.uint32)
+
+    ciclo = 1
+    acumulado = 0
+    for i, mask in enumerate(masks.tolist()):
+        ciclos[i] = ciclo
+        acumulados[i] = acumulado
+        acumulado |= mask
+        if acumulado == MASCARA_TODOS:
+            ciclo += 1
+            acumulado = 0
+
+    return ciclos, acumulados
@@ -0,0 +1,595 @@
+"""
+Módulo com versões vetorizadas das análises e estratégias da página.
+
+Cada função tem o mesmo nome, os mesmos argumentos e o mesmo resultado da
+implementação de referência (pandas + iterrows) em cycle_calculator,
+pip_config, global_statistics, cycle_analysis e game_suggestions, mas
+trabalha sobre a matriz de bolas e as máscaras de bits dos sorteios.
+
+"O mesmo resultado" inclui a ordem dos empates: Counter.most_common e
+DataFrame.sort_values dependem da ordem em que cada valor aparece pela
+primeira vez, e essa ordem é reproduzida aqui. A equivalência é conferida
+por verify_equivalence.py na base real e em históricos sintéticos.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import source.draw_masks as dm
+
+QUADRANTE1 = {1, 2, 6, 7}
+QUADRANTE2 = {4, 5, 9, 10}
+QUADRANTE3 = {16, 17, 21, 22}
+QUADRANTE4 = {19, 20, 24, 25}
+CRUZ = {3, 8, 11, 12, 13, 14, 15, 18, 23}
+MOLDURA = {1, 2, 3, 4, 5, 21, 22, 23, 24, 25, 6, 10, 11, 15, 16, 20}
+MIOLO = {7, 8, 9, 12, 13, 14, 17, 18, 19}
+
+
+def _bolas(df):
+    """Matriz (n, 15) int64 com as bolas na ordem das colunas (0 onde não há número)."""
+    return df[dm.LST_CAMPOS].fillna(0).to_numpy(dtype=np.int64)
+
+
+def _counter_items(valores):
+    """
+    Itens de Counter(valores) na ordem de inserção (primeira ocorrência).
+
+    Returns:
+        tuple: (array de valores distintos, array de contagens)
+    """
+    valores = np.asarray(valores)
+    if len(valores) == 0:
+        return valores[:0], np.zeros(0, dtype=np.int64)
+    unicos, primeiro, contagens = np.unique(valores, return_index=True, return_counts=True)
+    ordem = np.argsort(primeiro, kind='stable')
+    return unicos[ordem], contagens[ordem]
+
+
+def _most_common(valores, n=None):
+    """Equivalente a Counter(valores).most_common(n)."""
+    unicos, contagens = _counter_items(valores)
+    ordem = np.argsort(-contagens, kind='stable')
+    if n is not None:
+        ordem = ordem[:n]
+    return [(unicos[i].item(), int(contagens[i])) for i in ordem]
+
+
+def _drawn_numbers(bolas):
+    """Números sorteados em ordem de leitura (linha a linha, Bola1..Bola15), sem vazios."""
+    numeros = bolas.ravel()
+    return numeros[numeros != 0]
+
+
+def _cycle_steps(df):
+    """
+    Percorre os concursos agrupados por ciclo (e ordenados por concurso dentro do ciclo).
+
+    Returns:
+        tuple: (ordem das linhas, ciclo, passo no ciclo começando em 1,
+        quantidade de números novos, máscara acumulada antes do sorteio,
+        máscara acumulada depois do sorteio) — arrays na ordem de `ordem`
+    """
+    ciclos = df['ciclo'].to_numpy()
+    ordem = np.lexsort((df['Concurso'].to_numpy(), ciclos))
+    masks = dm.calculate_masks(df)[ordem]
+    ciclos = ciclos[ordem]
+
+    n = len(masks)
+    passos = np.empty(n, dtype=np.int64)
+    antes = np.empty(n, dtype=np.uint32)
+    depois = np.empty(n, dtype=np.uint32)
+
+    ciclo_anterior = None
+    passo = 0
+    acumulado = 0
+    for i, (ciclo, mask) in enumerate(zip(ciclos.tolist(), masks.tolist())):
+        if ciclo != ciclo_anterior:
+            ciclo_anterior = ciclo
+            passo = 0
+            acumulado = 0
+        passo += 1
+        passos[i] = passo
+        antes[i] = acumulado
+        acumulado |= mask
+        depois[i] = acumulado
+
+    novos = dm.popcount(masks & ~antes).astype(np.int64)
+    return ordem, ciclos, passos, novos, antes, depois
+
+
+def _with_cycle(df):
+    if "ciclo" not in df.columns:
+        df = calculate_cycle(df)
+    return df
+
+
+# --- cycle_calculator / pip_config ---------------------------------------------
+
+def calculate_cycle(df):
+    """Versão vetorizada de cycle_calculator.calculate_cycle."""
+    df_result = df.copy()
+    ciclos, _ = dm.calculate_cycles(dm.calculate_masks(df))
+    df_result["ciclo"] = ciclos
+    return df_result
+
+
+def calculate_pip_config(df):
+    """Versão vetorizada de pip_config.calculate_pip_config."""
+    df_result = df.copy()
+    bolas = _bolas(df)
+    validos = bolas != 0
+
+    pares = (validos & (bolas % 2 == 0)).sum(axis=1)
+    impares = (validos & (bolas % 2 == 1)).sum(axis=1)
+    primos = np.isin(bolas, [2, 3, 5, 7, 11, 13, 17, 19, 23]).sum(axis=1)
+
+    # Poucas configurações distintas: formatar cada uma só uma vez
+    codigos, inverso = np.unique(pares * 10000 + impares * 100 + primos, return_inverse=True)
+    textos = np.array([f"{c // 10000}P-{c // 100 % 100}I-{c % 100}NP" for c in codigos.tolist()], dtype=object)
+    df_result["config_pip"] = textos[inverso.ravel()] if len(df) else []
+    return df_result
+
+
+# --- global_statistics -----------------------------------------------------------
+
+def _region_stats(total, total_numeros, total_concursos, numeros=None):
+    resultado = {} if numeros is None else {'numeros': numeros}
+    resultado.update({
+        'total': total,
+        'percentual': round((total / total_numeros) * 100, 2),
+        'media_por_jogo': round(total / total_concursos, 2)
+    })
+    return resultado
+
+
+def calculate_heat_map(df):
+    """Versão vetorizada de global_statistics.calculate_heat_map."""
+    numeros = _drawn_numbers(_bolas(df))
+    return _heat_map_result(np.bincount(numeros, minlength=26).tolist(), len(numeros), len(df))
+
+
+def _heat_map_result(contagens, total_numeros, total_concursos):
+    """
+    Monta o resultado de calculate_heat_map a partir das contagens por número.
+
+    Args:
+        contagens: Lista com a contagem de cada número (índices 0 a 25)
+        total_numeros: Quantidade de números sorteados
+        total_concursos: Quantidade de concursos
+    """
+    frequencias = {num: contagens[num] for num in range(1, len(contagens)) if contagens[num]}
+
+    regioes = [('quadrante1', QUADRANTE1), ('quadrante2', QUADRANTE2),
+               ('quadrante3', QUADRANTE3), ('quadrante4', QUADRANTE4), ('cruz', CRUZ)]
+    totais = {nome: sum(contagens[n] for n in conjunto) for nome, conjunto in regioes}
+
+    total_aparicoes = sum(frequencias.values())
+    max_freq = max(frequencias.values())
+    min_freq = min(frequencias.values())
+    freq_range = max_freq - min_freq
+
+    heat_map = []
+    for num in range(1, 26):
+        freq = frequencias.get(num, 0)
+        if freq_range > 0:
+            intensidade = round(((freq - min_freq) / freq_range) * 100, 1)
+        else:
+            intensidade = 50.0
+
+        if num in QUADRANTE1:
+            regiao = 'Q1'
+        elif num in QUADRANTE2:
+            regiao = 'Q2'
+        elif num in QUADRANTE3:
+            regiao = 'Q3'
+        elif num in QUADRANTE4:
+            regiao = 'Q4'
+        elif num in CRUZ:
+            regiao = 'Cruz'
+        else:
+            regiao = 'Outro'
+
+        heat_map.append({
+            'numero': num,
+            'frequencia': freq,
+            'percentual': round((freq / total_aparicoes) * 100, 2),
+            'intensidade': intensidade,
+            'regiao': regiao
+        })
+
+    return {
+        'heat_map': heat_map,
+        'quadrantes': {
+            nome: _region_stats(totais[nome], total_numeros, total_concursos, sorted(conjunto))
+            for nome, conjunto in regioes
+        },
+        'min_freq': min_freq,
+        'max_freq': max_freq
+    }
+
+
+def calculate_consolidated_geographic_analysis(df):
+    """Versão vetorizada de global_statistics.calculate_consolidated_geographic_analysis."""
+    bolas = _bolas(df)
+    validos = bolas != 0
+
+    por_linha = np.stack([
+        (validos & ((bolas - 1) // 5 == linha)).sum(axis=1) for linha in range(5)
+    ], axis=1)
+    moldura = np.isin(bolas, list(MOLDURA)).sum(axis=1)
+    miolo = np.isin(bolas, list(MIOLO)).sum(axis=1)
+
+    # Distribuições codificadas como inteiros; o texto só é montado para as mais comuns
+    codigos_linhas = por_linha @ np.array([16 ** 4, 16 ** 3, 16 ** 2, 16, 1])
+    return _geographic_result(
+        por_linha.sum(axis=0).tolist(), int(moldura.sum()), int(miolo.sum()),
+        int(validos.sum()), len(df),
+        _items(*_counter_items(codigos_linhas)), _items(*_counter_items(moldura * 16 + miolo))
+    )
+
+
+def _items(unicos, contagens):
+    return list(zip(unicos.tolist(), contagens.tolist()))
+
+
+def _most_common_items(itens, n=None):
+    """Equivalente a Counter.most_common(n) para itens (valor, contagem) na ordem de inserção."""
+    ordenados = sorted(itens, key=lambda item: item[1], reverse=True)
+    return ordenados if n is None else ordenados[:n]
+
+
+def _geographic_result(totais_linhas, moldura, miolo, total_numeros, total_concursos,
+                       distribuicoes_linhas, distribuicoes_moldura):
+    """
+    Monta o resultado de calculate_consolidated_geographic_analysis a partir dos totais.
+
+    Args:
+        totais_linhas: Quantidade de números sorteados em cada linha do volante
+        moldura, miolo: Quantidade de números sorteados na moldura e no miolo
+        total_numeros: Quantidade de números sorteados
+        total_concursos: Quantidade de concursos
+        distribuicoes_linhas: Itens (código, contagem) das distribuições por linha,
+            na ordem da primeira ocorrência (código: um dígito hexadecimal por linha)
+        distribuicoes_moldura: Itens (moldura * 16 + miolo, contagem), idem
+    """
+    linhas = []
+    for i, count in enumerate(totais_linhas, 1):
+        linha = {'linha': i, 'range': f"{(i-1)*5+1}-{i*5}"}
+        linha.update(_region_stats(count, total_numeros, total_concursos))
+        linhas.append(linha)
+
+    linhas_comuns = [
+        ("-".join(str(codigo // 16 ** k % 16) for k in range(4, -1, -1)), qtd)
+        for codigo, qtd in _most_common_items(distribuicoes_linhas, 5)
+    ]
+    moldura_comuns = [
+        (f"{codigo // 16}M-{codigo % 16}Mi", qtd)
+        for codigo, qtd in _most_common_items(distribuicoes_moldura, 5)
+    ]
+
+    return {
+        'linhas': linhas,
+        'moldura': _region_stats(moldura, total_numeros, total_concursos),
+        'miolo': _region_stats(miolo, total_numeros, total_concursos),
+        'distribuicoes_linhas_comuns': linhas_comuns,
+        'distribuicoes_moldura_comuns': moldura_comuns
+    }
+
+
+# --- cycle_analysis --------------------------------------------------------------
+
+def analyze_cycle_exit_patterns(df):
+    """Versão vetorizada de cycle_analysis.analyze_cycle_exit_patterns."""
+    df = _with_cycle(df)
+    _, ciclos, passos, novos, _, depois = _cycle_steps(df)
+
+    # Fim de cada ciclo: a linha seguinte começa outro (passo 1)
+    inicios = np.flatnonzero(passos == 1)
+    fins = np.r_[inicios[1:], len(passos)]
+    novos = novos.tolist()
+
+    cycle_patterns = [
+        "-".join(map(str, novos[inicio:fim]))
+        for inicio, fim in zip(inicios.tolist(), fins.tolist())
+        if depois[fim - 1] == dm.MASCARA_TODOS
+    ]
+
+    return _exit_patterns_result(Counter(cycle_patterns))
+
+
+def _exit_patterns_result(padroes):
+    """Monta o resultado de analyze_cycle_exit_patterns a partir da contagem de cada padrão (ordem de inserção)."""
+    df_patterns = pd.DataFrame(padroes.items(), columns=["Padrao", "Frequencia"])
+    df_patterns["Percentual"] = (df_patterns["Frequencia"] / df_patterns["Frequencia"].sum()) * 100
+    df_patterns = df_patterns.sort_values("Frequencia", ascending=False)
+
+    return df_patterns
+
+
+def analyze_new_numbers_distribution(df):
+    """Versão vetorizada de cycle_analysis.analyze_new_numbers_distribution."""
+    df = _with_cycle(df)
+    _, _, passos, novos, antes, _ = _cycle_steps(df)
+
+    # A referência para de ler o ciclo no sorteio que completa os 25 números
+    considerar = (passos > 1) & (antes != dm.MASCARA_TODOS)
+    passos = passos[considerar]
+    novos = novos[considerar]
+
+    ordem = np.argsort(passos, kind='stable')
+    passos, novos = passos[ordem], novos[ordem]
+    limites = np.flatnonzero(np.diff(passos)) + 1
+
+    por_passo = {
+        int(bloco_passos[0]): _items(*_counter_items(bloco_novos))
+        for bloco_passos, bloco_novos in zip(np.split(passos, limites), np.split(novos, limites))
+        if len(bloco_passos)
+    }
+    return _new_numbers_result(por_passo)
+
+
+def _new_numbers_result(por_passo):
+    """
+    Monta o resultado de analyze_new_numbers_distribution.
+
+    Args:
+        por_passo: {passo: itens (quantidade de novos, contagem) na ordem de inserção}
+    """
+    results = {}
+    for passo in sorted(por_passo):
+        df_dist = pd.DataFrame(por_passo[passo], columns=["Qtd_Novos", "Frequencia"])
+        df_dist["Qtd_Novos"] = df_dist["Qtd_Novos"].astype(int)
+        df_dist["Percentual"] = (df_dist["Frequencia"] / df_dist["Frequencia"].sum()) * 100
+        df_dist = df_dist.sort_values("Qtd_Novos")
+        results[passo] = df_dist
+
+    return results
+
+
+def analyze_frequency_by_cycle_step(df, max_steps=4):
+    """Versão vetorizada de cycle_analysis.analyze_frequency_by_cycle_step."""
+    df = _with_cycle(df)
+    ordem, _, passos, _, _, _ = _cycle_steps(df)
+    bolas = _bolas(df)[ordem]
+
+    por_passo = {}
+    for step in range(1, max_steps + 1):
+        numeros = _drawn_numbers(bolas[passos == step])
+        if len(numeros):
+            por_passo[step] = _items(*_counter_items(numeros))
+    return _step_frequency_result(por_passo, max_steps)
+
+
+def _step_frequency_result(por_passo, max_steps):
+    """
+    Monta o resultado de analyze_frequency_by_cycle_step.
+
+    Args:
+        por_passo: {passo: itens (número, contagem) na ordem de inserção}
+        max_steps: Último passo considerado
+    """
+    results = {}
+    for step in range(1, max_steps + 1):
+        if not por_passo.get(step):
+            continue
+        df_freq = pd.DataFrame(por_passo[step], columns=["Numero", "Frequencia"])
+
+        total_occurrences = df_freq["Frequencia"].sum()
+        df_freq["Percentual"] = (df_freq["Frequencia"] / total_occurrences) * 100
+        df_freq = df_freq.sort_values("Frequencia", ascending=False)
+        results[step] = df_freq
+
+    return results
+
+
+# --- game_suggestions ------------------------------------------------------------
+
+def get_most_frequent_numbers(df, n=15):
+    """Versão vetorizada de game_suggestions.get_most_frequent_numbers."""
+    return sorted(num for num, _ in _most_common(_drawn_numbers(_bolas(df)), n))
+
+
+def get_missing_in_cycle(df):
+    """Versão vetorizada de game_suggestions.get_missing_in_cycle."""
+    ciclos = df["ciclo"].to_numpy()
+    masks = dm.calculate_masks(df)[ciclos == ciclos.max()]
+    no_ciclo = int(np.bitwise_or.reduce(masks)) if len(masks) else 0
+    return dm.mask_to_numbers(dm.MASCARA_TODOS & ~no_ciclo)
+
+
+def get_hot_numbers(df, last_n=50, top=15):
+    """Versão vetorizada de game_suggestions.get_hot_numbers."""
+    return sorted(num for num, _ in _most_common(_drawn_numbers(_bolas(df.tail(last_n))), top))
+
+
+def _fill_with(jogo, frequentes):
+    """Completa o jogo até 15 números seguindo a lista de frequentes."""
+    if len(jogo) < 15:
+        for n in frequentes:
+            if n not in jogo:
+                jogo.append(n)
+            if len(jogo) == 15:
+                break
+    return jogo
+
+
+def generate_balanced_game(df):
+    """Versão vetorizada de game_suggestions.generate_balanced_game."""
+    frequentes = get_most_frequent_numbers(df, 25)
+    pares_freq = [n for n in frequentes if n % 2 == 0][:7]
+    impares_freq = [n for n in frequentes if n % 2 == 1][:8]
+    return sorted(pares_freq + impares_freq)
+
+
+def generate_mixed_strategy(df):
+    """Versão vetorizada de game_suggestions.generate_mixed_strategy."""
+    frequentes = get_most_frequent_numbers(df, 25)
+    faltantes = get_missing_in_cycle(df)
+
+    if len(faltantes) >= 8:
+        jogo = faltantes[:8] + [n for n in frequentes if n not in faltantes][:7]
+    else:
+        jogo = faltantes + [n for n in frequentes if n not in faltantes][:15-len(faltantes)]
+
+    return sorted(jogo[:15])
+
+
+def generate_cycle_priority(df):
+    """Versão vetorizada de game_suggestions.generate_cycle_priority."""
+    faltantes = get_missing_in_cycle(df)
+    frequentes = get_most_frequent_numbers(df, 25)
+
+    if len(faltantes) >= 15:
+        jogo = faltantes[:15]
+    else:
+        jogo = faltantes + [n for n in frequentes if n not in faltantes][:15-len(faltantes)]
+
+    return sorted(jogo)
+
+
+def generate_recent_hot(df):
+    """Versão vetorizada de game_suggestions.generate_recent_hot."""
+    return get_hot_numbers(df, last_n=30, top=15)
+
+
+def generate_combined_analysis(df):
+    """Versão vetorizada de game_suggestions.generate_combined_analysis."""
+    frequentes = get_most_frequent_numbers(df, 20)
+    quentes = get_hot_numbers(df, last_n=40, top=20)
+    faltantes = get_missing_in_cycle(df)
+
+    pontos = {}
+    for num in range(1, 26):
+        pontos[num] = (3 if num in frequentes[:10] else 0) + (2 if num in quentes[:10] else 0) \
+            + (1 if num in faltantes else 0)
+
+    numeros_ordenados = sorted(pontos.items(), key=lambda x: x[1], reverse=True)
+    return sorted(num for num, _ in numeros_ordenados[:15])
+
+
+def generate_heat_map_based(df):
+    """Versão vetorizada de game_suggestions.generate_heat_map_based."""
+    heat_map_sorted = sorted(calculate_heat_map(df)['heat_map'], key=lambda x: x['intensidade'], reverse=True)
+    return sorted(item['numero'] for item in heat_map_sorted[:15])
+
+
+def generate_geographic_balanced(df):
+    """Versão vetorizada de game_suggestions.generate_geographic_balanced."""
+    frequentes = get_most_frequent_numbers(df, 25)
+    jogo = [n for n in frequentes if n in MOLDURA][:9] + [n for n in frequentes if n in MIOLO][:6]
+    return sorted(_fill_with(jogo, frequentes)[:15])
+
+
+def generate_quadrant_based(df):
+    """Versão vetorizada de game_suggestions.generate_quadrant_based."""
+    quadrantes = calculate_heat_map(df)['quadrantes']
+    q_sorted = sorted(quadrantes.items(), key=lambda x: x[1]['percentual'], reverse=True)
+
+    frequentes = get_most_frequent_numbers(df, 25)
+    jogo = []
+    for _, q_data in q_sorted:
+        q_nums = [n for n in frequentes if n in q_data['numeros'] and n not in jogo]
+        jogo.extend(q_nums[:max(1, int(15 * q_data['percentual'] / 100))])
+        if len(jogo) >= 15:
+            break
+
+    return sorted(_fill_with(jogo, frequentes)[:15])
+
+
+def generate_moldura_priority(df):
+    """Versão vetorizada de game_suggestions.generate_moldura_priority."""
+    geo_stats = calculate_consolidated_geographic_analysis(df)
+    frequentes = get_most_frequent_numbers(df, 25)
+
+    target_moldura = int(geo_stats['moldura']['media_por_jogo'])
+    jogo = [n for n in frequentes if n in MOLDURA][:target_moldura] \
+        + [n for n in frequentes if n in MIOLO][:15 - target_moldura]
+
+    return sorted(_fill_with(jogo, frequentes)[:15])
+
+
+def generate_line_balanced(df):
+    """Versão vetorizada de game_suggestions.generate_line_balanced."""
+    geo_stats = calculate_consolidated_geographic_analysis(df)
+    frequentes = get_most_frequent_numbers(df, 25)
+
+    jogo = []
+    for linha_data in geo_stats['linhas']:
+        linha_range = range((linha_data['linha'] - 1) * 5 + 1, linha_data['linha'] * 5 + 1)
+        linha_nums = [n for n in frequentes if n in linha_range and n not in jogo]
+        jogo.extend(linha_nums[:int(linha_data['media_por_jogo'])])
+
+    return sorted(_fill_with(jogo, frequentes)[:15])
+
+
+def _complete_with_repeated(df, faltantes, numeros_selecionados):
+    """Completa o jogo com os números já sorteados no ciclo, dos mais quentes aos mais frios."""
+    numeros_no_ciclo = list(set(range(1, 26)) - set(faltantes))
+    quentes = get_hot_numbers(df, last_n=20, top=25)
+    repetidos_ordenados = sorted(numeros_no_ciclo, key=lambda x: quentes.index(x) if x in quentes else 99)
+    numeros_selecionados.extend(repetidos_ordenados[:15 - len(numeros_selecionados)])
+    return sorted(numeros_selecionados[:15])
+
+
+def _suggested_new_count(dist_stats, passo, faltantes, padrao):
+    """Quantidade de novos mais frequente no passo (ou `padrao`), limitada aos faltantes."""
+    qtd = 0
+    if passo in dist_stats and not dist_stats[passo].empty:
+        qtd = int(dist_stats[passo].iloc[0]["Qtd_Novos"])
+    if qtd == 0:
+        qtd = padrao
+    return min(qtd, len(faltantes))
+
+
+def generate_smart_cycle_strategy(df):
+    """Versão vetorizada de game_suggestions.generate_smart_cycle_strategy."""
+    df = _with_cycle(df)
+    faltantes = get_missing_in_cycle(df)
+    qtd_faltantes = len(faltantes)
+    if qtd_faltantes == 0:
+        return generate_recent_hot(df)
+
+    ciclos = df["ciclo"].to_numpy()
+    passo_atual = int((ciclos == ciclos.max()).sum()) + 1
+    qtd_novos = _suggested_new_count(analyze_new_numbers_distribution(df), passo_atual, faltantes,
+                                     min(qtd_faltantes, 2 if qtd_faltantes > 2 else qtd_faltantes))
+
+    frequentes = get_most_frequent_numbers(df, 25)
+    faltantes_ordenados = sorted(faltantes, key=lambda x: frequentes.index(x) if x in frequentes else 99)
+    return _complete_with_repeated(df, faltantes, faltantes_ordenados[:qtd_novos])
+
+
+def generate_cycle_next_step_strategy(df):
+    """Versão vetorizada de game_suggestions.generate_cycle_next_step_strategy."""
+    df = _with_cycle(df)
+    faltantes = get_missing_in_cycle(df)
+    if len(faltantes) == 0:
+        return generate_recent_hot(df)
+
+    ciclos = df["ciclo"].to_numpy()
+    proximo_passo = int((ciclos == ciclos.max()).sum()) + 1
+
+    freq_data = analyze_frequency_by_cycle_step(df, max_steps=15)
+    prioridade_faltantes = []
+    if proximo_passo in freq_data:
+        df_freq = freq_data[proximo_passo]
+        prioridade_faltantes = df_freq[df_freq['Numero'].isin(faltantes)]['Numero'].tolist()
+
+    frequentes = None
+    if not prioridade_faltantes:
+        frequentes = get_most_frequent_numbers(df, 25)
+        prioridade_faltantes = sorted(faltantes, key=lambda x: frequentes.index(x) if x in frequentes else 99)
+    else:
+        remaining_missing = [n for n in faltantes if n not in prioridade_faltantes]
+        if remaining_missing:
+            frequentes = get_most_frequent_numbers(df, 25)
+            prioridade_faltantes.extend(
+                sorted(remaining_missing, key=lambda x: frequentes.index(x) if x in frequentes else 99)
+            )
+
+    qtd_novos = _suggested_new_count(analyze_new_numbers_distribution(df), proximo_passo, faltantes,
+                                     min(len(faltantes), 2))
+    return _complete_with_repeated(df, faltantes, prioridade_faltantes[:qtd_novos])
@@ -1,9 +1,14 @@
+import numpy as np
 import pandas as pd
 import random
 from collections import Counter
 
+import source.combination_index as ci
 import source.cycle_analysis as ca
 import source.cycle_calculator as cc
+import source.draw_masks as dm
+import source.metrics as mt
+import source.repetition_analysis as ra
 
 
 def get_most_frequent_numbers(df, n=15):
@@ -575,14 +580,107 @@ def generate_cycle_next_step_strategy(df):
     return sorted(numeros_selecionados[:15])
 
 
-def generate_suggestions(df, num_games=9):
+def generate_repetition_based(df, masks=None, indice=None):
+    """
+    Gera um jogo baseado na quantidade de repetições do último concurso.
+    Usa a quantidade de repetições mais provável (dado o último concurso) e
+    escolhe os repetidos e os novos entre os mais quentes recentes.
+    
+    Args:
+        df: DataFrame com os concursos
+        masks: Máscaras dos sorteios já calculadas (padrão: calculadas do DataFrame)
+        indice: Índice de repetition_analysis.build_repetition_index destas máscaras
+        
+    Returns:
+        list: Lista com 15 números
+    """
+    if masks is None:
+        masks = dm.calculate_masks(df)
+    if indice is None:
+        indice = ra.build_repetition_index(masks)
+    qtd_repetidos = min(ra.most_likely_repeats(indice), 15)
+    
+    # Ordenar números por frequência nos últimos 30 concursos (empate: menor número)
+    recentes = masks[-30:]
+    frequencias = ((recentes[:, None] >> np.arange(25, dtype=np.uint32)) & 1).sum(axis=0).astype(np.int64)
+    por_quentura = sorted(range(1, 26), key=lambda x: (-frequencias[x - 1], x))
+    
+    ultimo = set(dm.mask_to_numbers(masks[-1]))
+    repetidos = [n for n in por_quentura if n in ultimo][:qtd_repetidos]
+    novos = [n for n in por_quentura if n not in ultimo][:15 - len(repetidos)]
+    
+    jogo = repetidos + novos
+    if len(jogo) < 15:
+        jogo.extend([n for n in por_quentura if n not in jogo][:15 - len(jogo)])
+    
+    return sorted(jogo)
+
+
+def _run_strategy(estrategia, df, funcoes=None, **kwargs):
+    """
+    Executa uma estratégia medindo o seu tempo (métricas e Server-Timing).
+
+    Args:
+        estrategia: Função da estratégia
+        df: DataFrame com os concursos
+        funcoes: Implementações alternativas por nome (ex: as de fast_analysis)
+        **kwargs: Dados já calculados aceitos pela estratégia (ex: masks)
+    """
+    estrategia = (funcoes or {}).get(estrategia.__name__, estrategia)
+    with mt.stage(estrategia.__name__):
+        return estrategia(df, **kwargs)
+
+
+def _next_undrawn(df, numeros, indice, usados):
+    """
+    Próximo candidato de uma estratégia cujo jogo já foi sorteado.
+
+    Troca um número do jogo por um de fora, começando pelo número menos
+    frequente do jogo e pelo mais frequente de fora do jogo, até obter uma
+    combinação nunca sorteada e diferente das demais sugestões. Uma troca
+    quase sempre basta (só ~0,1% das combinações já saíram).
+
+    Args:
+        df: DataFrame com os concursos
+        numeros: Jogo de 15 números já sorteado
+        indice: Índice de combination_index.build_drawn_index
+        usados: Jogos (tuplas ordenadas) já presentes nas sugestões
+
+    Returns:
+        list: Jogo ordenado, ou None se nenhuma troca simples servir
+    """
+    bolas = df[dm.LST_CAMPOS].to_numpy(dtype=float).ravel()
+    contagens = np.bincount(bolas[~np.isnan(bolas)].astype(int), minlength=26)
+    por_frequencia = sorted(range(1, 26), key=lambda n: (-contagens[n], n))
+    dentro = [n for n in reversed(por_frequencia) if n in numeros]
+    fora = [n for n in por_frequencia if n not in numeros]
+
+    for sai in dentro:
+        for entra in fora:
+            candidato = sorted([n for n in numeros if n != sai] + [entra])
+            if tuple(candidato) not in usados and not ci.is_drawn(indice, candidato):
+                return candidato
+    return None
+
+
+def generate_suggestions(df, num_games=9, exclude_drawn=True, funcoes=None, indice_sorteados=None,
+                         masks=None, indice_repeticoes=None):
     """
     Gera sugestões de jogos com diferentes estratégias.
     Remove duplicatas e agrupa estratégias que geraram o mesmo jogo.
     
     Args:
         df: DataFrame com os concursos e coluna 'ciclo'
-        num_games: Número de sugestões a gerar
+        num_games: Número de sugestões a gerar (None para todas)
+        exclude_drawn: Se True, um jogo que já foi sorteado é trocado pelo
+            próximo candidato da estratégia (ver _next_undrawn)
+        funcoes: Implementações alternativas das estratégias por nome da função
+            (ex: as versões vetorizadas de fast_analysis, com o mesmo resultado)
+        indice_sorteados: Índice de combinações sorteadas deste histórico
+            (padrão: combination_index.build_drawn_index(df))
+        masks: Máscaras dos sorteios deste histórico (padrão: calculadas quando preciso)
+        indice_repeticoes: Índice de repetition_analysis.build_repetition_index
+            destas máscaras (padrão: calculado pela estratégia)
         
     Returns:
         list: Lista de dicionários com 'estrategia', 'descricao' e 'numeros'
@@ -591,57 +689,63 @@ def generate_suggestions(df, num_games=9):
         {
             'estrategia': '🔥 Áreas Mais Quentes',
             'descricao': 'Baseado no mapa de calor - números das posições mais frequentes',
-            'numeros': generate_heat_map_based(df)
+            'numeros': _run_strategy(generate_heat_map_based, df, funcoes)
         },
         {
             'estrategia': '🎯 Faltantes no Ciclo',
             'descricao': 'Prioriza números que ainda não saíram no ciclo atual',
-            'numeros': generate_cycle_priority(df)
+            'numeros': _run_strategy(generate_cycle_priority, df, funcoes)
         },
         {
             'estrategia': '🗺️ Equilíbrio Geográfico',
             'descricao': 'Balanceia moldura/miolo baseado em padrões históricos',
-            'numeros': generate_geographic_balanced(df)
+            'numeros': _run_strategy(generate_geographic_balanced, df, funcoes)
         },
         {
             'estrategia': '🎲 Quadrantes Quentes',
             'descricao': 'Prioriza números dos quadrantes mais frequentes',
-            'numeros': generate_quadrant_based(df)
+            'numeros': _run_strategy(generate_quadrant_based, df, funcoes)
         },
         {
             'estrategia': '🔲 Foco na Moldura',
             'descricao': 'Prioriza números nas bordas da cartela',
-            'numeros': generate_moldura_priority(df)
+            'numeros': _run_strategy(generate_moldura_priority, df, funcoes)
         },
         {
             'estrategia': '📊 Equilíbrio por Linhas',
             'descricao': 'Distribui números balanceadamente pelas 5 linhas',
-            'numeros': generate_line_balanced(df)
+            'numeros': _run_strategy(generate_line_balanced, df, funcoes)
         },
         {
             'estrategia': '⚖️ Pares-Ímpares-Primos',
             'descricao': 'Mix equilibrado seguindo configurações mais comuns',
-            'numeros': generate_balanced_game(df)
+            'numeros': _run_strategy(generate_balanced_game, df, funcoes)
         },
         {
             'estrategia': '🔥 Números Quentes Recentes',
             'descricao': 'Números mais frequentes nos últimos 30 concursos',
-            'numeros': generate_recent_hot(df)
+            'numeros': _run_strategy(generate_recent_hot, df, funcoes)
         },
         {
             'estrategia': '🔄 Ciclo Inteligente (Probabilidade)',
             'descricao': 'Usa estatística de "quantos novos" virão na próxima rodada',
-            'numeros': generate_smart_cycle_strategy(df)
+            'numeros': _run_strategy(generate_smart_cycle_strategy, df, funcoes)
         },
         {
             'estrategia': '🔮 Ciclo Próxima Rodada (Frequência)',
             'descricao': 'Prioriza números que historicamente saem nesta rodada específica do ciclo',
-            'numeros': generate_cycle_next_step_strategy(df)
+            'numeros': _run_strategy(generate_cycle_next_step_strategy, df, funcoes)
         },
         {
             'estrategia': '🧠 Análise Combinada',
             'descricao': 'Algoritmo que pondera múltiplos fatores estatísticos',
-            'numeros': generate_combined_analysis(df)
+            'numeros': _run_strategy(generate_combined_analysis, df, funcoes)
+        },
+        {
+            'estrategia': '🔁 Repetições do Último Concurso',
+            'descricao': 'Repete do último concurso a quantidade mais provável de números',
+            'numeros': _run_strategy(generate_repetition_based, df, funcoes,
+                                     masks=masks, indice=indice_repeticoes)
         }
     ]
     
@@ -662,6 +766,22 @@ def generate_suggestions(df, num_games=9):
     # Converter de volta para lista
     lista_final = list(sugestoes_unicas.values())
     
+    # Trocar combinações já sorteadas pelo próximo candidato (consulta O(1) pelo rank)
+    if exclude_drawn:
+        indice = indice_sorteados if indice_sorteados is not None else ci.build_drawn_index(df)
+        usados = set(sugestoes_unicas)
+        for i, sug in enumerate(lista_final):
+            if len(set(sug['numeros'])) != 15 or not ci.is_drawn(indice, sug['numeros']):
+                continue
+            candidato = _next_undrawn(df, sug['numeros'], indice, usados)
+            if candidato is not None:
+                usados.add(tuple(candidato))
+                lista_final[i] = dict(sug, numeros=candidato)
+        lista_final = [
+            sug for sug in lista_final
+            if len(set(sug['numeros'])) != 15 or not ci.is_drawn(indice, sug['numeros'])
+        ]
+    
     # Limitar quantidade se necessário (mas priorizar unicidade)
     return lista_final[:num_games]
 
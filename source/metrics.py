@@ -0,0 +1,192 @@
+"""
+Módulo de métricas e tempos por etapa.
+
+Cada etapa do processamento (leitura da planilha, ciclos, P-I-NP, cada seção
+da página, cada estratégia de sugestão, renderização dos templates) é
+medida com:
+
+    with mt.stage("calculate_cycle"):
+        ...
+
+O tempo vai para um histograma por etapa e, durante uma requisição, para a
+lista de tempos da própria requisição (contextvars), enviada no cabeçalho
+Server-Timing. Contadores (acertos e faltas de cache, jobs de atualização),
+histogramas e a versão dos dados são expostos em /metrics no formato texto
+do Prometheus.
+
+As métricas são por processo: com vários workers do gunicorn, cada um
+expõe as suas.
+"""
+
+import contextvars
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites (segundos) dos buckets dos histogramas
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Métricas conhecidas: nome -> (tipo, descrição)
+METRICAS = {
+    'lotopy_request_duration_seconds': ('histogram', 'Duração das requisições por endpoint'),
+    'lotopy_requests_total': ('counter', 'Requisições por endpoint e status HTTP'),
+    'lotopy_stage_duration_seconds': ('histogram', 'Duração de cada etapa do processamento'),
+    'lotopy_response_cache_total': ('counter', 'Respostas do cache HTTP (hit, miss, not_modified)'),
+    'lotopy_section_cache_total': ('counter', 'Acessos às seções do snapshot (hit, shared, miss, incremental)'),
+    'lotopy_snapshot_loads_total': ('counter', 'Snapshots carregados (build, attach)'),
+    'lotopy_snapshot_revalidations_total': ('counter', 'Recálculos em segundo plano de uma nova versão (ok, erro)'),
+    'lotopy_snapshot_coalesced_total': ('counter', 'Requisições que não recalcularam o snapshot (anterior, aguardou)'),
+    'lotopy_refresh_duration_seconds': ('histogram', 'Duração dos jobs de atualização da base'),
+    'lotopy_refresh_jobs_total': ('counter', 'Jobs de atualização finalizados por status'),
+    'lotopy_data_info': ('gauge', 'Versão dos dados em uso'),
+    'lotopy_data_contests': ('gauge', 'Quantidade de concursos na versão em uso'),
+}
+
+_lock = threading.Lock()
+_contadores = {}    # (nome, labels) -> valor
+_medidores = {}     # (nome, labels) -> valor
+_histogramas = {}   # (nome, labels) -> [contagens por bucket, soma, total]
+
+# Tempos da requisição atual: lista de (etapa, segundos) ou None fora de uma requisição
+_tempos_requisicao = contextvars.ContextVar("lotopy_tempos_requisicao", default=None)
+
+
+def _key(nome, labels):
+    return nome, tuple(sorted(labels.items()))
+
+
+def inc(nome, valor=1, **labels):
+    """Incrementa um contador."""
+    chave = _key(nome, labels)
+    with _lock:
+        _contadores[chave] = _contadores.get(chave, 0) + valor
+
+
+def set_gauge(nome, valor, substituir=False, **labels):
+    """
+    Define o valor de um medidor.
+
+    Args:
+        nome: Nome da métrica
+        valor: Valor atual
+        substituir: Se True, remove as demais séries da métrica (ex: versão anterior)
+        **labels: Labels da série
+    """
+    chave = _key(nome, labels)
+    with _lock:
+        if substituir:
+            for outra in [c for c in _medidores if c[0] == nome]:
+                del _medidores[outra]
+        _medidores[chave] = valor
+
+
+def observe(nome, segundos, **labels):
+    """Registra uma duração em um histograma."""
+    chave = _key(nome, labels)
+    with _lock:
+        histograma = _histogramas.get(chave)
+        if histograma is None:
+            histograma = _histogramas[chave] = [[0] * len(BUCKETS), 0.0, 0]
+        for i, limite in enumerate(BUCKETS):
+            if segundos <= limite:
+                histograma[0][i] += 1
+        histograma[1] += segundos
+        histograma[2] += 1
+
+
+@contextmanager
+def stage(nome):
+    """
+    Mede uma etapa: histograma por etapa e, em uma requisição, Server-Timing.
+
+    Args:
+        nome: Nome da etapa (ex: "adjust_table", "secao.heatmap")
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        observe('lotopy_stage_duration_seconds', duracao, stage=nome)
+        tempos = _tempos_requisicao.get()
+        if tempos is not None:
+            tempos.append((nome, duracao))
+
+
+def start_request():
+    """Inicia a coleta dos tempos da requisição atual."""
+    _tempos_requisicao.set([])
+
+
+def server_timing(total=None):
+    """
+    Monta o cabeçalho Server-Timing com as etapas da requisição atual.
+
+    Args:
+        total: Duração total da requisição em segundos (opcional)
+
+    Returns:
+        str: Valor do cabeçalho (vazio se não houver etapas)
+    """
+    tempos = list(_tempos_requisicao.get() or [])
+    if total is not None:
+        tempos.append(('total', total))
+    # Nomes do Server-Timing são tokens HTTP: sem espaços, acentos ou ':'
+    return ", ".join(
+        f"{re.sub(r'[^A-Za-z0-9_.-]', '-', nome)};dur={duracao * 1000:.1f}"
+        for nome, duracao in tempos
+    )
+
+
+def _format_labels(labels, extra=()):
+    pares = list(labels) + list(extra)
+    if not pares:
+        return ""
+    valores = (
+        str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        for _, valor in pares
+    )
+    return "{" + ",".join(f'{nome}="{valor}"' for (nome, _), valor in zip(pares, valores)) + "}"
+
+
+def _format_number(valor):
+    if valor == math.inf:
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def render():
+    """
+    Exporta as métricas no formato texto do Prometheus (versão 0.0.4).
+
+    Returns:
+        str: Texto para a rota /metrics
+    """
+    with _lock:
+        contadores = dict(_contadores)
+        medidores = dict(_medidores)
+        histogramas = {chave: (list(h[0]), h[1], h[2]) for chave, h in _histogramas.items()}
+
+    linhas = []
+    for nome, (tipo, ajuda) in METRICAS.items():
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+
+        if tipo == 'histogram':
+            for (n, labels), (contagens, soma, total) in sorted(histogramas.items()):
+                if n != nome:
+                    continue
+                for limite, contagem in zip(BUCKETS, contagens):
+                    linhas.append(f"{nome}_bucket{_format_labels(labels, [('le', _format_number(limite))])} {contagem}")
+                linhas.append(f"{nome}_bucket{_format_labels(labels, [('le', '+Inf')])} {total}")
+                linhas.append(f"{nome}_sum{_format_labels(labels)} {_format_number(soma)}")
+                linhas.append(f"{nome}_count{_format_labels(labels)} {total}")
+        else:
+            series = contadores if tipo == 'counter' else medidores
+            for (n, labels), valor in sorted(series.items()):
+                if n == nome:
+                    linhas.append(f"{nome}{_format_labels(labels)} {_format_number(valor)}")
+
+    return "\n".join(linhas) + "\n"
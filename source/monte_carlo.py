@@ -0,0 +1,245 @@
+"""
+Módulo de simulação Monte Carlo para avaliar estratégias de jogos.
+
+Simula milhões de sorteios aleatórios da Lotofácil e confere os jogos de cada
+estratégia contra eles, estimando a probabilidade de cada faixa de premiação
+e o retorno esperado por aposta, com intervalos de confiança.
+
+Os sorteios são gerados em lotes como máscaras de bits: um rank uniforme
+entre 0 e 3.268.759 é sorteado e convertido pela tabela de todas as
+combinações. Os acertos são contados com AND + popcount e os lotes são
+distribuídos entre processos com sementes derivadas da semente principal,
+de forma que o resultado é reprodutível (e independe da quantidade de
+processos). O pool de processos é criado uma única vez por processo e
+reaproveitado; no servidor web a simulação roda no próprio worker
+(processos=1).
+
+Jogos com 16 a 20 números são avaliados como as C(k, 15) apostas simples
+contidas neles (tabela de prêmios de ticket_evaluation), e o preço do jogo
+é C(k, 15) vezes o preço da aposta simples.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from math import comb, sqrt
+
+import numpy as np
+
+import source.combination_index as ci
+import source.draw_masks as dm
+import source.game_suggestions as gs
+import source.ticket_evaluation as te
+
+FAIXAS_PREMIO = (11, 12, 13, 14, 15)
+
+# Valores de prêmio por faixa (R$). As faixas de 11 a 13 acertos têm prêmio fixo;
+# 14 e 15 acertos são rateados, então usamos valores médios aproximados.
+PREMIOS_FAIXA = {11: 7.0, 12: 14.0, 13: 35.0, 14: 1500.0, 15: 1500000.0}
+PRECO_APOSTA = 3.5
+
+# Quantidade de sorteios simulados por lote (memória: lote x jogos bytes)
+TAMANHO_LOTE = 1_000_000
+
+# Valor z para intervalos de confiança de 95%
+Z_95 = 1.959963984540054
+
+_pool = None
+_pool_processos = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(processos):
+    """Pool de processos do módulo, criado no primeiro uso (e ampliado se necessário)."""
+    global _pool, _pool_processos
+    with _pool_lock:
+        if _pool is None or _pool_processos < processos:
+            if _pool is not None:
+                _pool.shutdown(wait=True)
+            _pool = ProcessPoolExecutor(max_workers=processos)
+            _pool_processos = processos
+        return _pool
+
+
+def _simulate_batch(args):
+    """
+    Simula um lote de sorteios e conta os acertos de cada jogo por faixa.
+
+    Args:
+        args: Tupla (máscaras dos jogos, quantidade de sorteios, SeedSequence do lote)
+
+    Returns:
+        np.ndarray: Matriz int64 [jogos x 16] com a contagem de sorteios por quantidade de acertos
+    """
+    ticket_masks, n_sorteios, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+    tabela = ci.all_combination_masks()
+
+    draws = tabela[rng.integers(0, ci.TOTAL_COMBINACOES, size=n_sorteios)]
+
+    contagens = np.zeros((len(ticket_masks), 16), dtype=np.int64)
+    for j, ticket in enumerate(ticket_masks):
+        acertos = dm.popcount(draws & np.uint32(ticket))
+        contagens[j] = np.bincount(acertos, minlength=16)[:16]
+
+    return contagens
+
+
+def exact_hit_probability(qtd_numeros, acertos):
+    """
+    Probabilidade exata (hipergeométrica) de um jogo obter um número de acertos.
+
+    Args:
+        qtd_numeros: Quantidade de números do jogo (15 a 20)
+        acertos: Quantidade de acertos
+
+    Returns:
+        float: Probabilidade do jogo acertar exatamente essa quantidade
+    """
+    return comb(qtd_numeros, acertos) * comb(25 - qtd_numeros, 15 - acertos) / ci.TOTAL_COMBINACOES
+
+
+def wilson_interval(sucessos, total, z=Z_95):
+    """
+    Intervalo de confiança de Wilson para uma proporção.
+
+    Args:
+        sucessos: Quantidade de ocorrências
+        total: Quantidade de tentativas
+        z: Valor z do nível de confiança (padrão 95%)
+
+    Returns:
+        tuple: (limite inferior, limite superior)
+    """
+    if total == 0:
+        return (0.0, 1.0)
+
+    p = sucessos / total
+    denominador = 1 + z * z / total
+    centro = (p + z * z / (2 * total)) / denominador
+    margem = z * sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominador
+    return (max(0.0, centro - margem), min(1.0, centro + margem))
+
+
+def simulate_tickets(ticket_masks, n_sorteios=1_000_000, seed=42, processos=None,
+                     tamanho_lote=TAMANHO_LOTE, premios=None, preco=PRECO_APOSTA):
+    """
+    Simula sorteios aleatórios e estima probabilidades e retorno esperado de cada jogo.
+
+    As probabilidades por faixa são de o sorteio ter exatamente aquela
+    quantidade de acertos no jogo; o retorno de um jogo com k > 15 números
+    soma os prêmios das suas apostas simples em cada sorteio.
+
+    Args:
+        ticket_masks: Array com as máscaras de bits dos jogos (15 a 20 números)
+        n_sorteios: Quantidade total de sorteios simulados
+        seed: Semente do gerador aleatório
+        processos: Quantidade de processos (padrão: número de CPUs, até 8)
+        tamanho_lote: Quantidade de sorteios por lote
+        premios: Dicionário {faixa: valor do prêmio} (padrão: PREMIOS_FAIXA)
+        preco: Preço de uma aposta simples (jogos com k números custam C(k, 15) vezes)
+
+    Returns:
+        list: Lista de dicionários (um por jogo) com:
+            - faixas: {faixa: {ocorrencias, probabilidade, ic_95, probabilidade_exata}}
+            - retorno_esperado: prêmio médio do jogo por sorteio
+            - ic_95_retorno: intervalo de confiança do retorno esperado
+            - retorno_liquido: retorno esperado menos o preço do jogo
+
+    Raises:
+        ValueError: Se algum jogo não tiver de 15 a 20 números
+    """
+    premios = premios or PREMIOS_FAIXA
+    ticket_masks = np.asarray(ticket_masks, dtype=np.uint32)
+    qtd_numeros = dm.popcount(ticket_masks)
+    if np.any((qtd_numeros < te.MIN_NUMEROS_JOGO) | (qtd_numeros > te.MAX_NUMEROS_JOGO)):
+        raise ValueError(
+            f"Cada jogo deve ter de {te.MIN_NUMEROS_JOGO} a {te.MAX_NUMEROS_JOGO} números."
+        )
+
+    # valor_acertos[k, h]: prêmio total de um jogo de k números com h acertos
+    valor_acertos = sum(
+        te._PREMIOS[faixa].astype(np.float64) * premios[faixa] for faixa in FAIXAS_PREMIO
+    )
+
+    if processos is None:
+        processos = min(os.cpu_count() or 1, 8)
+
+    # Lotes de tamanho fixo: o resultado independe da quantidade de processos
+    tamanhos = [tamanho_lote] * (n_sorteios // tamanho_lote)
+    if n_sorteios % tamanho_lote:
+        tamanhos.append(n_sorteios % tamanho_lote)
+    sementes = np.random.SeedSequence(seed).spawn(len(tamanhos))
+    tarefas = [(ticket_masks, tamanho, semente) for tamanho, semente in zip(tamanhos, sementes)]
+
+    # Calcular a tabela antes de criar os processos (compartilhada via fork)
+    ci.all_combination_masks()
+
+    contagens = np.zeros((len(ticket_masks), 16), dtype=np.int64)
+    if processos > 1 and len(tarefas) > 1:
+        for parcial in _get_pool(processos).map(_simulate_batch, tarefas):
+            contagens += parcial
+    else:
+        for tarefa in tarefas:
+            contagens += _simulate_batch(tarefa)
+
+    resultados = []
+    for j in range(len(ticket_masks)):
+        k = int(qtd_numeros[j])
+        faixas = {}
+        for faixa in FAIXAS_PREMIO:
+            ocorrencias = int(contagens[j, faixa])
+            inferior, superior = wilson_interval(ocorrencias, n_sorteios)
+            faixas[str(faixa)] = {
+                'ocorrencias': ocorrencias,
+                'probabilidade': ocorrencias / n_sorteios,
+                'ic_95': [inferior, superior],
+                'probabilidade_exata': exact_hit_probability(k, faixa)
+            }
+
+        frequencias = contagens[j] / n_sorteios
+        retorno = float(frequencias @ valor_acertos[k])
+        segundo_momento = float(frequencias @ valor_acertos[k] ** 2)
+
+        # Intervalo normal para a média do prêmio por sorteio
+        erro_padrao = sqrt(max(0.0, segundo_momento - retorno ** 2) / n_sorteios)
+        resultados.append({
+            'faixas': faixas,
+            'retorno_esperado': retorno,
+            'ic_95_retorno': [retorno - Z_95 * erro_padrao, retorno + Z_95 * erro_padrao],
+            'retorno_liquido': retorno - preco * comb(k, 15)
+        })
+
+    return resultados
+
+
+def simulate_strategies(df, n_sorteios=1_000_000, seed=42, processos=None, sugestoes=None):
+    """
+    Avalia as estratégias de game_suggestions contra sorteios simulados.
+
+    Args:
+        df: DataFrame com os concursos e coluna 'ciclo'
+        n_sorteios: Quantidade de sorteios simulados
+        seed: Semente do gerador aleatório
+        processos: Quantidade de processos
+        sugestoes: Jogos já gerados pelas estratégias (ex: a seção 'suggestions'
+            do snapshot); padrão: game_suggestions.generate_suggestions(df)
+
+    Returns:
+        list: Lista de dicionários com 'estrategia', 'numeros' e as estimativas da simulação
+    """
+    if sugestoes is None:
+        sugestoes = gs.generate_suggestions(df, num_games=None, exclude_drawn=False)
+    ticket_masks = np.array([dm.numbers_to_mask(s['numeros']) for s in sugestoes], dtype=np.uint32)
+
+    simulacao = simulate_tickets(ticket_masks, n_sorteios=n_sorteios, seed=seed, processos=processos)
+
+    resultados = []
+    for sugestao, estimativa in zip(sugestoes, simulacao):
+        resultados.append({
+            'estrategia': sugestao['estrategia'],
+            'numeros': sugestao['numeros'],
+            **estimativa
+        })
+
+    return resultados
@@ -0,0 +1,198 @@
+"""
+Módulo de profiling sob demanda de requisições.
+
+Desligado por padrão. Com LOTOPY_PROFILING=1 e um token de administrador
+em LOTOPY_ADMIN_TOKEN, uma requisição que traga o token no parâmetro
+`?profile=<token>` ou no cabeçalho `X-Lotopy-Profile: <token>` roda sob o
+cProfile. O perfil é salvo em `<CACHE_DIR>/profiles/` (arquivo .prof do
+pstats e um .json com método, caminho, status e duração), mantendo apenas
+os LOTOPY_PROFILE_MAX mais recentes (50 por padrão).
+
+Os perfis são listados em /admin/profiles e podem ser baixados (.prof,
+para snakeviz/pstats) ou vistos como texto com as funções mais caras.
+Apenas uma requisição por processo é perfilada por vez; as demais seguem
+sem profiler. Em respostas em streaming (NDJSON/CSV) o corpo é gerado
+depois do after_request: o profiler só para quando o envio termina
+(response.call_on_close), e o perfil inclui a geração do corpo.
+"""
+
+import cProfile
+import glob
+import io
+import json
+import os
+import pstats
+import re
+import secrets
+import threading
+from datetime import datetime
+
+import source.array_cache as ac
+
+PROFILE_DIR = os.environ.get("LOTOPY_PROFILE_DIR", os.path.join(ac.CACHE_DIR, "profiles"))
+MAX_PERFIS = int(os.environ.get("LOTOPY_PROFILE_MAX", "50"))
+CABECALHO = "X-Lotopy-Profile"
+PARAMETRO = "profile"
+
+_ocupado = threading.Lock()
+
+
+def enabled():
+    """Profiling ligado: LOTOPY_PROFILING=1 e token de administrador definido."""
+    return os.environ.get("LOTOPY_PROFILING") == "1" and bool(os.environ.get("LOTOPY_ADMIN_TOKEN"))
+
+
+def check_token(token):
+    """
+    Confere o token de administrador (comparação em tempo constante).
+
+    Args:
+        token: Token recebido na requisição (ou None)
+
+    Returns:
+        bool: True se o profiling está ligado e o token confere
+    """
+    if not enabled() or not token:
+        return False
+    return secrets.compare_digest(str(token).encode(), os.environ["LOTOPY_ADMIN_TOKEN"].encode())
+
+
+def start(token):
+    """
+    Inicia o profiler para a requisição atual, se autorizado.
+
+    Args:
+        token: Token recebido na requisição
+
+    Returns:
+        cProfile.Profile ou None: Profiler ativo (None se não autorizado ou
+        se outra requisição já está sendo perfilada)
+    """
+    if not check_token(token) or not _ocupado.acquire(blocking=False):
+        return None
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except Exception:
+        _ocupado.release()
+        raise
+    return perfil
+
+
+def new_id(caminho):
+    """
+    Identificador de um perfil novo (data, pid e rota).
+
+    Args:
+        caminho: Caminho da requisição
+
+    Returns:
+        str: Identificador (ex: para o cabeçalho X-Profile-Id antes de o perfil ser salvo)
+    """
+    rota = re.sub(r"[^A-Za-z0-9]+", "_", caminho.split("?")[0]).strip("_") or "index"
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{secrets.token_hex(3)}-{rota[:40]}"
+
+
+def stop(perfil, metodo, caminho, status, duracao, perfil_id=None):
+    """
+    Para o profiler e salva o perfil em disco.
+
+    Args:
+        perfil: Profiler retornado por start()
+        metodo: Método HTTP
+        caminho: Caminho com a query string (sem o token)
+        status: Status HTTP da resposta
+        duracao: Duração da requisição em segundos
+        perfil_id: Identificador do perfil (padrão: new_id(caminho))
+
+    Returns:
+        str: Identificador do perfil salvo
+    """
+    try:
+        perfil.disable()
+    finally:
+        _ocupado.release()
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    agora = datetime.now()
+    perfil_id = perfil_id or new_id(caminho)
+
+    perfil.dump_stats(os.path.join(PROFILE_DIR, f"{perfil_id}.prof"))
+    # O .json é gravado por último: list_profiles() só enxerga perfis completos
+    with open(os.path.join(PROFILE_DIR, f"{perfil_id}.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            'id': perfil_id,
+            'metodo': metodo,
+            'caminho': caminho,
+            'status': status,
+            'duracao_ms': round(duracao * 1000, 1),
+            'data': agora.isoformat(timespec="seconds"),
+            'pid': os.getpid()
+        }, f, ensure_ascii=False)
+
+    _cleanup()
+    return perfil_id
+
+
+def _cleanup():
+    """Remove os perfis mais antigos além de MAX_PERFIS."""
+    arquivos = sorted(glob.glob(os.path.join(PROFILE_DIR, "*.json")), key=os.path.getmtime, reverse=True)
+    for antigo in arquivos[MAX_PERFIS:]:
+        for caminho in (antigo, antigo[:-len(".json")] + ".prof"):
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+
+def list_profiles():
+    """
+    Lista os perfis salvos, do mais recente ao mais antigo.
+
+    Returns:
+        list: Metadados de cada perfil (id, metodo, caminho, status, duracao_ms, data, pid)
+    """
+    perfis = []
+    for caminho in glob.glob(os.path.join(PROFILE_DIR, "*.json")):
+        try:
+            with open(caminho, encoding="utf-8") as f:
+                perfis.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(perfis, key=lambda p: p.get('data', ''), reverse=True)
+
+
+def profile_path(perfil_id):
+    """
+    Caminho do arquivo .prof de um perfil.
+
+    Raises:
+        ValueError: Identificador inválido
+        FileNotFoundError: Perfil inexistente (ou removido pela retenção)
+    """
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", perfil_id or ""):
+        raise ValueError("Identificador de perfil inválido.")
+    caminho = os.path.join(PROFILE_DIR, f"{perfil_id}.prof")
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(perfil_id)
+    return caminho
+
+
+def summary(perfil_id, ordenar="cumulative", limite=40):
+    """
+    Resumo em texto das funções mais caras de um perfil (saída do pstats).
+
+    Args:
+        perfil_id: Identificador do perfil
+        ordenar: Critério do pstats ("cumulative", "tottime", "ncalls")
+        limite: Quantidade de funções listadas
+
+    Returns:
+        str: Tabela do pstats
+    """
+    if ordenar not in ("cumulative", "tottime", "ncalls"):
+        raise ValueError("ordenar deve ser cumulative, tottime ou ncalls.")
+    saida = io.StringIO()
+    stats = pstats.Stats(profile_path(perfil_id), stream=saida)
+    stats.strip_dirs().sort_stats(ordenar).print_stats(limite)
+    return saida.getvalue()
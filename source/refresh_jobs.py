@@ -0,0 +1,351 @@
+"""
+Módulo de atualização da base de dados em segundo plano.
+
+O download da planilha da Caixa pode demorar; em vez de bloquear a
+requisição, a atualização roda em uma thread e é acompanhada por um id:
+
+    job = start_refresh()          # retorna na hora
+    get_job(job['id'])['status']   # pendente -> executando -> concluido/erro
+
+Ao concluir com dados novos, o snapshot de análises é recalculado e
+publicado de uma só vez. Opcionalmente, um agendador dispara a atualização
+nos horários próximos aos sorteios (variáveis de ambiente
+LOTOPY_AGENDAR_ATUALIZACAO e LOTOPY_HORARIOS_ATUALIZACAO).
+
+Com vários workers do gunicorn, o estado de cada job fica em
+`<CACHE_DIR>/jobs/<id>.json` (qualquer worker responde ao status), a
+verificação do job ativo é feita sob a trava de arquivo 'refresh' do
+shared_store (uma atualização por vez entre todos os processos) e apenas o
+processo que obtém a trava 'agendador' executa o agendador. O agendador é
+iniciado em cada worker (hook post_fork de gunicorn.conf.py), nunca no
+master: se o worker que detém a trava terminar, outro worker assume.
+"""
+
+import glob
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+import source.array_cache as ac
+import source.db_update as dbu
+import source.metrics as mt
+import source.shared_store as ss
+import source.snapshot as sn
+
+# Quantidade de jobs mantidos para consulta
+MAX_JOBS = 50
+
+# Estado dos jobs, compartilhado pelos processos
+JOBS_DIR = os.path.join(ac.CACHE_DIR, "jobs")
+ATIVO = os.path.join(JOBS_DIR, "ATIVO")
+
+_ID_JOB = re.compile(r"^[0-9a-f]{12}$")
+
+# Horários (hora de Brasília) em que o agendador verifica novos resultados.
+# Os sorteios acontecem de segunda a sábado às 20h; o resultado costuma ser
+# publicado alguns minutos depois.
+HORARIOS_PADRAO = "20:30,21:00,21:30,22:30"
+DIAS_SORTEIO = {0, 1, 2, 3, 4, 5}  # segunda a sábado
+FUSO_HORARIO = "America/Sao_Paulo"
+
+_lock = threading.Lock()
+_agendador = None
+_parar_agendador = threading.Event()
+
+# Funções chamadas com o novo snapshot após cada atualização com dados novos
+_ao_atualizar = []
+
+
+def _agora():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _job_path(job_id):
+    return os.path.join(JOBS_DIR, job_id + ".json")
+
+
+def _save(job):
+    """Grava o estado do job (troca atômica: leitores nunca veem um arquivo parcial)."""
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    ss._write_atomic(_job_path(job['id']), lambda f: f.write(json.dumps(job).encode()))
+
+
+def _load(job_id):
+    try:
+        with open(_job_path(job_id), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _alive(pid):
+    """Verifica se o processo que executa um job ainda existe."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _active_job():
+    """Job em andamento em qualquer processo (chamar com a trava 'refresh')."""
+    try:
+        with open(ATIVO, encoding="utf-8") as f:
+            job = _load(f.read().strip())
+    except OSError:
+        return None
+    if job is None or job['status'] not in ('pendente', 'executando'):
+        return None
+    if not _alive(job['pid']):
+        # O processo terminou no meio do job (ex: worker reiniciado)
+        job.update(status='erro', erro='O processo da atualização foi interrompido.', finalizado_em=_agora())
+        _save(job)
+        return None
+    return job
+
+
+def _cleanup():
+    """Remove os jobs mais antigos, mantendo os MAX_JOBS mais recentes."""
+    arquivos = sorted(glob.glob(os.path.join(JOBS_DIR, "*.json")), key=os.path.getmtime, reverse=True)
+    for caminho in arquivos[MAX_JOBS:]:
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+
+def _run(job):
+    """Executa o download e publica o novo snapshot (roda em uma thread)."""
+    job['status'] = 'executando'
+    job['iniciado_em'] = _agora()
+    _save(job)
+    inicio = time.perf_counter()
+    try:
+        anterior = sn.current_snapshot()
+        job['versao_anterior'] = anterior['versao'] if anterior is not None else None
+
+        job['atualizado'] = dbu.update_db(save_path=sn.DATA_PATH)
+        if job['atualizado'] or anterior is None:
+            snapshot = sn.rebuild()
+        else:
+            snapshot = anterior
+
+        job['versao'] = snapshot['versao']
+        job['total_concursos'] = snapshot['total_concursos']
+        job['novos_concursos'] = (
+            snapshot['total_concursos'] - anterior['total_concursos'] if anterior is not None else None
+        )
+        if job['atualizado'] or anterior is None:
+            for funcao in list(_ao_atualizar):
+                funcao(snapshot)
+        job['status'] = 'concluido'
+    except Exception as e:
+        job['status'] = 'erro'
+        job['erro'] = str(e)
+    finally:
+        job['finalizado_em'] = _agora()
+        mt.observe('lotopy_refresh_duration_seconds', time.perf_counter() - inicio, origem=job['origem'])
+        mt.inc('lotopy_refresh_jobs_total', status=job['status'])
+        with _lock, ss.lock('refresh'):
+            _save(job)
+            try:
+                os.remove(ATIVO)
+            except OSError:
+                pass
+
+
+def on_update(funcao):
+    """
+    Registra uma função chamada após cada atualização com dados novos.
+
+    A função recebe o novo snapshot e roda na thread do job; uma exceção
+    marca o job como erro (a nova versão já está publicada).
+
+    Args:
+        funcao: Função (snapshot) -> None
+
+    Returns:
+        A própria função (pode ser usada como decorador)
+    """
+    _ao_atualizar.append(funcao)
+    return funcao
+
+
+def start_refresh(origem="manual"):
+    """
+    Inicia a atualização em segundo plano.
+
+    Se já houver uma atualização em andamento (em qualquer processo),
+    retorna o job existente em vez de iniciar outro download.
+
+    Args:
+        origem: Quem pediu a atualização ("manual", "api" ou "agendador")
+
+    Returns:
+        dict: Cópia do estado do job (id, status, ...)
+    """
+    with _lock, ss.lock('refresh'):
+        ativo = _active_job()
+        if ativo is not None:
+            return ativo
+
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'status': 'pendente',
+            'origem': origem,
+            'pid': os.getpid(),
+            'criado_em': _agora(),
+            'iniciado_em': None,
+            'finalizado_em': None,
+            'erro': None,
+            'atualizado': None,
+            'versao_anterior': None,
+            'versao': None,
+            'total_concursos': None,
+            'novos_concursos': None
+        }
+        _save(job)
+        ss._write_atomic(ATIVO, lambda f: f.write(job['id'].encode()))
+        _cleanup()
+
+    threading.Thread(target=_run, args=(job,), name=f"refresh-{job['id']}", daemon=True).start()
+    return dict(job)
+
+
+def get_job(job_id):
+    """
+    Consulta o estado de um job (iniciado por qualquer processo).
+
+    Args:
+        job_id: Id retornado por start_refresh()
+
+    Returns:
+        dict: Estado do job ou None se não existir
+    """
+    if not isinstance(job_id, str) or not _ID_JOB.match(job_id):
+        return None
+    return _load(job_id)
+
+
+def _parse_schedule(horarios):
+    """Converte "20:30,21:00" em lista ordenada de (hora, minuto)."""
+    resultado = []
+    for item in horarios.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        hora, _, minuto = item.partition(':')
+        if not (hora.isdigit() and minuto.isdigit()) or int(hora) > 23 or int(minuto) > 59:
+            raise ValueError(f"Horário de atualização inválido: '{item}' (use HH:MM).")
+        resultado.append((int(hora), int(minuto)))
+    return sorted(resultado)
+
+
+def next_run(agora, horarios, dias=DIAS_SORTEIO):
+    """
+    Calcula o próximo horário de verificação.
+
+    Args:
+        agora: datetime atual (no fuso dos sorteios)
+        horarios: Lista de (hora, minuto)
+        dias: Dias da semana com sorteio (0 = segunda)
+
+    Returns:
+        datetime: Próximo horário estritamente depois de `agora`
+    """
+    for dias_a_frente in range(8):
+        dia = agora + timedelta(days=dias_a_frente)
+        if dia.weekday() not in dias:
+            continue
+        for hora, minuto in horarios:
+            candidato = dia.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+            if candidato > agora:
+                return candidato
+    raise ValueError("Nenhum horário de atualização configurado.")
+
+
+def _timezone():
+    """Fuso dos sorteios; usa o horário local se a base de fusos não estiver disponível."""
+    if ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(FUSO_HORARIO)
+    except Exception:
+        return None
+
+
+def _scheduler_loop(horarios):
+    # Um único agendador entre os processos: os demais aguardam a trava e
+    # assumem se o processo que a detém terminar
+    with ss.lock('agendador'):
+        fuso = _timezone()
+        while not _parar_agendador.is_set():
+            agora = datetime.now(fuso)
+            proximo = next_run(agora, horarios)
+            if _parar_agendador.wait((proximo - agora).total_seconds()):
+                break
+            start_refresh(origem="agendador")
+
+
+def scheduler_enabled():
+    """Indica se o agendador está ligado (LOTOPY_AGENDAR_ATUALIZACAO=1; desligado por padrão)."""
+    return os.environ.get("LOTOPY_AGENDAR_ATUALIZACAO") == "1"
+
+
+def start_scheduler(horarios=None):
+    """
+    Inicia o agendador de atualizações (uma única vez por processo).
+
+    Em cada processo a thread do agendador só dispara atualizações depois
+    de obter a trava de arquivo 'agendador': com vários workers, apenas um
+    agenda de fato.
+
+    Args:
+        horarios: Horários no formato "20:30,21:00" (padrão: variável
+            LOTOPY_HORARIOS_ATUALIZACAO ou HORARIOS_PADRAO)
+
+    Returns:
+        bool: True se o agendador foi iniciado agora
+    """
+    global _agendador
+
+    lista = _parse_schedule(horarios or os.environ.get("LOTOPY_HORARIOS_ATUALIZACAO", HORARIOS_PADRAO))
+
+    with _lock:
+        if _agendador is not None and _agendador.is_alive():
+            return False
+        _parar_agendador.clear()
+        _agendador = threading.Thread(target=_scheduler_loop, args=(lista,), name="refresh-scheduler", daemon=True)
+        _agendador.start()
+    return True
+
+
+def stop_scheduler():
+    """Para o agendador de atualizações."""
+    _parar_agendador.set()
+
+
+def _reset_after_fork():
+    """
+    Um processo criado por fork não herda as threads do pai: a trava e o
+    agendador do módulo recomeçam vazios (o job ativo fica em disco). No
+    gunicorn o agendador não roda no master; cada worker o inicia no post_fork.
+    """
+    global _lock, _agendador
+    _lock = threading.Lock()
+    _agendador = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
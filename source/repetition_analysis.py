@@ -0,0 +1,174 @@
+"""
+Módulo de análise de repetições entre concursos consecutivos da Lotofácil.
+
+A quantidade de números que se repetem de um concurso para o seguinte é o
+popcount de mask[i] & mask[i - 1]. A partir dessa sequência são montadas
+pequenas matrizes de contagem:
+
+- distribuicao: quantas vezes houve 0..15 repetições
+- transicoes: [16 x 16] repetições no concurso anterior -> repetições no seguinte
+- transicoes_pip: [130 x 16] configuração P-I-NP do concurso anterior ->
+  repetições no seguinte; a configuração é codificada como pares * 10 + primos
+  (a quantidade de ímpares é sempre 15 - pares)
+
+Tudo é calculado de forma vetorizada sobre as máscaras de bits, sem percorrer
+o DataFrame linha a linha.
+"""
+
+import numpy as np
+
+import source.draw_masks as dm
+
+# Repetições possíveis entre dois sorteios de 15 números (0 a 15)
+MAX_REPETICOES = 15
+
+# Códigos P-I-NP: pares (0-12) * 10 + primos (0-9)
+TOTAL_CODIGOS_PIP = 130
+
+
+def repeat_counts(masks):
+    """
+    Calcula quantos números de cada concurso repetiram do concurso anterior.
+
+    Args:
+        masks: Array de máscaras dos sorteios (em ordem de concurso)
+
+    Returns:
+        np.ndarray: Array int64 de tamanho len(masks) - 1; o item i corresponde
+        ao concurso i + 1
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    return dm.popcount(masks[1:] & masks[:-1]).astype(np.int64)
+
+
+def pip_codes(masks):
+    """
+    Codifica a configuração P-I-NP de cada máscara como pares * 10 + primos.
+
+    Args:
+        masks: Array de máscaras
+
+    Returns:
+        np.ndarray: Array int64 com o código de cada máscara
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    pares = dm.popcount(masks & np.uint32(dm.MASCARA_PARES)).astype(np.int64)
+    primos = dm.popcount(masks & np.uint32(dm.MASCARA_PRIMOS)).astype(np.int64)
+    return pares * 10 + primos
+
+
+def pip_code_to_config(codigo):
+    """
+    Converte um código P-I-NP no formato de texto usado em pip_config.
+
+    Args:
+        codigo: Código pares * 10 + primos
+
+    Returns:
+        str: Configuração no formato "7P-8I-5NP"
+    """
+    pares, primos = divmod(int(codigo), 10)
+    return f"{pares}P-{15 - pares}I-{primos}NP"
+
+
+def build_repetition_index(masks):
+    """
+    Calcula as repetições entre concursos consecutivos e as matrizes de transição.
+
+    Args:
+        masks: Array de máscaras dos sorteios (em ordem de concurso)
+
+    Returns:
+        dict: Índice com:
+            - repeticoes: repetições de cada concurso em relação ao anterior
+            - distribuicao: contagem de 0..15 repetições
+            - transicoes: matriz [16 x 16] (repetições anteriores -> repetições seguintes)
+            - transicoes_pip: matriz [130 x 16] (código P-I-NP anterior -> repetições seguintes)
+            - ultimo_pip: código P-I-NP do último concurso (-1 se não houver concursos)
+    """
+    masks = np.asarray(masks, dtype=np.uint32)
+    repeticoes = repeat_counts(masks)
+    codigos = pip_codes(masks)
+    tamanho = MAX_REPETICOES + 1
+
+    transicoes = np.zeros((tamanho, tamanho), dtype=np.int64)
+    np.add.at(transicoes, (repeticoes[:-1], repeticoes[1:]), 1)
+
+    # Concurso i (código P-I-NP) -> repetições do concurso i + 1
+    transicoes_pip = np.zeros((TOTAL_CODIGOS_PIP, tamanho), dtype=np.int64)
+    np.add.at(transicoes_pip, (codigos[:-1], repeticoes), 1)
+
+    return {
+        'repeticoes': repeticoes,
+        'distribuicao': np.bincount(repeticoes, minlength=tamanho),
+        'transicoes': transicoes,
+        'transicoes_pip': transicoes_pip,
+        'ultimo_pip': int(codigos[-1]) if len(codigos) else -1
+    }
+
+
+def _distribution(contagens):
+    """Converte um vetor de contagens em lista de {repeticoes, frequencia, percentual}."""
+    total = int(contagens.sum())
+    return [
+        {
+            'repeticoes': k,
+            'frequencia': int(c),
+            'percentual': round(float(c) / total * 100, 2) if total else 0.0
+        }
+        for k, c in enumerate(contagens)
+        if c
+    ]
+
+
+def most_likely_repeats(indice):
+    """
+    Quantidade de repetições mais provável para o próximo concurso.
+
+    Usa a distribuição condicionada às repetições do último concurso; se ela
+    não tiver amostras, usa a distribuição geral.
+
+    Args:
+        indice: Índice criado por build_repetition_index()
+
+    Returns:
+        int: Quantidade de repetições (0 a 15)
+    """
+    repeticoes = indice['repeticoes']
+    condicional = indice['transicoes'][repeticoes[-1]] if len(repeticoes) else None
+    if condicional is not None and condicional.any():
+        return int(np.argmax(condicional))
+    return int(np.argmax(indice['distribuicao']))
+
+
+def repetition_statistics(indice):
+    """
+    Monta as estatísticas de repetição para exibição/API.
+
+    Args:
+        indice: Índice criado por build_repetition_index()
+
+    Returns:
+        dict: Dicionário com a distribuição geral, as repetições do último
+        concurso, as distribuições condicionadas ao último concurso
+        (repetições e configuração P-I-NP) e a sugestão para o próximo
+    """
+    repeticoes = indice['repeticoes']
+    ultimo = int(repeticoes[-1]) if len(repeticoes) else None
+    media = float(repeticoes.mean()) if len(repeticoes) else 0.0
+
+    estatisticas = {
+        'concursos_analisados': len(repeticoes),
+        'media': round(media, 2),
+        'distribuicao': _distribution(indice['distribuicao']),
+        'ultimo_concurso': {'repeticoes': ultimo},
+        'proximo_provavel': most_likely_repeats(indice)
+    }
+
+    if ultimo is not None:
+        estatisticas['dado_repeticoes_anteriores'] = _distribution(indice['transicoes'][ultimo])
+    if indice['ultimo_pip'] >= 0:
+        estatisticas['ultimo_concurso']['config_pip'] = pip_code_to_config(indice['ultimo_pip'])
+        estatisticas['dado_config_pip_anterior'] = _distribution(indice['transicoes_pip'][indice['ultimo_pip']])
+
+    return estatisticas
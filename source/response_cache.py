@@ -0,0 +1,144 @@
+"""
+Módulo de cache de respostas HTTP por versão dos dados.
+
+As respostas da página principal e de /api/suggestions dependem apenas da
+versão dos dados e dos parâmetros da requisição. Por isso:
+
+- o ETag (forte) é derivado de (rota, parâmetros, versão, código) e um
+  If-None-Match igual responde 304 Not Modified sem renderizar nada;
+- o corpo renderizado e a sua versão gzip ficam em um LRU pela mesma chave,
+  de modo que requisições repetidas apenas copiam bytes prontos.
+
+O código (CODIGO) é o hash dos módulos de source/, dos templates e dos
+arquivos de static/: depois de um deploy que muda a página ou o JavaScript,
+os ETags antigos deixam de valer e os clientes recebem o HTML novo.
+"""
+
+import glob
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+import source.metrics as mt
+import source.shared_store as ss
+
+# Quantidade máxima de respostas mantidas no LRU
+MAX_ENTRADAS = 64
+
+# Corpos menores que isso não compensam a compressão
+MIN_TAMANHO_GZIP = 512
+
+_lock = threading.Lock()
+_entradas = OrderedDict()
+
+
+def _code_version():
+    """Hash do código de análise (shared_store.CODIGO), dos templates e de static/."""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    arquivos = glob.glob(os.path.join(raiz, "templates", "**", "*"), recursive=True)
+    arquivos += glob.glob(os.path.join(raiz, "static", "*"))
+    h = hashlib.sha1(ss.CODIGO.encode())
+    for caminho in sorted(arquivos):
+        if os.path.isfile(caminho):
+            h.update(os.path.relpath(caminho, raiz).encode())
+            with open(caminho, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+# Versão do código, dos templates e dos arquivos estáticos que geram as respostas
+CODIGO = _code_version()
+
+
+def make_etag(rota, params, versao):
+    """
+    Calcula o ETag forte de uma resposta.
+
+    Args:
+        rota: Nome da rota (ex: "index")
+        params: Dicionário com os parâmetros que alteram a resposta
+        versao: Versão dos dados
+
+    Returns:
+        str: Valor do ETag (inclui CODIGO), sem aspas
+    """
+    chave = f"{rota}|{sorted(params.items())}|{versao}|{CODIGO}"
+    return hashlib.sha1(chave.encode("utf-8")).hexdigest()[:20]
+
+
+def _get_or_render(chave, render):
+    """Busca o corpo no LRU ou renderiza, comprime e guarda."""
+    with _lock:
+        entrada = _entradas.get(chave)
+        if entrada is not None:
+            _entradas.move_to_end(chave)
+            mt.inc('lotopy_response_cache_total', rota=chave[0], resultado='hit')
+            return entrada
+
+    mt.inc('lotopy_response_cache_total', rota=chave[0], resultado='miss')
+    with mt.stage('render'):
+        corpo = render()
+    if isinstance(corpo, str):
+        corpo = corpo.encode("utf-8")
+    comprimido = gzip.compress(corpo, compresslevel=6, mtime=0) if len(corpo) >= MIN_TAMANHO_GZIP else None
+    entrada = (corpo, comprimido)
+
+    with _lock:
+        _entradas[chave] = entrada
+        _entradas.move_to_end(chave)
+        while len(_entradas) > MAX_ENTRADAS:
+            _entradas.popitem(last=False)
+    return entrada
+
+
+def cached_response(rota, params, versao, render, mimetype="text/html"):
+    """
+    Responde com 304, com o corpo em cache ou renderizando uma única vez.
+
+    O ETag da representação gzip recebe o sufixo "-gzip", pois os bytes são
+    diferentes dos da representação sem compressão.
+
+    Args:
+        rota: Nome da rota
+        params: Dicionário com os parâmetros que alteram a resposta
+        versao: Versão dos dados
+        render: Função sem argumentos que gera o corpo (str ou bytes)
+        mimetype: Tipo do conteúdo
+
+    Returns:
+        Response: Resposta Flask com ETag e, se aceito, Content-Encoding gzip
+    """
+    etag = make_etag(rota, params, versao)
+    etag_gzip = etag + "-gzip"
+
+    if request.if_none_match.contains(etag) or request.if_none_match.contains(etag_gzip):
+        atual = etag_gzip if request.if_none_match.contains(etag_gzip) else etag
+        mt.inc('lotopy_response_cache_total', rota=rota, resultado='not_modified')
+        resposta = Response(status=304)
+        resposta.set_etag(atual)
+        resposta.vary.add("Accept-Encoding")
+        return resposta
+
+    corpo, comprimido = _get_or_render((rota, tuple(sorted(params.items())), versao, CODIGO), render)
+
+    if comprimido is not None and "gzip" in request.accept_encodings:
+        resposta = Response(comprimido, mimetype=mimetype)
+        resposta.headers["Content-Encoding"] = "gzip"
+        resposta.set_etag(etag_gzip)
+    else:
+        resposta = Response(corpo, mimetype=mimetype)
+        resposta.set_etag(etag)
+
+    resposta.vary.add("Accept-Encoding")
+    resposta.headers["Cache-Control"] = "no-cache"
+    return resposta
+
+
+def clear():
+    """Esvazia o LRU de respostas."""
+    with _lock:
+        _entradas.clear()
@@ -0,0 +1,353 @@
+"""
+Módulo de compartilhamento do snapshot entre processos (workers do gunicorn).
+
+Cada versão publicada dos dados é gravada uma única vez em
+`<CACHE_DIR>/store/<versao>-<codigo>/`, onde `codigo` é o hash dos módulos
+de source/ (CODIGO): análises calculadas por outra versão do código não são
+reaproveitadas. O diretório é persistente: depois de um restart ou deploy
+sem mudança de dados nem de código, a versão é aberta em milissegundos
+(find_version() localiza a versão pelo hash do conteúdo da planilha, mesmo
+que a data de modificação do arquivo tenha mudado).
+
+- arquivos .npy com as colunas do histórico processado (concursos, datas,
+  bolas, ciclo, P-I-NP) e as máscaras dos sorteios, abertos pelos processos
+  com np.load(mmap_mode='r'): as páginas ficam no cache do sistema
+  operacional e são compartilhadas por todos os workers. Os arrays usados
+  diretamente pelas análises (concursos e máscaras) não são copiados; o
+  DataFrame é montado a partir das colunas, sem ler a planilha;
+- secoes/<nome>.pkl com cada seção da página já calculada, gravada pelo
+  primeiro processo que a calcular;
+- meta.json com a versão dos dados, o código e o hash da planilha de origem.
+
+O arquivo CURRENT aponta para a versão publicada (versão dos dados e
+assinatura do arquivo de origem) e é trocado de forma atômica. Um processo
+que encontra um CURRENT mais novo que o seu snapshot passa a usá-lo sem
+reiniciar e sem ler a planilha nem recalcular as análises.
+
+Travas de arquivo (lock()) coordenam os processos: apenas um calcula uma
+nova versão ou uma seção por vez, e os demais aguardam e abrem o resultado
+publicado em vez de repetir o cálculo.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+import source.array_cache as ac
+
+# Diretório das versões publicadas
+STORE_DIR = os.path.join(ac.CACHE_DIR, "store")
+PONTEIRO = os.path.join(STORE_DIR, "CURRENT")
+
+# Versões mantidas em disco (processos que ainda mapeiam uma versão removida
+# continuam lendo normalmente até trocarem de versão)
+MAX_VERSOES = 3
+
+COLUNAS_BOLAS = [f"Bola{i}" for i in range(1, 16)]
+
+# Último CURRENT lido: (data de modificação em ns, tamanho, conteúdo)
+_ponteiro_lido = (None, None, None)
+
+
+def _code_version():
+    """Hash dos módulos de source/ (qualquer mudança no código gera outro diretório)."""
+    h = hashlib.sha1()
+    for caminho in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+        h.update(os.path.basename(caminho).encode())
+        with open(caminho, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+# Versão do código que calcula as análises
+CODIGO = _code_version()
+
+
+def _version_dir(versao, codigo=None):
+    return os.path.join(STORE_DIR, f"{versao}-{codigo or CODIGO}")
+
+
+def _section_path(versao, nome):
+    return os.path.join(_version_dir(versao), "secoes", nome + ".pkl")
+
+
+@contextmanager
+def lock(nome):
+    """
+    Trava exclusiva entre processos (flock em `<STORE_DIR>/.lock-<nome>`).
+
+    Bloqueia até a trava ficar livre. Em sistemas sem fcntl, não trava.
+
+    Args:
+        nome: Nome da trava (ex: "snapshot", "secao-<versao>-heatmap")
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(STORE_DIR, exist_ok=True)
+    with open(os.path.join(STORE_DIR, f".lock-{nome}"), "a+b") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _dataframe_arrays(df, masks):
+    """
+    Colunas do DataFrame processado como arrays de tipo fixo (mapeáveis).
+
+    Bolas e P-I-NP ausentes (NA) são gravados com um valor neutro e a posição
+    de cada ausência vai em bolas_na/config_pip_na, para attach() restaurar pd.NA.
+    """
+    datas = df['Data Sorteio'].to_numpy()
+    if datas.dtype == object:
+        datas = df['Data Sorteio'].fillna('').astype(str).to_numpy(dtype=str)
+
+    return {
+        'indice': df.index.to_numpy(dtype=np.int64),
+        'concursos': df['Concurso'].to_numpy(dtype=np.int64),
+        'datas': datas,
+        'bolas': df[COLUNAS_BOLAS].to_numpy(dtype=np.int8, na_value=0),
+        'bolas_na': df[COLUNAS_BOLAS].isna().to_numpy(),
+        'ciclo': df['ciclo'].to_numpy(dtype=np.int64),
+        'config_pip': df['config_pip'].fillna('').astype(str).to_numpy(dtype=str),
+        'config_pip_na': df['config_pip'].isna().to_numpy(),
+        'masks': np.asarray(masks, dtype=np.uint32)
+    }
+
+
+def _write_atomic(destino, escrever):
+    """Grava um arquivo por meio de um temporário no mesmo diretório."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            escrever(f)
+        os.replace(tmp, destino)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def publish(snapshot):
+    """
+    Publica o snapshot para os demais processos.
+
+    As colunas são gravadas apenas se a versão ainda não existir, e cada
+    seção já calculada apenas se ainda não estiver em disco. Por fim o
+    CURRENT passa a apontar para a versão (com a assinatura e o hash do
+    arquivo de origem, quando conhecidos).
+
+    Args:
+        snapshot: Snapshot criado por snapshot.build_snapshot()
+
+    Returns:
+        str: Diretório da versão publicada
+    """
+    os.makedirs(STORE_DIR, exist_ok=True)
+    versao = snapshot['versao']
+    diretorio = _version_dir(versao)
+
+    if not os.path.isdir(diretorio):
+        tmp = tempfile.mkdtemp(dir=STORE_DIR, prefix=".tmp-")
+        try:
+            for nome, array in _dataframe_arrays(snapshot['df'], snapshot['masks']).items():
+                np.save(os.path.join(tmp, nome + ".npy"), array, allow_pickle=False)
+            os.rename(tmp, diretorio)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            # Outro processo publicou a mesma versão ao mesmo tempo
+            if not os.path.isdir(diretorio):
+                raise
+
+    for nome, dados in list(snapshot['_secoes'].items()):
+        publish_section(versao, nome, dados)
+
+    meta = {'versao': versao, 'codigo': CODIGO, 'conteudo': snapshot['conteudo']}
+    caminho_meta = os.path.join(diretorio, "meta.json")
+    if snapshot['conteudo'] is not None and _read_meta(caminho_meta) != meta:
+        _write_atomic(caminho_meta, lambda f: f.write(json.dumps(meta).encode()))
+
+    ponteiro = {'versao': versao, 'codigo': CODIGO, 'assinatura': snapshot['assinatura'],
+                'conteudo': snapshot['conteudo']}
+    _write_atomic(PONTEIRO, lambda f: f.write(json.dumps(ponteiro).encode()))
+    # Versão reaproveitada volta a ser a mais recente para a retenção
+    os.utime(diretorio)
+
+    _cleanup(versao)
+    return diretorio
+
+
+def read_pointer():
+    """
+    Lê o CURRENT (relido apenas quando o arquivo muda).
+
+    Returns:
+        dict: {'versao', 'codigo', 'assinatura', 'conteudo'} da versão publicada
+        ou None se não houver
+    """
+    global _ponteiro_lido
+
+    try:
+        st = os.stat(PONTEIRO)
+    except OSError:
+        return None
+
+    mtime, tamanho, conteudo = _ponteiro_lido
+    if (st.st_mtime_ns, st.st_size) != (mtime, tamanho):
+        try:
+            with open(PONTEIRO, "rb") as f:
+                conteudo = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if conteudo.get('assinatura') is not None:
+            conteudo['assinatura'] = tuple(conteudo['assinatura'])
+        _ponteiro_lido = (st.st_mtime_ns, st.st_size, conteudo)
+    return conteudo
+
+
+def _read_meta(caminho):
+    try:
+        with open(caminho, "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def find_version(conteudo):
+    """
+    Procura uma versão gravada pelo código atual a partir do hash da planilha de origem.
+
+    Args:
+        conteudo: Hash do arquivo de dados (snapshot.data_content)
+
+    Returns:
+        str: Versão dos dados ou None se não houver
+    """
+    for caminho in glob.glob(os.path.join(STORE_DIR, f"*-{CODIGO}", "meta.json")):
+        meta = _read_meta(caminho)
+        if meta and meta.get('conteudo') == conteudo and meta.get('codigo') == CODIGO:
+            return meta['versao']
+    return None
+
+
+def publish_section(versao, nome, dados):
+    """
+    Grava uma seção calculada na versão publicada (se ainda não estiver gravada).
+
+    Args:
+        versao: Versão dos dados
+        nome: Nome da seção
+        dados: Dados da seção
+
+    Returns:
+        bool: True se a seção foi gravada agora
+    """
+    caminho = _section_path(versao, nome)
+    if not os.path.isdir(_version_dir(versao)) or os.path.exists(caminho):
+        return False
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    _write_atomic(caminho, lambda f: pickle.dump(dados, f, protocol=pickle.HIGHEST_PROTOCOL))
+    return True
+
+
+def read_section(versao, nome):
+    """
+    Lê uma seção publicada por qualquer processo.
+
+    Returns:
+        tuple: (True, dados) se a seção está em disco, (False, None) caso contrário
+    """
+    try:
+        with open(_section_path(versao, nome), "rb") as f:
+            return True, pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return False, None
+
+
+def attach(versao, codigo=None):
+    """
+    Abre uma versão publicada sem copiar os arrays.
+
+    Args:
+        versao: Versão dos dados (CURRENT)
+        codigo: Versão do código que a gravou (padrão: CODIGO)
+
+    Returns:
+        tuple: (DataFrame processado, dicionário de arrays mapeados,
+        dicionário de seções) ou None se a versão não estiver disponível
+    """
+    diretorio = _version_dir(versao, codigo)
+    try:
+        arrays = {
+            os.path.basename(caminho)[:-4]: np.load(caminho, mmap_mode='r', allow_pickle=False)
+            for caminho in glob.glob(os.path.join(diretorio, "*.npy"))
+        }
+    except (OSError, ValueError):
+        return None
+    if 'concursos' not in arrays or 'masks' not in arrays:
+        return None
+
+    secoes = {}
+    for caminho in glob.glob(os.path.join(diretorio, "secoes", "*.pkl")):
+        try:
+            with open(caminho, "rb") as f:
+                secoes[os.path.basename(caminho)[:-4]] = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            continue
+
+    if ac.data_version(arrays['concursos'], arrays['masks']) != versao:
+        return None
+
+    colunas = {'Concurso': arrays['concursos'], 'Data Sorteio': arrays['datas'].astype(object)
+               if arrays['datas'].dtype.kind == 'U' else arrays['datas']}
+    bolas_na = arrays.get('bolas_na')
+    for i, nome in enumerate(COLUNAS_BOLAS):
+        colunas[nome] = pd.array(arrays['bolas'][:, i], dtype="Int64")
+        if bolas_na is not None and bolas_na[:, i].any():
+            colunas[nome][bolas_na[:, i]] = pd.NA
+    colunas['ciclo'] = arrays['ciclo']
+    colunas['config_pip'] = arrays['config_pip'].astype(object)
+    if 'config_pip_na' in arrays:
+        colunas['config_pip'][arrays['config_pip_na']] = np.nan
+
+    indice = arrays['indice']
+    if np.array_equal(indice, np.arange(len(indice))):
+        indice = pd.RangeIndex(len(indice))
+    df = pd.DataFrame(colunas, index=pd.Index(indice))
+    return df, arrays, secoes
+
+
+def _cleanup(versao_atual):
+    """Remove as versões mais antigas, mantendo as MAX_VERSOES mais recentes."""
+    diretorios = sorted(
+        (d for d in glob.glob(os.path.join(STORE_DIR, "*")) if os.path.isdir(d)
+         and not os.path.basename(d).startswith(".")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for diretorio in diretorios[MAX_VERSOES:]:
+        if diretorio != _version_dir(versao_atual):
+            shutil.rmtree(diretorio, ignore_errors=True)
+            # Travas das seções da versão removida (ver snapshot.get_section)
+            versao = os.path.basename(diretorio).split("-")[0]
+            if versao != versao_atual:
+                for trava in glob.glob(os.path.join(STORE_DIR, f".lock-secao-{versao}-*")):
+                    try:
+                        os.remove(trava)
+                    except OSError:
+                        pass
@@ -0,0 +1,824 @@
+"""
+Módulo de snapshot das análises da página principal.
+
+Carregar a planilha, calcular ciclos/P-I-NP, as estatísticas globais, as
+análises de ciclo e as estratégias de sugestão leva vários segundos, mas os
+dados só mudam quando o arquivo da base é atualizado. O snapshot guarda
+esses resultados uma vez por versão dos dados e é compartilhado por todas
+as requisições do processo. Os dados base são carregados de imediato e cada
+seção da página é calculada no primeiro acesso, de forma independente.
+
+O snapshot é considerado imutável: quem o usa não deve modificar o DataFrame
+nem as estruturas retornadas. Ele é recalculado quando o arquivo de dados
+muda (data de modificação ou tamanho) ou quando invalidate() é chamado.
+
+Com vários processos (workers do gunicorn), cada versão é publicada em
+disco por source/shared_store.py: o primeiro processo calcula e publica, os
+demais abrem a versão publicada (arrays mapeados em memória e seções já
+calculadas) e trocam para ela sem reiniciar. Tanto o snapshot quanto cada
+seção são calculados por um único construtor por vez (threads e processos),
+e quem chega durante o cálculo reutiliza o resultado.
+"""
+
+import contextvars
+import hashlib
+import os
+import threading
+from types import MappingProxyType
+
+import pandas as pd
+
+import source.adjust_table as at
+import source.aggregate_state as agg
+import source.as_of_index as aoi
+import source.array_cache as ac
+import source.combination_index as ci
+import source.contest_history as ch
+import source.cooccurrence as co
+import source.cycle_calculator as cc
+import source.delay_analysis as da
+import source.draw_masks as dm
+import source.game_suggestions as gs
+import source.geographic_analysis as ga
+import source.metrics as mt
+import source.pip_config as pip
+import source.repetition_analysis as ra
+import source.shared_store as ss
+
+# Arquivo da base de dados (pode ser alterado pela variável de ambiente)
+DATA_PATH = os.environ.get("LOTOPY_DATA_PATH", os.path.join("data", "D_lotfac.xlsx"))
+
+# Maior quantidade de concursos exibida na página (opções de limite: 5 a 25)
+MAX_CONCURSOS_PAGINA = 25
+
+_lock = threading.Lock()
+_atual = None
+_revalidacao = None
+
+# Versão servida à requisição atual (cabeçalho X-Data-Version)
+_versao_servida = contextvars.ContextVar("lotopy_versao_servida", default=None)
+
+
+def load_data():
+    """Carrega e processa os dados da Lotofácil."""
+    with mt.stage('adjust_table'):
+        df = at.adjust_table(DATA_PATH)
+    with mt.stage('calculate_cycle'):
+        df = cc.calculate_cycle(df)
+    with mt.stage('calculate_pip_config'):
+        df = pip.calculate_pip_config(df)
+    return df
+
+
+def data_signature(path=DATA_PATH):
+    """
+    Identifica o estado atual do arquivo de dados.
+
+    Args:
+        path: Caminho do arquivo de dados
+
+    Returns:
+        tuple: (data de modificação em ns, tamanho) ou None se o arquivo não existir
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def data_content(path=DATA_PATH):
+    """
+    Hash do conteúdo do arquivo de dados (identifica a planilha mesmo que a data de modificação mude).
+
+    Args:
+        path: Caminho do arquivo de dados
+
+    Returns:
+        str: sha1 do arquivo ou None se ele não existir
+    """
+    h = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def _contest_rows(df, limit):
+    """Monta os dados exibidos de cada um dos últimos `limit` concursos (mais recentes primeiro)."""
+    df_ultimos = df.tail(limit).copy()
+    lst_campos = [f"Bola{i}" for i in range(1, 16)]
+
+    # Análise de quadrantes e cruz
+    quadrante1 = {1, 2, 6, 7}
+    quadrante2 = {4, 5, 9, 10}
+    quadrante3 = {16, 17, 21, 22}
+    quadrante4 = {19, 20, 24, 25}
+    cruz = {3, 8, 11, 12, 13, 14, 15, 18, 23}
+
+    concursos = []
+    for index, row in df_ultimos.iterrows():
+        numeros = [
+            int(row[f"Bola{i}"]) for i in range(1, 16)
+            if pd.notna(row[f"Bola{i}"])
+        ]
+        numeros.sort()
+
+        # Calcular distribuição geográfica
+        geo_dist = ga.analyze_geographic_distribution(numeros)
+
+        q1 = sum(1 for n in numeros if n in quadrante1)
+        q2 = sum(1 for n in numeros if n in quadrante2)
+        q3 = sum(1 for n in numeros if n in quadrante3)
+        q4 = sum(1 for n in numeros if n in quadrante4)
+        cruz_count = sum(1 for n in numeros if n in cruz)
+
+        # Análise de Novos vs Repetidos no Ciclo
+        ciclo_atual_row = int(row['ciclo'])
+        concurso_atual_row = int(row['Concurso'])
+
+        # Pegar todos os sorteios ANTERIORES do MESMO ciclo
+        df_ciclo_ant = df[(df['ciclo'] == ciclo_atual_row) & (df['Concurso'] < concurso_atual_row)]
+
+        numeros_acumulados_ciclo = set()
+        for _, r_ant in df_ciclo_ant.iterrows():
+            for campo in lst_campos:
+                if pd.notna(r_ant[campo]):
+                    numeros_acumulados_ciclo.add(int(r_ant[campo]))
+
+        # Calcular quantos dos números atuais são novos (não estavam nos acumulados)
+        numeros_novos_ciclo = 0
+        numeros_repetidos_ciclo = 0
+        for n in numeros:
+            if n in numeros_acumulados_ciclo:
+                numeros_repetidos_ciclo += 1
+            else:
+                numeros_novos_ciclo += 1
+
+        # Formatar data corretamente
+        data_sorteio = row['Data Sorteio']
+        if pd.notna(data_sorteio):
+            if hasattr(data_sorteio, 'strftime'):
+                data_formatada = data_sorteio.strftime('%d/%m/%Y')
+            else:
+                data_formatada = str(data_sorteio)
+        else:
+            data_formatada = ''
+
+        concursos.append({
+            'concurso': int(row['Concurso']),
+            'data': data_formatada,
+            'numeros': numeros,
+            'ciclo': int(row['ciclo']),
+            'config_pip': row['config_pip'],
+            'moldura': geo_dist['moldura'],
+            'miolo': geo_dist['miolo'],
+            'linha1': geo_dist['linha1'],
+            'linha2': geo_dist['linha2'],
+            'linha3': geo_dist['linha3'],
+            'linha4': geo_dist['linha4'],
+            'linha5': geo_dist['linha5'],
+            'distribuicao_linhas': geo_dist['distribuicao_linhas'],
+            'q1': q1,
+            'q2': q2,
+            'q3': q3,
+            'q4': q4,
+            'cruz': cruz_count,
+            'novos_ciclo': numeros_novos_ciclo,
+            'repetidos_ciclo': numeros_repetidos_ciclo,
+            'novos_set': list(numeros_acumulados_ciclo.symmetric_difference(set(numeros) | numeros_acumulados_ciclo)) # Números que NÃO estavam nos acumulados (são novos)
+        })
+
+    # Reverter para mostrar os mais recentes primeiro
+    concursos.reverse()
+    return concursos
+
+
+def _numbers_info(df_numeros):
+    """Frequência e status no ciclo atual de cada um dos 25 números."""
+    # Calcular total de aparições para percentuais
+    total_aparicoes = df_numeros['frequencia'].sum()
+
+    numeros_info = []
+    for index, row in df_numeros.iterrows():
+        numeros_info.append({
+            'numero': int(row['numero']),
+            'frequencia': int(row['frequencia']),
+            'percentual': round((int(row['frequencia']) / total_aparicoes) * 100, 2),
+            'no_ciclo': row['no_ciclo_atual']
+        })
+    return numeros_info
+
+
+def _cycle_patterns(df_cycle_patterns):
+    """Padrões de saída mais comuns (ex: 15-5-3-2)."""
+    return df_cycle_patterns.head(10).to_dict('records')
+
+
+def _cycle_new_numbers(dist_novos_stats):
+    """Distribuição de novos números por passo do ciclo."""
+    dist_novos_display = []
+    for passo, df_dist in dist_novos_stats.items():
+        dist_novos_display.append({
+            'passo': passo,
+            'dados': df_dist.to_dict('records')
+        })
+    dist_novos_display.sort(key=lambda x: x['passo'])
+    return dist_novos_display
+
+
+def _cycle_step_frequency(freq_by_step):
+    """Números mais frequentes em cada rodada do ciclo."""
+    freq_by_step_display = []
+    for step, df_freq in freq_by_step.items():
+        freq_by_step_display.append({
+            'step': step,
+            'dados': df_freq.head(10).to_dict('records') # Top 10 por rodada
+        })
+    freq_by_step_display.sort(key=lambda x: x['step'])
+    return freq_by_step_display
+
+
+def _enrich_suggestions(df, sugestoes, ciclo_atual):
+    """Adiciona análise geográfica, de ciclo, P-I-NP e quadrantes a cópias das sugestões."""
+    lst_campos = [f"Bola{i}" for i in range(1, 16)]
+    numeros_ciclo_atual = df[df['ciclo'] == ciclo_atual][lst_campos].values.flatten()
+
+    primos_set = {2, 3, 5, 7, 11, 13, 17, 19, 23}
+    quadrante1 = {1, 2, 6, 7}
+    quadrante2 = {4, 5, 9, 10}
+    quadrante3 = {16, 17, 21, 22}
+    quadrante4 = {19, 20, 24, 25}
+    cruz = {3, 8, 11, 12, 13, 14, 15, 18, 23}
+
+    enriquecidas = []
+    for original in sugestoes:
+        sugestao = dict(original)
+        numeros = sugestao['numeros']
+
+        # Análise geográfica
+        geo_dist = ga.analyze_geographic_distribution(numeros)
+        sugestao['moldura'] = geo_dist['moldura']
+        sugestao['miolo'] = geo_dist['miolo']
+        sugestao['distribuicao_linhas'] = geo_dist['distribuicao_linhas']
+
+        # Análise de ciclo
+        sugestao['ciclo_count'] = sum(1 for n in numeros if n in numeros_ciclo_atual)
+
+        # Análise P-I-NP
+        pares = sum(1 for n in numeros if n % 2 == 0)
+        impares = sum(1 for n in numeros if n % 2 != 0)
+        primos = sum(1 for n in numeros if n in primos_set)
+        sugestao['config_pip'] = f"{pares}P-{impares}I-{primos}NP"
+
+        # Análise de quadrantes e cruz
+        sugestao['q1'] = sum(1 for n in numeros if n in quadrante1)
+        sugestao['q2'] = sum(1 for n in numeros if n in quadrante2)
+        sugestao['q3'] = sum(1 for n in numeros if n in quadrante3)
+        sugestao['q4'] = sum(1 for n in numeros if n in quadrante4)
+        sugestao['cruz'] = sum(1 for n in numeros if n in cruz)
+
+        enriquecidas.append(sugestao)
+    return enriquecidas
+
+
+# Seções derivadas do estado agregado (source/aggregate_state.py); também
+# podem ser vistas como estavam após um concurso anterior (get_section_as_of)
+SECOES_ESTADO = {
+    'numbers': lambda estado: tuple(_numbers_info(agg.numbers_status(estado))),
+    'geographic': agg.geographic,
+    'heatmap': agg.heat_map,
+    'pip-distribution': agg.pip_distribution,
+    'cycle-patterns': lambda estado: tuple(_cycle_patterns(agg.cycle_exit_patterns(estado))),
+    'cycle-new-numbers': lambda estado: tuple(_cycle_new_numbers(agg.new_numbers_distribution(estado))),
+    'cycle-step-frequency': lambda estado: tuple(
+        _cycle_step_frequency(agg.frequency_by_cycle_step(estado, max_steps=4))
+    ),
+}
+
+
+def _from_state(nome):
+    return lambda snap: SECOES_ESTADO[nome](get_section('aggregates', snap))
+
+
+# Seções da página: cada uma é calculada sob demanda, uma vez por versão dos dados
+SECOES = {
+    'contests': lambda snap: tuple(_contest_rows(snap['df'], MAX_CONCURSOS_PAGINA)),
+    # Contagens aditivas do histórico: estendidas só com os concursos novos (ver _extend_sections)
+    'aggregates': lambda snap: agg.build_state(snap['df'], snap['masks'], snap['versao']),
+    **{nome: _from_state(nome) for nome in SECOES_ESTADO},
+    # Todas as estratégias uma única vez; cada rota corta a quantidade que exibe
+    'suggestions': lambda snap: tuple(gs.generate_suggestions(
+        snap['df'], num_games=None, indice_sorteados=snap['indice_sorteados'],
+        masks=snap['masks'], indice_repeticoes=get_section('repetitions', snap)
+    )),
+    'suggestions-page': lambda snap: tuple(
+        _enrich_suggestions(snap['df'], get_section('suggestions', snap), snap['ciclo_atual'])
+    ),
+    # Histórico completo em arrays (paginação e exportação de /api/contests)
+    'history': lambda snap: ch.build_history(snap['df'], snap['masks']),
+    # Checkpoints do estado agregado para consultas "após o concurso N" (as_of)
+    'as-of-index': lambda snap: aoi.build_index(snap['df'], snap['masks']),
+    # Contagens de duplas/trios (/api/cooccurrence), também estendidas (ver _extend_sections)
+    'cooccurrence': lambda snap: co.build_cooccurrence(snap['masks']),
+    # Atrasos e sequências de cada número (/api/delays), idem
+    'delays': lambda snap: da.build_delay_state(snap['masks']),
+    # Repetições entre concursos consecutivos (/api/repetitions e a estratégia de repetições)
+    'repetitions': lambda snap: ra.build_repetition_index(snap['masks']),
+}
+
+# Seções que se estendem com os concursos novos: (concursos no estado, extensão)
+EXTENSOES = {
+    'aggregates': (
+        lambda estado: estado['total_concursos'],
+        lambda estado, snap: agg.update_state(
+            estado, snap['df'], snap['masks'], snap['versao'], conferir=False
+        )
+    ),
+    'cooccurrence': (lambda estado: estado['n'], lambda estado, snap: co.extend_cooccurrence(estado, snap['masks'])),
+    'delays': (lambda estado: estado['n'], lambda estado, snap: da.extend_delay_state(estado, snap['masks'])),
+}
+
+
+def build_snapshot(df, assinatura=None, masks=None, secoes=None, conteudo=None):
+    """
+    Monta o snapshot base de um DataFrame já processado.
+
+    As seções da página (SECOES) não são calculadas aqui: cada uma é
+    calculada no primeiro acesso via get_section() e guardada no snapshot.
+
+    Args:
+        df: DataFrame retornado por load_data()
+        assinatura: Assinatura do arquivo de dados usada para invalidação
+        masks: Máscaras já calculadas (ex: mapeadas do shared_store)
+        secoes: Seções já calculadas (ex: lidas do shared_store)
+        conteudo: Hash do arquivo de dados de origem (data_content)
+
+    Returns:
+        MappingProxyType: Snapshot somente leitura com:
+            - versao: hash dos concursos e sorteios (array_cache.data_version)
+            - assinatura, conteudo: assinatura e hash do arquivo de dados
+            - df, concursos_array, masks: dados base
+            - indice_sorteados: índice de combinações sorteadas (combination_index)
+            - total_concursos, ciclo_atual
+    """
+    concursos_array = df['Concurso'].to_numpy()
+    if masks is None:
+        with mt.stage('calculate_masks'):
+            masks = dm.calculate_masks(df)
+    with mt.stage('build_drawn_index'):
+        indice_sorteados = ci.build_drawn_index(df, masks)
+
+    return MappingProxyType({
+        'versao': ac.data_version(concursos_array, masks),
+        'assinatura': assinatura,
+        'conteudo': conteudo,
+        'df': df,
+        'concursos_array': concursos_array,
+        'masks': masks,
+        'indice_sorteados': indice_sorteados,
+        'total_concursos': len(df),
+        'ciclo_atual': int(df['ciclo'].max()),
+        '_secoes': {nome: dados for nome, dados in (secoes or {}).items() if nome in SECOES},
+        '_locks_secoes': {nome: threading.Lock() for nome in SECOES}
+    })
+
+
+def _attach_published(assinatura, atual):
+    """
+    Abre a versão publicada por outro processo, se ela corresponder ao arquivo atual.
+
+    Returns:
+        MappingProxyType: Snapshot da versão publicada ou None
+    """
+    ponteiro = ss.read_pointer()
+    if ponteiro is None or ponteiro['assinatura'] != assinatura or ponteiro.get('codigo') != ss.CODIGO:
+        return None
+    if atual is not None and atual['versao'] == ponteiro['versao'] and atual['assinatura'] == assinatura:
+        return None
+
+    publicado = ss.attach(ponteiro['versao'])
+    if publicado is None:
+        return None
+    df, arrays, secoes = publicado
+    return build_snapshot(df, assinatura, masks=arrays['masks'], secoes=secoes, conteudo=ponteiro.get('conteudo'))
+
+
+def _attach_stored(assinatura):
+    """
+    Abre a versão gravada em disco para o conteúdo atual do arquivo de dados.
+
+    Cobre restarts e deploys: o arquivo pode ter outra data de modificação
+    (assinatura), mas se o conteúdo e o código são os mesmos as análises já
+    calculadas são reaproveitadas. A versão é republicada com a assinatura
+    atual para que os demais processos a abram direto pelo CURRENT.
+
+    Returns:
+        MappingProxyType: Snapshot da versão gravada ou None
+    """
+    conteudo = data_content()
+    versao = ss.find_version(conteudo) if conteudo is not None else None
+    if versao is None:
+        return None
+    publicado = ss.attach(versao)
+    if publicado is None:
+        return None
+    df, arrays, secoes = publicado
+    snapshot = build_snapshot(df, assinatura, masks=arrays['masks'], secoes=secoes, conteudo=conteudo)
+    ss.publish(snapshot)
+    return snapshot
+
+
+def _extend_sections(snapshot, anterior):
+    """
+    Estende as seções aditivas (EXTENSOES) da versão anterior com os concursos novos.
+
+    Quando o histórico novo começa pelos mesmos concursos da versão anterior
+    (o caso de um sorteio novo), essas seções não são recalculadas sobre o
+    histórico inteiro: cada uma percorre apenas os concursos novos, e as
+    seções derivadas de 'aggregates' passam a custar microssegundos. O
+    estado da versão anterior vem da memória ou do shared_store.
+
+    Args:
+        snapshot: Snapshot recém-montado (ainda sem seções)
+        anterior: Snapshot da versão anterior no processo (None: a publicada no CURRENT)
+    """
+    if anterior is not None:
+        versao = anterior['versao']
+    else:
+        ponteiro = ss.read_pointer()
+        if ponteiro is None:
+            return
+        versao = ponteiro['versao']
+
+    prefixos = {}
+    for nome, (tamanho, estender) in EXTENSOES.items():
+        estado = anterior['_secoes'].get(nome) if anterior is not None else None
+        if estado is None:
+            encontrada, estado = ss.read_section(versao, nome)
+            if not encontrada:
+                continue
+
+        # O estado só serve se a versão anterior for um prefixo deste histórico
+        n = tamanho(estado)
+        if n not in prefixos:
+            prefixos[n] = n <= len(snapshot['masks']) and ac.data_version(
+                snapshot['concursos_array'], snapshot['masks'], n
+            ) == versao
+        if not prefixos[n]:
+            continue
+
+        with mt.stage(nome + '.update'):
+            snapshot['_secoes'][nome] = estender(estado, snapshot)
+        mt.inc('lotopy_section_cache_total', secao=nome, resultado='incremental')
+
+
+def get_section(nome, snapshot=None):
+    """
+    Retorna os dados de uma seção da página, calculando no primeiro acesso.
+
+    Cada seção tem a sua trava: uma seção lenta não bloqueia as demais.
+    Entre processos, quem calcula primeiro publica a seção no shared_store
+    e os demais, que aguardavam a trava de arquivo, apenas a leem. A trava
+    de arquivo é por versão dos dados: o cálculo das seções de uma versão
+    nova (revalidate) não bloqueia as requisições que ainda servem a anterior.
+
+    Args:
+        nome: Nome da seção (chave de SECOES)
+        snapshot: Snapshot a usar (padrão: o da versão atual)
+
+    Returns:
+        Dados da seção (não devem ser modificados)
+
+    Raises:
+        KeyError: Se a seção não existir
+    """
+    if snapshot is None:
+        snapshot = get_snapshot()
+
+    secoes = snapshot['_secoes']
+    if nome in secoes:
+        mt.inc('lotopy_section_cache_total', secao=nome, resultado='hit')
+        return secoes[nome]
+
+    with snapshot['_locks_secoes'][nome]:
+        if nome not in secoes:
+            # Já publicada: lida sem a trava de arquivo
+            encontrada, dados = ss.read_section(snapshot['versao'], nome)
+            if not encontrada:
+                # Trava por versão: o cálculo de uma versão nova não bloqueia quem
+                # ainda serve a anterior
+                with ss.lock(f"secao-{snapshot['versao']}-{nome}"):
+                    encontrada, dados = ss.read_section(snapshot['versao'], nome)
+                    if not encontrada:
+                        mt.inc('lotopy_section_cache_total', secao=nome, resultado='miss')
+                        with mt.stage('secao.' + nome):
+                            dados = SECOES[nome](snapshot)
+                        ss.publish_section(snapshot['versao'], nome, dados)
+            if encontrada:
+                mt.inc('lotopy_section_cache_total', secao=nome, resultado='shared')
+            secoes[nome] = dados
+    return secoes[nome]
+
+
+def as_of(concurso, snapshot=None):
+    """
+    Posição de um concurso no histórico, para consultas "após o concurso N".
+
+    Args:
+        concurso: Número do concurso
+        snapshot: Snapshot a usar (padrão: o da versão atual)
+
+    Returns:
+        dict: {'concurso', 'total_concursos' (até ele, inclusive), 'ciclo_atual'}
+
+    Raises:
+        ValueError: Se o concurso não existe no histórico
+    """
+    if snapshot is None:
+        snapshot = get_snapshot()
+    k = aoi.position(get_section('as-of-index', snapshot), concurso)
+    return {
+        'concurso': concurso,
+        'total_concursos': k,
+        'ciclo_atual': int(snapshot['df']['ciclo'].iat[k - 1])
+    }
+
+
+def get_section_as_of(nome, concurso, snapshot=None):
+    """
+    Dados de uma seção como estavam logo após um concurso anterior.
+
+    As seções do estado agregado (SECOES_ESTADO) partem do checkpoint mais
+    próximo do índice 'as-of-index'; 'suggestions' não usa os checkpoints e
+    roda as estratégias vetorizadas sobre o histórico até o concurso (O(k)).
+
+    Args:
+        nome: 'suggestions' ou uma chave de SECOES_ESTADO
+        concurso: Número do concurso
+        snapshot: Snapshot a usar (padrão: o da versão atual)
+
+    Returns:
+        Dados da seção, no mesmo formato de get_section()
+
+    Raises:
+        KeyError: Se a seção não puder ser consultada com as_of
+        ValueError: Se o concurso não existe no histórico
+    """
+    if snapshot is None:
+        snapshot = get_snapshot()
+    if nome != 'suggestions' and nome not in SECOES_ESTADO:
+        raise KeyError(nome)
+
+    indice = get_section('as-of-index', snapshot)
+    k = aoi.position(indice, concurso)
+    with mt.stage('as_of.' + nome):
+        if nome == 'suggestions':
+            return tuple(aoi.suggestions_at(snapshot['df'], k, snapshot['masks']))
+        estado = aoi.state_at(indice, snapshot['df'], snapshot['masks'], k)
+        return SECOES_ESTADO[nome](estado)
+
+
+def _record_load(snapshot, origem):
+    """Atualiza as métricas da versão dos dados em uso."""
+    mt.inc('lotopy_snapshot_loads_total', origem=origem)
+    mt.set_gauge('lotopy_data_info', 1, substituir=True, versao=snapshot['versao'])
+    mt.set_gauge('lotopy_data_contests', snapshot['total_concursos'])
+
+
+def _served(snapshot):
+    """Registra a versão entregue à requisição atual."""
+    if snapshot is not None:
+        _versao_servida.set(snapshot['versao'])
+    return snapshot
+
+
+def start_request():
+    """Inicia o registro da versão dos dados usada pela requisição atual."""
+    _versao_servida.set(None)
+
+
+def served_version():
+    """Versão dos dados usada pela requisição atual (None se nenhuma)."""
+    return _versao_servida.get()
+
+
+def _is_current(snapshot, assinatura):
+    """O snapshot corresponde ao arquivo de dados e à versão publicada para ele."""
+    if snapshot is None or snapshot['assinatura'] != assinatura:
+        return False
+    ponteiro = ss.read_pointer()
+    return ponteiro is None or ponteiro['versao'] == snapshot['versao'] or ponteiro['assinatura'] != assinatura
+
+
+def get_snapshot(esperar=False):
+    """
+    Retorna o snapshot da versão atual dos dados (stale-while-revalidate).
+
+    Quando o arquivo de dados muda, a versão anterior continua sendo servida
+    enquanto a nova é calculada em segundo plano (revalidate()); a troca é
+    atômica e acontece só depois que todas as seções foram calculadas. O
+    cálculo só fica no caminho da requisição quando não há nenhuma versão
+    anterior (nem no processo nem publicada em disco) ou com esperar=True.
+
+    O cálculo é feito por um único construtor (single-flight):
+
+    - no processo, apenas uma thread recalcula; as demais recebem o
+      snapshot anterior enquanto ele existir, ou aguardam o novo;
+    - entre processos, a trava de arquivo "snapshot" do shared_store
+      garante um construtor por vez; quem aguardou abre a versão que o
+      outro processo acabou de publicar em vez de recalcular.
+
+    Args:
+        esperar: Se True, calcula a versão atual em vez de servir a anterior
+
+    Returns:
+        MappingProxyType: Snapshot (ver build_snapshot)
+    """
+    global _atual
+
+    assinatura = data_signature()
+    snapshot = _atual
+    if _is_current(snapshot, assinatura):
+        return _served(snapshot)
+
+    # Outra thread já está recalculando: responder com a versão anterior
+    if not _lock.acquire(blocking=snapshot is None or esperar):
+        mt.inc('lotopy_snapshot_coalesced_total', resultado='anterior')
+        return _served(snapshot)
+    try:
+        snapshot = _atual
+        if _is_current(snapshot, assinatura):
+            # Recalculado por outra thread enquanto esta aguardava
+            mt.inc('lotopy_snapshot_coalesced_total', resultado='aguardou')
+            return _served(snapshot)
+
+        publicado = _attach_published(assinatura, snapshot)
+        if publicado is None and (snapshot is None or snapshot['assinatura'] != assinatura):
+            if not esperar:
+                anterior = snapshot if snapshot is not None else _attach_previous()
+                if anterior is not None:
+                    # Serve a versão anterior; o hash do arquivo (_attach_stored) e o
+                    # recálculo ficam para revalidate(), em segundo plano
+                    if snapshot is None:
+                        _atual = anterior
+                        _record_load(anterior, 'attach')
+                    _start_revalidation()
+                    return _served(anterior)
+            publicado = _attach_stored(assinatura)
+
+        if publicado is None and (snapshot is None or snapshot['assinatura'] != assinatura):
+            with ss.lock('snapshot'):
+                # Outro processo pode ter publicado enquanto esta trava era aguardada
+                publicado = _attach_published(assinatura, snapshot)
+                if publicado is None:
+                    anterior = snapshot
+                    snapshot = build_snapshot(load_data(), assinatura, conteudo=data_content())
+                    _extend_sections(snapshot, anterior)
+                    ss.publish(snapshot)
+                    _atual = snapshot
+                    _record_load(snapshot, 'build')
+        if publicado is not None:
+            snapshot = publicado
+            _atual = snapshot
+            _record_load(snapshot, 'attach')
+    finally:
+        _lock.release()
+    return _served(snapshot)
+
+
+def _attach_previous():
+    """Abre a última versão publicada mesmo que o arquivo de dados já tenha mudado."""
+    ponteiro = ss.read_pointer()
+    if ponteiro is None:
+        return None
+    publicado = ss.attach(ponteiro['versao'], ponteiro.get('codigo'))
+    if publicado is None:
+        return None
+    df, arrays, secoes = publicado
+    return build_snapshot(df, ponteiro['assinatura'], masks=arrays['masks'], secoes=secoes,
+                          conteudo=ponteiro.get('conteudo'))
+
+
+def _start_revalidation():
+    """Inicia revalidate() em uma thread, se ainda não houver uma em andamento."""
+    global _revalidacao
+    if _revalidacao is not None and _revalidacao.is_alive():
+        return
+    _revalidacao = threading.Thread(target=revalidate, name="lotopy-revalidacao", daemon=True)
+    _revalidacao.start()
+
+
+def revalidate():
+    """
+    Calcula (ou abre, se outro processo já publicou) a versão do arquivo atual e troca o snapshot.
+
+    Roda em segundo plano a partir de get_snapshot(); erros são contados em
+    lotopy_snapshot_revalidations_total e a próxima requisição tenta de novo.
+
+    Returns:
+        MappingProxyType: Novo snapshot ou None em caso de erro
+    """
+    try:
+        snapshot = rebuild()
+    except Exception:
+        mt.inc('lotopy_snapshot_revalidations_total', status='erro')
+        return None
+    mt.inc('lotopy_snapshot_revalidations_total', status='ok')
+    return snapshot
+
+
+def warm(snapshot=None):
+    """
+    Calcula todas as seções do snapshot e publica o resultado para os demais processos.
+
+    Args:
+        snapshot: Snapshot a aquecer (padrão: o da versão atual, calculado se preciso)
+
+    Returns:
+        MappingProxyType: O snapshot aquecido
+    """
+    if snapshot is None:
+        snapshot = get_snapshot(esperar=True)
+    for nome in SECOES:
+        get_section(nome, snapshot)
+    ss.publish(snapshot)
+    return snapshot
+
+
+def rebuild(aquecer=True):
+    """
+    Recalcula o snapshot a partir do arquivo de dados e publica de uma vez.
+
+    Se outro processo já publicou a versão do arquivo atual, ela é aberta em
+    vez de recalculada. As requisições que chegam durante o cálculo recebem
+    o snapshot anterior (ou aguardam, se não houver) e passam ao novo
+    snapshot já completo (com as seções aquecidas, se pedido). Os demais
+    processos passam a usar a nova versão na próxima requisição.
+
+    Args:
+        aquecer: Se True, calcula todas as seções antes de publicar
+
+    Returns:
+        MappingProxyType: Novo snapshot publicado
+    """
+    global _atual
+
+    with _lock, ss.lock('snapshot'):
+        assinatura = data_signature()
+        snapshot = _attach_published(assinatura, None) or _attach_stored(assinatura)
+        origem = 'attach'
+        if snapshot is None:
+            snapshot = build_snapshot(load_data(), assinatura, conteudo=data_content())
+            _extend_sections(snapshot, _atual)
+            origem = 'build'
+        if aquecer:
+            warm(snapshot)
+        else:
+            ss.publish(snapshot)
+        _atual = snapshot
+        _record_load(snapshot, origem)
+    return snapshot
+
+
+def current_snapshot():
+    """Retorna o snapshot publicado sem verificar o arquivo (None se ainda não existe)."""
+    return _atual
+
+
+def use_snapshot(snapshot):
+    """
+    Publica no processo um snapshot montado fora do arquivo de dados.
+
+    Usado pelos benchmarks com históricos sintéticos: o snapshot deve ter
+    sido criado com assinatura=data_signature() para não ser descartado na
+    próxima requisição. Não é publicado para os demais processos.
+
+    Args:
+        snapshot: Snapshot criado por build_snapshot()
+    """
+    global _atual
+    with _lock:
+        _atual = snapshot
+        _record_load(snapshot, 'build')
+
+
+def invalidate():
+    """Descarta o snapshot atual (o próximo acesso abre a versão publicada ou recalcula)."""
+    global _atual
+    with _lock:
+        _atual = None
+
+
+def _reset_after_fork():
+    """Um processo filho não herda a thread que segurava a trava no momento do fork."""
+    global _lock, _revalidacao
+    _lock = threading.Lock()
+    _revalidacao = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,171 @@
+"""
+Módulo de build estático da página e das APIs de leitura.
+
+Entre dois sorteios a página é somente leitura. O build pré-renderiza, para
+a versão atual dos dados, a página principal (um arquivo por `limit`), os
+fragmentos das seções e o JSON das APIs das seções, de /api/suggestions e
+de /api/contests em `dist/<versao>/`, cada arquivo com a variante `.gz`
+ao lado. `dist/current` aponta para a última versão completa; qualquer
+servidor de arquivos estáticos pode servir o site e encaminhar ao Flask
+apenas o que não está no diretório (ver o exemplo de nginx no README).
+
+Os arquivos são as próprias respostas do Flask (via test_client), então o
+conteúdo é idêntico ao servido dinamicamente. Nomes dos arquivos:
+
+    /                          -> index.html (limit padrão) e index.limit-<N>.html
+    /sections/<nome>           -> sections/<nome>.html
+    /sections/contests?limit=N -> sections/contests.limit-<N>.html
+    /api/<secao>               -> api/<secao>.json
+    /api/contests?limit=N      -> api/contests.limit-<N>.json
+"""
+
+import glob
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+DIST_DIR = os.environ.get("LOTOPY_DIST_DIR", "dist")
+
+# Opções de limite da página (o padrão é 15)
+LIMITES = (5, 10, 15, 20, 25)
+
+# Quantidade de versões mantidas em DIST_DIR
+MAX_VERSOES = 3
+
+# Arquivos de static/ copiados para o build (demais extensões não são comprimidas)
+EXTENSOES_TEXTO = (".html", ".json", ".css", ".js", ".svg", ".txt")
+
+
+def build_urls(fragmentos, secoes_api):
+    """
+    Lista as URLs pré-renderizadas e o arquivo de cada uma.
+
+    Args:
+        fragmentos: Nomes dos fragmentos servidos em /sections/<nome>
+        secoes_api: Seções servidas em /api/<secao>
+
+    Returns:
+        list: Tuplas (url, arquivo relativo ao diretório da versão)
+    """
+    urls = [('/', 'index.html')]
+    urls += [(f'/?limit={limite}', f'index.limit-{limite}.html') for limite in LIMITES]
+
+    for nome in fragmentos:
+        if nome == 'contests':
+            urls += [(f'/sections/contests?limit={limite}', f'sections/contests.limit-{limite}.html')
+                     for limite in LIMITES]
+        urls.append((f'/sections/{nome}', f'sections/{nome}.html'))
+
+    urls += [(f'/api/{secao}', f'api/{secao}.json') for secao in secoes_api]
+    urls.append(('/api/suggestions', 'api/suggestions.json'))
+    urls.append(('/api/contests', 'api/contests.json'))
+    urls += [(f'/api/contests?limit={limite}', f'api/contests.limit-{limite}.json') for limite in LIMITES]
+    return urls
+
+
+def _write(diretorio, arquivo, conteudo):
+    """Grava o arquivo e a variante .gz (mtime fixo: builds iguais geram bytes iguais)."""
+    caminho = os.path.join(diretorio, arquivo)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "wb") as f:
+        f.write(conteudo)
+    if arquivo.endswith(EXTENSOES_TEXTO):
+        with open(caminho + ".gz", "wb") as f:
+            f.write(gzip.compress(conteudo, compresslevel=9, mtime=0))
+    return len(conteudo)
+
+
+def build(cliente, versao, urls, static_dir="static", saida=None, forcar=False):
+    """
+    Pré-renderiza as URLs da versão dos dados em `<saida>/<versao>/`.
+
+    O diretório é montado em um temporário e renomeado só no fim; em seguida
+    `<saida>/current` passa a apontar para ele. Se a versão já foi gerada,
+    nada é refeito (exceto com forcar=True, ex: após mudar os templates).
+
+    Args:
+        cliente: Cliente de teste do Flask (app.test_client())
+        versao: Versão dos dados esperada (snapshot['versao'])
+        urls: Lista de build_urls()
+        static_dir: Diretório dos arquivos estáticos (CSS/JS)
+        saida: Diretório de saída (padrão: DIST_DIR)
+        forcar: Gera novamente mesmo que a versão já exista
+
+    Returns:
+        dict: Manifesto do build (versao, gerado_em, arquivos, bytes)
+
+    Raises:
+        RuntimeError: Se uma URL falhar ou se a versão dos dados mudar durante o build
+    """
+    saida = saida or DIST_DIR
+    diretorio = os.path.join(saida, versao)
+    caminho_manifesto = os.path.join(diretorio, "manifest.json")
+    if os.path.exists(caminho_manifesto) and not forcar:
+        _point_current(saida, versao)
+        with open(caminho_manifesto, encoding="utf-8") as f:
+            return json.load(f)
+
+    os.makedirs(saida, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=saida, prefix=".tmp-")
+    try:
+        arquivos = {}
+        for url, arquivo in urls:
+            resposta = cliente.get(url)
+            if resposta.status_code != 200:
+                raise RuntimeError(f"{url} respondeu {resposta.status_code}.")
+            servida = resposta.headers.get('X-Data-Version')
+            if servida != versao:
+                raise RuntimeError(f"A versão dos dados mudou durante o build ({versao} -> {servida}).")
+            arquivos[arquivo] = _write(tmp, arquivo, resposta.get_data())
+
+        for caminho in glob.glob(os.path.join(static_dir, "**", "*"), recursive=True):
+            if os.path.isfile(caminho):
+                arquivo = os.path.join("static", os.path.relpath(caminho, static_dir))
+                with open(caminho, "rb") as f:
+                    arquivos[arquivo] = _write(tmp, arquivo, f.read())
+
+        manifesto = {
+            'versao': versao,
+            'gerado_em': datetime.now().isoformat(timespec="seconds"),
+            'arquivos': len(arquivos),
+            'bytes': sum(arquivos.values())
+        }
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifesto, f, ensure_ascii=False)
+
+        os.chmod(tmp, 0o755)
+        if os.path.isdir(diretorio):
+            shutil.rmtree(diretorio)
+        os.rename(tmp, diretorio)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    _point_current(saida, versao)
+    _cleanup(saida, versao)
+    return manifesto
+
+
+def _point_current(saida, versao):
+    """Troca o link `current` de forma atômica (symlink temporário + os.replace)."""
+    tmp = os.path.join(saida, f".current-{os.getpid()}")
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.symlink(versao, tmp)
+    os.replace(tmp, os.path.join(saida, "current"))
+
+
+def _cleanup(saida, versao_atual):
+    """Remove os builds mais antigos, mantendo os MAX_VERSOES mais recentes."""
+    diretorios = sorted(
+        (d for d in glob.glob(os.path.join(saida, "*"))
+         if os.path.isdir(d) and not os.path.islink(d) and not os.path.basename(d).startswith(".")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for diretorio in diretorios[MAX_VERSOES:]:
+        if os.path.basename(diretorio) != versao_atual:
+            shutil.rmtree(diretorio, ignore_errors=True)
@@ -0,0 +1,76 @@
+"""
+Módulo de geração de históricos sintéticos de concursos.
+
+Gera DataFrames no mesmo formato de adjust_table.adjust_table() (Concurso,
+Data Sorteio como texto dd/mm/aaaa e Bola1..Bola15 em ordem crescente,
+Int64), com sorteios uniformes de 15 entre 25 números. A geração é
+determinística pela semente, então benchmarks e verificações com o mesmo
+tamanho e semente usam exatamente os mesmos dados.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Data do primeiro concurso real (uma segunda-feira); os sorteios sintéticos
+# acontecem de segunda a sábado
+DATA_INICIAL = np.datetime64("2003-09-29")
+SORTEIOS_POR_SEMANA = 6
+
+
+def random_draws(n, seed=42):
+    """
+    Sorteia n jogos de 15 números entre 1 e 25.
+
+    Args:
+        n: Quantidade de sorteios
+        seed: Semente do gerador
+
+    Returns:
+        np.ndarray: Matriz (n, 15) int8 com os números de cada sorteio em ordem crescente
+    """
+    rng = np.random.default_rng(seed)
+    bolas = np.empty((n, 15), dtype=np.int8)
+    # Em blocos para limitar a memória da matriz de chaves aleatórias
+    for inicio in range(0, n, 100_000):
+        fim = min(n, inicio + 100_000)
+        chaves = rng.random((fim - inicio, 25))
+        bolas[inicio:fim] = np.sort(np.argsort(chaves, axis=1)[:, :15], axis=1) + 1
+    return bolas
+
+
+def draw_dates(n):
+    """
+    Datas dos n primeiros sorteios sintéticos (segunda a sábado).
+
+    Args:
+        n: Quantidade de sorteios
+
+    Returns:
+        np.ndarray: Datas como texto no formato dd/mm/aaaa (dtype object)
+    """
+    i = np.arange(n)
+    dias = (i // SORTEIOS_POR_SEMANA) * 7 + i % SORTEIOS_POR_SEMANA
+    iso = np.datetime_as_string(DATA_INICIAL + dias.astype("timedelta64[D]"), unit="D")
+    partes = pd.Series(iso).str.split("-", expand=True)
+    return (partes[2] + "/" + partes[1] + "/" + partes[0]).to_numpy(dtype=object)
+
+
+def generate_history(n, seed=42):
+    """
+    Gera um histórico sintético no formato de adjust_table().
+
+    Args:
+        n: Quantidade de concursos
+        seed: Semente do gerador
+
+    Returns:
+        pd.DataFrame: Colunas Concurso, Data Sorteio e Bola1..Bola15
+    """
+    bolas = random_draws(n, seed)
+    colunas = {
+        "Concurso": np.arange(1, n + 1, dtype=np.int64),
+        "Data Sorteio": draw_dates(n),
+    }
+    for i in range(15):
+        colunas[f"Bola{i + 1}"] = pd.array(bolas[:, i], dtype="Int64")
+    return pd.DataFrame(colunas)
@@ -0,0 +1,201 @@
+"""
+Módulo para conferência em lote de jogos da Lotofácil.
+
+Recebe milhares de jogos (listas de números ou máscaras de bits) e confere
+todos contra um concurso, um intervalo de concursos ou o histórico completo.
+A matriz jogos x sorteios de acertos é calculada com AND + popcount em blocos,
+limitando o uso de memória independentemente do tamanho do lote.
+
+Um jogo com k > 15 números equivale às C(k, 15) apostas simples contidas
+nele: com h acertos em um sorteio, ele tem C(h, f) * C(k - h, 15 - f)
+apostas com exatamente f acertos, e os prêmios por faixa somam todas elas.
+"""
+
+from math import comb
+
+import numpy as np
+
+import source.draw_masks as dm
+
+# Faixas de premiação da Lotofácil (quantidade de acertos)
+FAIXAS_PREMIO = (11, 12, 13, 14, 15)
+
+# Limites de um jogo (aposta simples até aposta com 20 números)
+MIN_NUMEROS_JOGO = 15
+MAX_NUMEROS_JOGO = 20
+
+# Quantidade máxima de células (jogos x sorteios) calculadas por bloco
+MAX_CELULAS_BLOCO = 1 << 22
+
+# _PREMIOS[faixa][k, h]: apostas simples com `faixa` acertos em um jogo de k
+# números com h acertos (tabela por quantidade de números e de acertos)
+_PREMIOS = {
+    faixa: np.array(
+        [[comb(h, faixa) * comb(k - h, 15 - faixa) if h <= k else 0 for h in range(16)]
+         for k in range(MAX_NUMEROS_JOGO + 1)],
+        dtype=np.int32
+    )
+    for faixa in FAIXAS_PREMIO
+}
+
+
+def parse_tickets(jogos):
+    """
+    Valida e converte os jogos recebidos para máscaras de bits.
+
+    Cada jogo pode ser uma lista de números (1-25) ou um inteiro com a
+    máscara de bits já codificada (bit n-1 = número n).
+
+    Args:
+        jogos: Lista de jogos (listas de números ou inteiros)
+
+    Returns:
+        np.ndarray: Array uint32 com a máscara de cada jogo
+
+    Raises:
+        ValueError: Se algum jogo for inválido
+    """
+    if not isinstance(jogos, (list, tuple)) or not jogos:
+        raise ValueError("Informe uma lista não vazia de jogos.")
+
+    masks = np.empty(len(jogos), dtype=np.uint32)
+    for i, jogo in enumerate(jogos):
+        if isinstance(jogo, bool):
+            raise ValueError(f"Jogo {i}: formato inválido.")
+        if isinstance(jogo, int):
+            if jogo < 0 or jogo > dm.MASCARA_TODOS:
+                raise ValueError(f"Jogo {i}: máscara fora do intervalo de 25 bits.")
+            mask = jogo
+            qtd = bin(mask).count("1")
+        elif isinstance(jogo, (list, tuple)):
+            if not all(isinstance(n, int) and not isinstance(n, bool) and 1 <= n <= 25 for n in jogo):
+                raise ValueError(f"Jogo {i}: os números devem estar entre 1 e 25.")
+            if len(set(jogo)) != len(jogo):
+                raise ValueError(f"Jogo {i}: números repetidos.")
+            mask = dm.numbers_to_mask(jogo)
+            qtd = len(jogo)
+        else:
+            raise ValueError(f"Jogo {i}: formato inválido.")
+
+        if qtd < MIN_NUMEROS_JOGO or qtd > MAX_NUMEROS_JOGO:
+            raise ValueError(
+                f"Jogo {i}: deve ter entre {MIN_NUMEROS_JOGO} e {MAX_NUMEROS_JOGO} números."
+            )
+        masks[i] = mask
+
+    return masks
+
+
+def select_draws(df, concurso=None, concurso_inicial=None, concurso_final=None, masks=None):
+    """
+    Seleciona os sorteios que serão usados na conferência.
+
+    Sem filtros, retorna o histórico completo.
+
+    Args:
+        df: DataFrame com as colunas Concurso, Bola1, ..., Bola15
+        concurso: Número de um concurso específico
+        concurso_inicial: Primeiro concurso do intervalo (inclusivo)
+        concurso_final: Último concurso do intervalo (inclusivo)
+        masks: Máscaras já calculadas (opcional, na ordem do DataFrame)
+
+    Returns:
+        tuple: (array de números dos concursos, array uint32 de máscaras)
+
+    Raises:
+        ValueError: Se nenhum concurso corresponder ao filtro
+    """
+    concursos = df["Concurso"].to_numpy(dtype=np.int64)
+    if masks is None:
+        masks = dm.calculate_masks(df)
+    masks = np.asarray(masks, dtype=np.uint32)
+
+    if concurso is not None:
+        filtro = concursos == concurso
+        if not filtro.any():
+            raise ValueError(f"Concurso {concurso} não encontrado.")
+    else:
+        filtro = np.ones(len(concursos), dtype=bool)
+        if concurso_inicial is not None:
+            filtro &= concursos >= concurso_inicial
+        if concurso_final is not None:
+            filtro &= concursos <= concurso_final
+        if not filtro.any():
+            raise ValueError("Nenhum concurso encontrado no intervalo informado.")
+
+    return concursos[filtro], masks[filtro]
+
+
+def iter_hit_blocks(ticket_masks, draw_masks, max_celulas=MAX_CELULAS_BLOCO):
+    """
+    Calcula os acertos jogos x sorteios em blocos de memória limitada.
+
+    Args:
+        ticket_masks: Array uint32 com as máscaras dos jogos
+        draw_masks: Array uint32 com as máscaras dos sorteios
+        max_celulas: Quantidade máxima de células por bloco
+
+    Yields:
+        tuple: (índice inicial do bloco, matriz uint8 de acertos [jogos_bloco x sorteios])
+    """
+    draw_masks = np.asarray(draw_masks, dtype=np.uint32)
+    tamanho_bloco = max(1, max_celulas // max(1, len(draw_masks)))
+
+    for inicio in range(0, len(ticket_masks), tamanho_bloco):
+        bloco = ticket_masks[inicio:inicio + tamanho_bloco]
+        acertos = dm.popcount(bloco[:, None] & draw_masks[None, :])
+        yield inicio, acertos
+
+
+def evaluate_tickets(ticket_masks, draw_masks, max_celulas=MAX_CELULAS_BLOCO):
+    """
+    Confere os jogos contra os sorteios e gera o resultado de cada jogo.
+
+    O último item gerado é o resumo agregado com o total de prêmios por faixa.
+    Jogos com mais de 15 números contam os prêmios de todas as apostas
+    simples contidas neles (ver _PREMIOS).
+
+    Args:
+        ticket_masks: Array uint32 com as máscaras dos jogos
+        draw_masks: Array uint32 com as máscaras dos sorteios
+        max_celulas: Quantidade máxima de células por bloco
+
+    Yields:
+        dict: Resultado de cada jogo ('indice', 'max_acertos', 'premios' e,
+              quando há um único sorteio, 'acertos'), seguido do resumo
+              ({'resumo': {...}})
+    """
+    total_premios = {faixa: 0 for faixa in FAIXAS_PREMIO}
+    jogos_premiados = 0
+    sorteio_unico = len(draw_masks) == 1
+
+    for inicio, acertos in iter_hit_blocks(ticket_masks, draw_masks, max_celulas):
+        max_acertos = acertos.max(axis=1)
+        qtd_numeros = dm.popcount(ticket_masks[inicio:inicio + len(acertos)])[:, None]
+        premios_bloco = {
+            faixa: _PREMIOS[faixa][qtd_numeros, acertos].sum(axis=1, dtype=np.int64)
+            for faixa in FAIXAS_PREMIO
+        }
+
+        for faixa in FAIXAS_PREMIO:
+            total_premios[faixa] += int(premios_bloco[faixa].sum())
+        jogos_premiados += int((max_acertos >= FAIXAS_PREMIO[0]).sum())
+
+        for j in range(len(acertos)):
+            resultado = {
+                'indice': inicio + j,
+                'max_acertos': int(max_acertos[j]),
+                'premios': {str(faixa): int(premios_bloco[faixa][j]) for faixa in FAIXAS_PREMIO}
+            }
+            if sorteio_unico:
+                resultado['acertos'] = int(acertos[j, 0])
+            yield resultado
+
+    yield {
+        'resumo': {
+            'total_jogos': int(len(ticket_masks)),
+            'total_concursos': int(len(draw_masks)),
+            'jogos_premiados': jogos_premiados,
+            'premios': {str(faixa): total for faixa, total in total_premios.items()}
+        }
+    }
@@ -0,0 +1,272 @@
+"""
+Módulo de geração aleatória de jogos com restrições.
+
+Gera quantos jogos forem pedidos respeitando restrições como configuração
+P-I-NP, quantidade na moldura/miolo, distribuição por linhas, faixa de soma
+e números obrigatórios/proibidos. Os candidatos são sorteados em lotes
+vetorizados (máscaras de bits), filtrados com as máscaras de região da
+cartela e os jogos válidos são entregues em fluxo até completar a quantidade.
+"""
+
+import re
+
+import numpy as np
+
+import source.combination_index as ci
+import source.draw_masks as dm
+
+# Quantidade de candidatos sorteados por lote
+TAMANHO_LOTE = 1 << 16
+
+# Candidatos testados por jogo pedido antes de desistir (restrições impossíveis)
+MAX_CANDIDATOS_POR_JOGO = 500
+MIN_CANDIDATOS = 5_000_000
+
+# Lotes seguidos sem nenhum jogo novo antes de desistir (combinações esgotadas)
+MAX_LOTES_SEM_NOVOS = 50
+
+
+def _parse_range(valor, nome):
+    """
+    Converte uma restrição de quantidade ("9" ou "8-10") em intervalo (min, max).
+
+    Args:
+        valor: Inteiro, string "N" ou "MIN-MAX"
+        nome: Nome da restrição (usado nas mensagens de erro)
+
+    Returns:
+        tuple: (mínimo, máximo) ou None se não informado
+    """
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, int):
+        return (valor, valor)
+
+    match = re.fullmatch(r"\s*(\d+)\s*(?:-\s*(\d+)\s*)?", str(valor))
+    if not match:
+        raise ValueError(f"Restrição '{nome}' deve ser um número ou um intervalo (ex: 8-10).")
+
+    minimo = int(match.group(1))
+    maximo = int(match.group(2)) if match.group(2) else minimo
+    if minimo > maximo:
+        raise ValueError(f"Restrição '{nome}': mínimo maior que o máximo.")
+    return (minimo, maximo)
+
+
+def _parse_numbers(valor, nome):
+    """Converte uma lista de números (lista ou string "1,2,3") validando o intervalo 1-25."""
+    if valor is None or valor == '':
+        return []
+    if isinstance(valor, str):
+        try:
+            valor = [int(n) for n in valor.split(',') if n.strip()]
+        except ValueError:
+            raise ValueError(f"Restrição '{nome}' deve ser uma lista de números separados por vírgula.")
+
+    numeros = sorted(set(int(n) for n in valor))
+    if any(n < 1 or n > 25 for n in numeros):
+        raise ValueError(f"Restrição '{nome}': os números devem estar entre 1 e 25.")
+    return numeros
+
+
+def build_constraints(config_pip=None, moldura=None, miolo=None, linhas=None,
+                      soma_min=None, soma_max=None, incluir=None, excluir=None):
+    """
+    Valida as restrições e converte para o formato usado pelo filtro vetorizado.
+
+    Args:
+        config_pip: Configuração P-I-NP no formato "7P-8I-5NP"
+        moldura: Quantidade na moldura ("9" ou "8-10")
+        miolo: Quantidade no miolo ("6" ou "5-7")
+        linhas: Distribuição por linhas no formato "3-3-3-3-3"
+        soma_min: Soma mínima dos números
+        soma_max: Soma máxima dos números
+        incluir: Números obrigatórios (lista ou "1,2,3")
+        excluir: Números proibidos (lista ou "4,5,6")
+
+    Returns:
+        dict: Restrições normalizadas
+
+    Raises:
+        ValueError: Se alguma restrição for inválida ou contraditória
+    """
+    restricoes = {}
+
+    if config_pip:
+        match = re.fullmatch(r"\s*(\d+)P-(\d+)I-(\d+)NP\s*", str(config_pip), re.IGNORECASE)
+        if not match:
+            raise ValueError("Restrição 'config_pip' deve estar no formato 7P-8I-5NP.")
+        pares, impares, primos = (int(g) for g in match.groups())
+        if pares + impares != 15:
+            raise ValueError("Restrição 'config_pip': pares + ímpares deve ser 15.")
+        restricoes['pares'] = (pares, pares)
+        restricoes['primos'] = (primos, primos)
+
+    for nome, valor in (('moldura', moldura), ('miolo', miolo)):
+        intervalo = _parse_range(valor, nome)
+        if intervalo is not None:
+            restricoes[nome] = intervalo
+
+    if linhas:
+        partes = str(linhas).split('-')
+        if len(partes) != 5 or not all(p.strip().isdigit() for p in partes):
+            raise ValueError("Restrição 'linhas' deve estar no formato 3-3-3-3-3.")
+        distribuicao = [int(p) for p in partes]
+        if sum(distribuicao) != 15:
+            raise ValueError("Restrição 'linhas': a soma das linhas deve ser 15.")
+        restricoes['linhas'] = distribuicao
+
+    if soma_min is not None or soma_max is not None:
+        restricoes['soma'] = (
+            int(soma_min) if soma_min is not None else 0,
+            int(soma_max) if soma_max is not None else 325
+        )
+
+    numeros_incluir = _parse_numbers(incluir, 'incluir')
+    numeros_excluir = _parse_numbers(excluir, 'excluir')
+    if set(numeros_incluir) & set(numeros_excluir):
+        raise ValueError("Um número não pode ser obrigatório e proibido ao mesmo tempo.")
+    if len(numeros_incluir) > 15:
+        raise ValueError("No máximo 15 números obrigatórios.")
+    if 25 - len(numeros_excluir) < 15:
+        raise ValueError("No máximo 10 números proibidos.")
+    restricoes['incluir'] = dm.numbers_to_mask(numeros_incluir)
+    restricoes['excluir'] = dm.numbers_to_mask(numeros_excluir)
+
+    return restricoes
+
+
+def filter_candidates(masks, restricoes):
+    """
+    Aplica as restrições a um lote de candidatos usando as máscaras de região.
+
+    Args:
+        masks: Array uint32 de candidatos (15 números cada)
+        restricoes: Restrições criadas por build_constraints()
+
+    Returns:
+        np.ndarray: Array booleano indicando os candidatos válidos
+    """
+    validos = np.ones(len(masks), dtype=bool)
+
+    intervalos = (
+        ('pares', dm.MASCARA_PARES),
+        ('primos', dm.MASCARA_PRIMOS),
+        ('moldura', dm.MASCARA_MOLDURA),
+        ('miolo', dm.MASCARA_MIOLO),
+    )
+    for nome, mascara in intervalos:
+        if nome in restricoes:
+            minimo, maximo = restricoes[nome]
+            qtd = dm.popcount(masks & np.uint32(mascara))
+            validos &= (qtd >= minimo) & (qtd <= maximo)
+
+    if 'linhas' in restricoes:
+        for mascara, alvo in zip(dm.MASCARAS_LINHAS, restricoes['linhas']):
+            validos &= dm.popcount(masks & np.uint32(mascara)) == alvo
+
+    if 'soma' in restricoes:
+        minimo, maximo = restricoes['soma']
+        somas = dm.mask_sums(masks)
+        validos &= (somas >= minimo) & (somas <= maximo)
+
+    if restricoes.get('incluir'):
+        incluir = np.uint32(restricoes['incluir'])
+        validos &= (masks & incluir) == incluir
+    if restricoes.get('excluir'):
+        validos &= (masks & np.uint32(restricoes['excluir'])) == 0
+
+    return validos
+
+
+def _candidate_batch(rng, restricoes, tamanho):
+    """
+    Sorteia um lote de candidatos uniformes entre os jogos que respeitam incluir/excluir.
+
+    Sem números obrigatórios/proibidos, sorteia ranks uniformes e consulta a
+    tabela de combinações. Caso contrário, completa os obrigatórios com uma
+    amostra aleatória dos números livres.
+    """
+    incluir = restricoes.get('incluir', 0)
+    excluir = restricoes.get('excluir', 0)
+
+    if not incluir and not excluir:
+        return ci.all_combination_masks()[rng.integers(0, ci.TOTAL_COMBINACOES, size=tamanho)]
+
+    livres = np.array(
+        [n - 1 for n in range(1, 26) if not (incluir | excluir) & (1 << (n - 1))],
+        dtype=np.uint32
+    )
+    faltam = 15 - bin(incluir).count("1")
+    if faltam == 0:
+        return np.full(tamanho, incluir, dtype=np.uint32)
+
+    escolhidos = np.argpartition(rng.random((tamanho, len(livres))), faltam - 1, axis=1)[:, :faltam]
+    bits = np.left_shift(np.uint32(1), livres[escolhidos])
+    return np.bitwise_or.reduce(bits, axis=1) | np.uint32(incluir)
+
+
+def sample_tickets(n, restricoes, seed=None, indice_sorteados=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Gera jogos aleatórios distintos que respeitam as restrições, em fluxo.
+
+    A geração para ao atingir n jogos, quando o limite de candidatos é
+    esgotado ou quando vários lotes seguidos não trazem nenhum jogo novo
+    (restrições muito restritivas, impossíveis ou combinações esgotadas).
+
+    Args:
+        n: Quantidade de jogos desejada
+        restricoes: Restrições criadas por build_constraints()
+        seed: Semente do gerador aleatório
+        indice_sorteados: Índice de build_drawn_index() para excluir combinações já sorteadas
+        tamanho_lote: Quantidade de candidatos por lote
+
+    Yields:
+        np.ndarray: Lotes de máscaras uint32 de jogos válidos (total de até n jogos)
+    """
+    rng = np.random.default_rng(seed)
+    vistos = set()
+    encontrados = 0
+    candidatos = 0
+    lotes_sem_novos = 0
+    max_candidatos = max(MIN_CANDIDATOS, n * MAX_CANDIDATOS_POR_JOGO)
+
+    while encontrados < n and candidatos < max_candidatos and lotes_sem_novos < MAX_LOTES_SEM_NOVOS:
+        lote = _candidate_batch(rng, restricoes, tamanho_lote)
+        candidatos += tamanho_lote
+
+        lote = lote[filter_candidates(lote, restricoes)]
+        if indice_sorteados is not None and len(lote):
+            lote = lote[ci.filter_not_drawn(indice_sorteados, lote)]
+
+        # Manter apenas jogos inéditos, preservando a ordem do sorteio
+        lote, primeiros = np.unique(lote, return_index=True)
+        lote = lote[np.argsort(primeiros)]
+        novos = [m for m in lote.tolist() if m not in vistos]
+        novos = novos[:n - encontrados]
+        if not novos:
+            lotes_sem_novos += 1
+            continue
+
+        lotes_sem_novos = 0
+        vistos.update(novos)
+        encontrados += len(novos)
+        yield np.array(novos, dtype=np.uint32)
+
+
+def iter_tickets(n, restricoes, seed=None, indice_sorteados=None):
+    """
+    Gera jogos válidos um a um como listas de números.
+
+    Args:
+        n: Quantidade de jogos desejada
+        restricoes: Restrições criadas por build_constraints()
+        seed: Semente do gerador aleatório
+        indice_sorteados: Índice para excluir combinações já sorteadas
+
+    Yields:
+        list: Lista ordenada com os 15 números de cada jogo
+    """
+    for lote in sample_tickets(n, restricoes, seed=seed, indice_sorteados=indice_sorteados):
+        for numeros in dm.masks_to_number_matrix(lote).tolist():
+            yield numeros
@@ -1,8 +1,43 @@
+// Carregar o fragmento HTML de uma seção da página
+function loadSection(slot) {
+    const url = slot.dataset.sectionUrl;
+
+    return fetch(url)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            return response.text();
+        })
+        .then(html => {
+            slot.innerHTML = html;
+            slot.querySelectorAll('[data-compacto]').forEach(renderCompact);
+        })
+        .catch(error => {
+            slot.innerHTML = `<p class="section-error">Erro ao carregar seção: ${error.message}</p>`;
+        });
+}
+
 // Função para atualizar a página com novo limite de jogos
 function updateLimit() {
     const selector = document.getElementById('limit-selector');
     const limit = selector.value;
-    window.location.href = `/?limit=${limit}`;
+
+    // Recarregar apenas a seção de concursos
+    const slot = document.querySelector('#concursos .section-slot');
+    if (!slot) {
+        window.location.href = `/?limit=${limit}`;
+        return;
+    }
+
+    const url = new URL(slot.dataset.sectionUrl, window.location.origin);
+    url.searchParams.set('limit', limit);
+    slot.dataset.sectionUrl = url.pathname + url.search;
+    loadSection(slot);
+
+    const pagina = new URLSearchParams(window.location.search);
+    pagina.set('limit', limit);
+    window.history.replaceState(null, '', `/?${pagina}`);
 }
 
 // Função para criar uma grade 5x5 da cartela
@@ -27,6 +62,118 @@ function createCartelaGrid(numeros, containerId) {
     }
 }
 
+// --- Formato compacto (?compacto=1, ver source/compact_format.py) ---------------
+// Cada concurso/jogo chega como máscara de 25 bits (bit n-1 = número n); as
+// contagens saem de popcount(mask & região), com as regiões do cabeçalho.
+
+function popcount(mask) {
+    mask = mask - ((mask >>> 1) & 0x55555555);
+    mask = (mask & 0x33333333) + ((mask >>> 2) & 0x33333333);
+    return (((mask + (mask >>> 4)) & 0x0F0F0F0F) * 0x01010101) >>> 24;
+}
+
+function decodeMask(mask) {
+    const numeros = [];
+    for (let n = 1; n <= 25; n++) {
+        if (mask & (1 << (n - 1))) numeros.push(n);
+    }
+    return numeros;
+}
+
+function escapeHtml(texto) {
+    return String(texto).replace(/[&<>"']/g, c => `&#${c.charCodeAt(0)};`);
+}
+
+// Contagens exibidas nos cards (mesmas de contest_history/_enrich_suggestions)
+function maskStats(mask, regioes) {
+    const conta = nome => popcount(mask & regioes[nome]);
+    return {
+        config_pip: `${conta('pares')}P-${conta('impares')}I-${conta('primos')}NP`,
+        moldura: conta('moldura'),
+        miolo: conta('miolo'),
+        distribuicao_linhas: [1, 2, 3, 4, 5].map(i => conta(`linha${i}`)).join('-'),
+        q1: conta('q1'), q2: conta('q2'), q3: conta('q3'), q4: conta('q4'),
+        cruz: conta('cruz')
+    };
+}
+
+function cartelaHtml(mask, novos) {
+    let html = '<div class="cartela-grid">';
+    for (let i = 1; i <= 25; i++) {
+        const bit = 1 << (i - 1);
+        const classes = ['cartela-cell'];
+        if (mask & bit) classes.push('selected');
+        if (novos & bit) classes.push('is-new-in-cycle');
+        const titulo = novos & bit ? ' title="Novo no Ciclo"' : '';
+        html += `<div class="${classes.join(' ')}"${titulo}>${i}</div>`;
+    }
+    return html + '</div>';
+}
+
+function statsHtml(linhas) {
+    return '<div class="concurso-stats">' + linhas.map(([rotulo, valor]) =>
+        `<div class="stat-row"><span class="stat-label">${rotulo}</span><span class="stat-value">${valor}</span></div>`
+    ).join('') + '</div>';
+}
+
+function regionRows(stats) {
+    return [
+        ['⚖️ P-I-NP:', stats.config_pip],
+        ['🔲 Moldura:', stats.moldura],
+        ['⬛ Miolo:', stats.miolo],
+        ['📊 Linhas:', stats.distribuicao_linhas],
+        ['◰ Q1:', stats.q1],
+        ['◳ Q2:', stats.q2],
+        ['✟ Cruz:', stats.cruz],
+        ['◱ Q3:', stats.q3],
+        ['◲ Q4:', stats.q4]
+    ];
+}
+
+function numbersHtml(mask) {
+    return decodeMask(mask).map(n => `<span class="numero-badge-small">${n}</span>`).join('');
+}
+
+function contestCard(c, regioes) {
+    const qtdNovos = popcount(c.novos);
+    const repetidos = popcount(c.mask) - qtdNovos;
+    return `<div class="concurso-card">
+        <div class="concurso-card-header"><h3>Concurso ${c.concurso}</h3><span class="concurso-date">${escapeHtml(c.data)}</span></div>
+        <div class="concurso-cartela">${cartelaHtml(c.mask, c.novos)}</div>
+        <div class="concurso-numbers">${numbersHtml(c.mask)}</div>
+        ${statsHtml([
+            ['🔄 Ciclo:', `<span class="ciclo-badge">${c.ciclo}</span>`],
+            ['✨ Novos/Rep:', `<span title="${qtdNovos} novos no ciclo, ${repetidos} repetidos"><span style="color: #10b981;">${qtdNovos}</span> / <span style="color: #6b7280;">${repetidos}</span></span>`],
+            ...regionRows(maskStats(c.mask, regioes))
+        ])}
+    </div>`;
+}
+
+function suggestionCard(s, regioes) {
+    const ciclo = s.ciclo_count === undefined ? [] : [['🔄 Ciclo:', `${s.ciclo_count}/15`]];
+    return `<div class="suggestion-card">
+        <div class="suggestion-header"><h3>${escapeHtml(s.estrategia)}</h3><p class="suggestion-desc">${escapeHtml(s.descricao)}</p></div>
+        <div class="suggestion-cartela">${cartelaHtml(s.mask, 0)}</div>
+        <div class="suggestion-numbers">${numbersHtml(s.mask)}</div>
+        ${statsHtml([...ciclo, ...regionRows(maskStats(s.mask, regioes))])}
+    </div>`;
+}
+
+// Linhas do formato compacto (arrays na ordem de "campos") como objetos
+function decodeRows(payload, chave) {
+    return payload[chave].map(linha =>
+        Object.fromEntries(payload.campos.map((campo, i) => [campo, linha[i]]))
+    );
+}
+
+// Monta os cards de um container [data-compacto] a partir do payload compacto
+function renderCompact(container) {
+    const payload = JSON.parse(container.dataset.payload);
+    const chave = container.dataset.compacto;
+    const card = chave === 'concursos' ? contestCard : suggestionCard;
+    container.innerHTML = decodeRows(payload, chave).map(linha => card(linha, payload.regioes)).join('');
+}
+
 // Inicializar grades quando a página carregar
 document.addEventListener('DOMContentLoaded', function () {
     // Definir o valor correto no seletor
@@ -36,4 +183,7 @@ document.addEventListener('DOMContentLoaded', function () {
     if (selector) {
         selector.value = currentLimit;
     }
+
+    // Carregar as seções de forma independente (cada uma aparece quando fica pronta)
+    document.querySelectorAll('.section-slot').forEach(loadSection);
 });
@@ -0,0 +1,132 @@
+"""
+Verificação do estado agregado incremental (source/aggregate_state.py).
+
+Para a base real e históricos sintéticos:
+
+1. os resultados derivados de build_state(df) são comparados aos das
+   implementações de referência (global_statistics e cycle_analysis) sobre
+   o histórico completo;
+2. o estado é calculado sobre um prefixo do histórico e estendido com
+   update_state em blocos de tamanhos aleatórios (inclusive um concurso por
+   vez) até o histórico completo; cada estado intermediário precisa ser
+   idêntico a build_state do mesmo prefixo, inclusive na ordem das chaves.
+
+Mostra o tempo de uma atualização com um concurso novo comparado ao
+recálculo completo. Termina com código 1 se qualquer resultado divergir.
+
+Uso:
+    python verify_aggregates.py
+    python verify_aggregates.py --sinteticos 10 --seed 123 --sem-base-real
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import source.adjust_table as at
+import source.aggregate_state as agg
+import source.array_cache as ac
+import source.cycle_analysis as ca
+import source.cycle_calculator as cc
+import source.draw_masks as dm
+import source.global_statistics as gstats
+import source.number_frequency as nf
+import source.pip_config as pip
+import source.synthetic_history as sh
+from verify_equivalence import _equal
+
+# (nome, referência sobre o DataFrame, resultado derivado do estado)
+DERIVADOS = [
+    ("heat_map", gstats.calculate_heat_map, agg.heat_map),
+    ("geographic", gstats.calculate_consolidated_geographic_analysis, agg.geographic),
+    ("pip_distribution", gstats.calculate_global_pip_distribution, agg.pip_distribution),
+    ("numbers_status", nf.get_numbers_status_in_cycle, agg.numbers_status),
+    ("cycle_exit_patterns", ca.analyze_cycle_exit_patterns, agg.cycle_exit_patterns),
+    ("new_numbers_distribution", ca.analyze_new_numbers_distribution, agg.new_numbers_distribution),
+    ("frequency_by_cycle_step", ca.analyze_frequency_by_cycle_step, agg.frequency_by_cycle_step),
+    ("frequency_by_cycle_step(15)", lambda df: ca.analyze_frequency_by_cycle_step(df, max_steps=15),
+     lambda estado: agg.frequency_by_cycle_step(estado, max_steps=15)),
+]
+
+
+def verify_dataset(nome, df_bruto, sorteador):
+    """Confere derivados e atualizações incrementais; retorna a quantidade de divergências."""
+    print(f"\n=== {nome} ({len(df_bruto)} concursos) ===")
+    df = pip.calculate_pip_config(cc.calculate_cycle(df_bruto))
+    falhas = 0
+
+    estado = agg.build_state(df)
+    for nome_funcao, referencia, derivado in DERIVADOS:
+        diferenca = _equal(referencia(df.copy()), derivado(estado))
+        print(f"  {'OK ' if diferenca is None else 'ERRO'} {nome_funcao}")
+        if diferenca:
+            print(f"       {diferenca}")
+            falhas += 1
+
+    # Estende um prefixo em blocos até o histórico completo
+    n = sorteador.randint(0, len(df) // 2)
+    parcial = agg.build_state(df.iloc[:n])
+    atualizacoes = 0
+    while n < len(df):
+        n = min(len(df), n + sorteador.choice([1, 1, 2, 5, 37, 100]))
+        parcial = agg.update_state(parcial, df.iloc[:n])
+        atualizacoes += 1
+        if n == len(df) or sorteador.random() < 0.05:
+            diferenca = _equal(agg.build_state(df.iloc[:n]), parcial, f"estado[:{n}]")
+            if diferenca:
+                print(f"  ERRO update_state: {diferenca}")
+                falhas += 1
+                break
+    else:
+        print(f"  OK  update_state ({atualizacoes} atualizações)")
+
+    # Custo de um concurso novo: atualização x recálculo completo (com as
+    # máscaras e a versão já calculadas, como no snapshot)
+    anterior = agg.build_state(df.iloc[:-1])
+    masks = dm.calculate_masks(df)
+    versao = ac.data_version(df['Concurso'].to_numpy(), masks)
+    inicio = time.perf_counter()
+    agg.update_state(anterior, df, masks, versao)
+    t_update = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    agg.build_state(df, masks, versao)
+    t_build = time.perf_counter() - inicio
+    print(f"  Um concurso novo: update_state {t_update * 1e6:.0f}µs, build_state {t_build * 1e3:.1f}ms")
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estado agregado incremental x recálculo completo")
+    parser.add_argument("--sinteticos", type=int, default=5, help="Quantidade de históricos sintéticos")
+    parser.add_argument("--tamanho", type=int, default=None,
+                        help="Tamanho dos históricos sintéticos (padrão: aleatório entre 30 e 4000)")
+    parser.add_argument("--seed", type=int, default=None, help="Semente para tamanhos, sementes e blocos")
+    parser.add_argument("--sem-base-real", action="store_true", help="Não usa data/D_lotfac.xlsx")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2 ** 32)
+    print(f"Semente: {seed}")
+    sorteador = random.Random(seed)
+
+    datasets = []
+    if not args.sem_base_real:
+        datasets.append(("data/D_lotfac.xlsx", at.adjust_table()))
+
+    for _ in range(args.sinteticos):
+        tamanho = args.tamanho or sorteador.randint(30, 4000)
+        semente = sorteador.randrange(2 ** 32)
+        datasets.append((f"sintético seed={semente}", sh.generate_history(tamanho, semente)))
+
+    falhas = sum(verify_dataset(nome, df, sorteador) for nome, df in datasets)
+    if falhas:
+        print(f"\n{falhas} divergência(s) encontrada(s).")
+        sys.exit(1)
+    print("\nO estado agregado é equivalente ao recálculo completo.")
+
+
+if __name__ == "__main__":
+    # Adicionar diretório atual ao path para imports funcionarem
+    sys.path.append(os.getcwd())
+    main()
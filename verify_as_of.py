@@ -0,0 +1,111 @@
+"""
+Verificação das consultas "após o concurso N" (as_of).
+
+Para concursos sorteados ao acaso na base real e em históricos sintéticos,
+compara snapshot.get_section_as_of com as implementações de referência
+executadas sobre o histórico recortado até o concurso (df.iloc[:k]):
+estatísticas globais, análises de ciclo, números no ciclo e sugestões.
+Mostra o tempo de cada consulta. Termina com código 1 se algo divergir.
+
+Uso:
+    python verify_as_of.py
+    python verify_as_of.py --consultas 10 --sinteticos 2 --seed 123
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import source.adjust_table as at
+import source.cycle_analysis as ca
+import source.cycle_calculator as cc
+import source.game_suggestions as gs
+import source.global_statistics as gstats
+import source.number_frequency as nf
+import source.pip_config as pip
+import source.snapshot as sn
+import source.synthetic_history as sh
+from verify_equivalence import _equal
+
+# Seção -> resultado de referência sobre o histórico recortado
+REFERENCIAS = {
+    'numbers': lambda df: tuple(sn._numbers_info(nf.get_numbers_status_in_cycle(df))),
+    'geographic': gstats.calculate_consolidated_geographic_analysis,
+    'heatmap': gstats.calculate_heat_map,
+    'pip-distribution': gstats.calculate_global_pip_distribution,
+    'cycle-patterns': lambda df: tuple(sn._cycle_patterns(ca.analyze_cycle_exit_patterns(df))),
+    'cycle-new-numbers': lambda df: tuple(sn._cycle_new_numbers(ca.analyze_new_numbers_distribution(df))),
+    'cycle-step-frequency': lambda df: tuple(
+        sn._cycle_step_frequency(ca.analyze_frequency_by_cycle_step(df, max_steps=4))
+    ),
+    'suggestions': lambda df: tuple(gs.generate_suggestions(df, num_games=None)),
+}
+
+
+def verify_dataset(nome, df_bruto, sorteador, consultas):
+    """Confere consultas as_of em concursos aleatórios; retorna a quantidade de divergências."""
+    print(f"\n=== {nome} ({len(df_bruto)} concursos) ===")
+    df = pip.calculate_pip_config(cc.calculate_cycle(df_bruto))
+    snapshot = sn.build_snapshot(df)
+
+    inicio = time.perf_counter()
+    sn.get_section('as-of-index', snapshot)
+    print(f"  Índice as_of: {time.perf_counter() - inicio:.3f}s")
+
+    falhas = 0
+    concursos = df['Concurso'].tolist()
+    for concurso in sorteador.sample(concursos, min(consultas, len(concursos))) + [concursos[-1]]:
+        k = concursos.index(concurso) + 1
+        prefixo = df.iloc[:k].copy()
+        posicao = sn.as_of(concurso, snapshot)
+        diferenca = _equal(
+            (posicao['total_concursos'], posicao['ciclo_atual']), (k, int(prefixo['ciclo'].max())), "as_of"
+        )
+        tempos = []
+        for secao, referencia in REFERENCIAS.items():
+            inicio = time.perf_counter()
+            obtido = sn.get_section_as_of(secao, concurso, snapshot)
+            tempos.append(time.perf_counter() - inicio)
+            diferenca = diferenca or _equal(referencia(prefixo), obtido, secao)
+
+        status = "OK " if diferenca is None else "ERRO"
+        print(f"  {status} concurso {concurso:>6} (k={k}): estatísticas {sum(tempos[:-1]) * 1e3:.1f}ms, "
+              f"sugestões {tempos[-1] * 1e3:.1f}ms")
+        if diferenca:
+            print(f"       {diferenca}")
+            falhas += 1
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas as_of x recálculo sobre o histórico recortado")
+    parser.add_argument("--consultas", type=int, default=3, help="Concursos consultados por histórico")
+    parser.add_argument("--sinteticos", type=int, default=2, help="Quantidade de históricos sintéticos")
+    parser.add_argument("--seed", type=int, default=None, help="Semente para históricos e concursos")
+    parser.add_argument("--sem-base-real", action="store_true", help="Não usa data/D_lotfac.xlsx")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2 ** 32)
+    print(f"Semente: {seed}")
+    sorteador = random.Random(seed)
+
+    datasets = []
+    if not args.sem_base_real:
+        datasets.append(("data/D_lotfac.xlsx", at.adjust_table()))
+    for _ in range(args.sinteticos):
+        semente = sorteador.randrange(2 ** 32)
+        datasets.append((f"sintético seed={semente}", sh.generate_history(sorteador.randint(30, 2000), semente)))
+
+    falhas = sum(verify_dataset(nome, df, sorteador, args.consultas) for nome, df in datasets)
+    if falhas:
+        print(f"\n{falhas} divergência(s) encontrada(s).")
+        sys.exit(1)
+    print("\nAs consultas as_of são equivalentes ao recálculo sobre o histórico recortado.")
+
+
+if __name__ == "__main__":
+    # Adicionar diretório atual ao path para imports funcionarem
+    sys.path.append(os.getcwd())
+    main()
@@ -0,0 +1,171 @@
+"""
+Verificação de equivalência entre as implementações de referência e as vetorizadas.
+
+Executa lado a lado cada função de referência (cycle_calculator, pip_config,
+global_statistics, cycle_analysis e as estratégias de game_suggestions) e a
+versão correspondente de source/fast_analysis.py, na base real
+(data/D_lotfac.xlsx) e em históricos sintéticos com sementes aleatórias.
+Os resultados precisam ser idênticos — inclusive tipos das colunas, índices,
+ordem das linhas e ordem das chaves — e cada linha do relatório mostra o
+ganho de tempo. Termina com código 1 se qualquer resultado divergir.
+
+Uso:
+    python verify_equivalence.py
+    python verify_equivalence.py --sinteticos 10 --tamanho 2000
+    python verify_equivalence.py --seed 123 --sem-base-real
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import source.adjust_table as at
+import source.cycle_analysis as ca
+import source.cycle_calculator as cc
+import source.fast_analysis as fa
+import source.game_suggestions as gs
+import source.global_statistics as gstats
+import source.pip_config as pip
+import source.synthetic_history as sh
+
+# (nome, referência, versão vetorizada, recebe o histórico sem colunas calculadas)
+FUNCOES = [
+    ("calculate_cycle", cc.calculate_cycle, fa.calculate_cycle, True),
+    ("calculate_pip_config", pip.calculate_pip_config, fa.calculate_pip_config, True),
+    ("calculate_heat_map", gstats.calculate_heat_map, fa.calculate_heat_map, False),
+    ("calculate_consolidated_geographic_analysis", gstats.calculate_consolidated_geographic_analysis,
+     fa.calculate_consolidated_geographic_analysis, False),
+    ("analyze_cycle_exit_patterns", ca.analyze_cycle_exit_patterns, fa.analyze_cycle_exit_patterns, False),
+    ("analyze_new_numbers_distribution", ca.analyze_new_numbers_distribution,
+     fa.analyze_new_numbers_distribution, False),
+    ("analyze_frequency_by_cycle_step", ca.analyze_frequency_by_cycle_step,
+     fa.analyze_frequency_by_cycle_step, False),
+    ("analyze_frequency_by_cycle_step(15)", lambda df: ca.analyze_frequency_by_cycle_step(df, max_steps=15),
+     lambda df: fa.analyze_frequency_by_cycle_step(df, max_steps=15), False),
+    ("get_most_frequent_numbers", gs.get_most_frequent_numbers, fa.get_most_frequent_numbers, False),
+    ("get_missing_in_cycle", gs.get_missing_in_cycle, fa.get_missing_in_cycle, False),
+    ("get_hot_numbers", gs.get_hot_numbers, fa.get_hot_numbers, False),
+] + [
+    (nome, getattr(gs, nome), getattr(fa, nome), False)
+    for nome in (
+        "generate_balanced_game", "generate_mixed_strategy", "generate_cycle_priority",
+        "generate_recent_hot", "generate_combined_analysis", "generate_heat_map_based",
+        "generate_geographic_balanced", "generate_quadrant_based", "generate_moldura_priority",
+        "generate_line_balanced", "generate_smart_cycle_strategy", "generate_cycle_next_step_strategy",
+    )
+]
+
+
+def _equal(a, b, caminho="resultado"):
+    """
+    Compara dois resultados de forma estrita.
+
+    Returns:
+        str ou None: Descrição da primeira diferença encontrada (None se iguais)
+    """
+    if type(a) is not type(b):
+        return f"{caminho}: tipos diferentes ({type(a).__name__} x {type(b).__name__})"
+    if isinstance(a, pd.DataFrame):
+        if list(a.columns) != list(b.columns):
+            return f"{caminho}: colunas {list(a.columns)} x {list(b.columns)}"
+        if not a.dtypes.equals(b.dtypes):
+            return f"{caminho}: dtypes {dict(a.dtypes)} x {dict(b.dtypes)}"
+        if not a.index.equals(b.index):
+            return f"{caminho}: índices diferentes"
+        if not a.equals(b):
+            return f"{caminho}: valores diferentes"
+        return None
+    if isinstance(a, dict):
+        if list(a.keys()) != list(b.keys()):
+            return f"{caminho}: chaves {list(a.keys())} x {list(b.keys())}"
+        for chave in a:
+            diferenca = _equal(a[chave], b[chave], f"{caminho}[{chave!r}]")
+            if diferenca:
+                return diferenca
+        return None
+    if isinstance(a, (list, tuple)):
+        if len(a) != len(b):
+            return f"{caminho}: tamanhos {len(a)} x {len(b)}"
+        for i, (x, y) in enumerate(zip(a, b)):
+            diferenca = _equal(x, y, f"{caminho}[{i}]")
+            if diferenca:
+                return diferenca
+        return None
+    if a != b:
+        return f"{caminho}: {a!r} x {b!r}"
+    return None
+
+
+def _timed(funcao, df):
+    random.seed(0)
+    np.random.seed(0)
+    inicio = time.perf_counter()
+    resultado = funcao(df.copy())
+    return resultado, time.perf_counter() - inicio
+
+
+def verify_dataset(nome, df_bruto):
+    """Compara todas as funções em um histórico; retorna a quantidade de divergências."""
+    print(f"\n=== {nome} ({len(df_bruto)} concursos) ===")
+    df = pip.calculate_pip_config(cc.calculate_cycle(df_bruto))
+    falhas = 0
+    total_ref = total_rapido = 0.0
+
+    for nome_funcao, referencia, rapida, bruto in FUNCOES:
+        entrada = df_bruto if bruto else df
+        esperado, t_ref = _timed(referencia, entrada)
+        obtido, t_rapido = _timed(rapida, entrada)
+        total_ref += t_ref
+        total_rapido += t_rapido
+
+        diferenca = _equal(esperado, obtido)
+        ganho = t_ref / t_rapido if t_rapido else float("inf")
+        status = "OK " if diferenca is None else "ERRO"
+        print(f"  {status} {nome_funcao:<45} {t_ref:9.4f}s -> {t_rapido:9.4f}s  x{ganho:8.1f}")
+        if diferenca:
+            print(f"       {diferenca}")
+            falhas += 1
+
+    ganho = total_ref / total_rapido if total_rapido else float("inf")
+    print(f"  Total: {total_ref:.3f}s -> {total_rapido:.3f}s  x{ganho:.1f}")
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equivalência entre referência e fast_analysis")
+    parser.add_argument("--sinteticos", type=int, default=5, help="Quantidade de históricos sintéticos")
+    parser.add_argument("--tamanho", type=int, default=None,
+                        help="Tamanho dos históricos sintéticos (padrão: aleatório entre 30 e 4000)")
+    parser.add_argument("--seed", type=int, default=None, help="Semente para escolher tamanhos e sementes")
+    parser.add_argument("--sem-base-real", action="store_true", help="Não usa data/D_lotfac.xlsx")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2 ** 32)
+    print(f"Semente: {seed}")
+    sorteador = random.Random(seed)
+
+    datasets = []
+    if not args.sem_base_real:
+        datasets.append(("data/D_lotfac.xlsx", at.adjust_table()))
+
+    for _ in range(args.sinteticos):
+        tamanho = args.tamanho or sorteador.randint(30, 4000)
+        semente = sorteador.randrange(2 ** 32)
+        datasets.append((f"sintético seed={semente}", sh.generate_history(tamanho, semente)))
+
+    falhas = sum(verify_dataset(nome, df) for nome, df in datasets)
+    if falhas:
+        print(f"\n{falhas} divergência(s) encontrada(s).")
+        sys.exit(1)
+    print("\nTodas as implementações são equivalentes.")
+
+
+if __name__ == "__main__":
+    # Adicionar diretório atual ao path para imports funcionarem
+    sys.path.append(os.getcwd())
+    main()
@@ -0,0 +1,143 @@
+
+"""
+Verificação da atualização em segundo plano (/api/refresh) com um servidor falso.
+
+Sobe um servidor HTTP local que faz o papel da Caixa, aponta a aplicação
+para ele (LOTOPY_DATA_URL) e para uma cópia temporária da base
+(LOTOPY_DATA_PATH), e confere o ciclo completo: job assíncrono, status,
+publicação do novo snapshot, download sem mudanças e falha no download.
+
+Uso:
+    python verify_refresh.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+BASE_ORIGINAL = os.path.join("data", "D_lotfac.xlsx")
+CONCURSOS_REMOVIDOS = 3
+
+# Conteúdo servido pelo servidor falso: (status HTTP, bytes, atraso em segundos)
+resposta_falsa = {'status': 200, 'corpo': b'', 'atraso': 0}
+
+
+class FakeCaixaHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(resposta_falsa['atraso'])
+        self.send_response(resposta_falsa['status'])
+        self.send_header("Content-Length", str(len(resposta_falsa['corpo'])))
+        self.end_headers()
+        self.wfile.write(resposta_falsa['corpo'])
+
+    def log_message(self, *args):
+        pass
+
+
+def wait_job(client, job_id, timeout=300):
+    inicio = time.time()
+    while time.time() - inicio < timeout:
+        job = client.get(f"/api/refresh/{job_id}").get_json()['job']
+        if job['status'] in ('concluido', 'erro'):
+            return job
+        time.sleep(0.2)
+    raise TimeoutError(f"Job {job_id} não terminou em {timeout}s")
+
+
+def check(condicao, mensagem):
+    print(("OK   " if condicao else "ERRO ") + mensagem)
+    return condicao
+
+
+def verify():
+    print("Iniciando verificação da atualização em segundo plano...")
+    tmp = tempfile.mkdtemp(prefix="lotopy-refresh-")
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), FakeCaixaHandler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    # Base local com os últimos concursos removidos; o servidor falso tem a base completa
+    caminho_dados = os.path.join(tmp, "D_lotfac.xlsx")
+    df = pd.read_excel(BASE_ORIGINAL)
+    df.iloc[:-CONCURSOS_REMOVIDOS].to_excel(caminho_dados, index=False)
+    with open(BASE_ORIGINAL, "rb") as f:
+        resposta_falsa['corpo'] = f.read()
+
+    os.environ["LOTOPY_DATA_PATH"] = caminho_dados
+    os.environ["LOTOPY_CACHE_DIR"] = os.path.join(tmp, "cache")
+    os.environ["LOTOPY_DATA_URL"] = f"http://127.0.0.1:{servidor.server_address[1]}/download"
+
+    import flask_app
+    import source.refresh_jobs as rj
+
+    client = flask_app.app.test_client()
+    ok = True
+    try:
+        total_inicial = client.get("/api/suggestions").get_json()['total_concursos']
+        ok &= check(total_inicial == len(df) - CONCURSOS_REMOVIDOS, f"base inicial com {total_inicial} concursos")
+
+        # 1. Atualização com concursos novos
+        inicio = time.time()
+        resposta = client.post("/api/refresh")
+        ok &= check(resposta.status_code == 202, f"POST /api/refresh retorna 202 em {time.time() - inicio:.3f}s")
+        job = wait_job(client, resposta.get_json()['job']['id'])
+        ok &= check(job['status'] == 'concluido' and job['atualizado'], f"job concluído: {job['status']}")
+        ok &= check(job['novos_concursos'] == CONCURSOS_REMOVIDOS, f"novos concursos: {job['novos_concursos']}")
+
+        concursos = client.get("/api/contests?limit=5").get_json()['concursos']
+        ok &= check(concursos[0]['concurso'] == int(df['Concurso'].iloc[-1]),
+                    f"snapshot publicado (último concurso {concursos[0]['concurso']})")
+
+        # 2. Atualização sem mudanças; outro processo (como outro worker) vê o job e o job ativo
+        resposta_falsa['atraso'] = 1.0
+        job_id = client.post("/api/refresh").get_json()['job']['id']
+        ok &= check(rj.start_refresh()['id'] == job_id, "pedido durante a atualização retorna o job ativo")
+        saida = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, source.refresh_jobs as rj; "
+             f"print(rj.get_job('{job_id}')['id'], rj.start_refresh()['id'])"],
+            capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=os.getcwd())
+        ).stdout.split()
+        ok &= check(saida == [job_id, job_id], "outro processo consulta o job e não inicia outra atualização")
+        resposta_falsa['atraso'] = 0
+        job = wait_job(client, job_id)
+        ok &= check(job['status'] == 'concluido' and job['atualizado'] is False, "download idêntico não republica")
+
+        # 3. Falha no servidor: base e snapshot continuam intactos
+        resposta_falsa['status'], resposta_falsa['corpo'] = 500, b"erro"
+        job = wait_job(client, client.post("/api/refresh").get_json()['job']['id'])
+        ok &= check(job['status'] == 'erro', f"falha no download vira erro: {job['erro']}")
+        resposta_falsa['status'], resposta_falsa['corpo'] = 200, b"<html>manutencao</html>"
+        job = wait_job(client, client.post("/api/refresh").get_json()['job']['id'])
+        ok &= check(job['status'] == 'erro', f"conteúdo inválido vira erro: {job['erro']}")
+        ok &= check(pd.read_excel(caminho_dados).shape[0] == len(df), "base local intacta após as falhas")
+        sobras = [a for a in os.listdir(tmp) if a.endswith(".tmp")]
+        ok &= check(not sobras, "nenhum arquivo temporário deixado para trás")
+
+        # 4. Status de job inexistente e horários do agendador
+        ok &= check(client.get("/api/refresh/inexistente").status_code == 404, "job inexistente retorna 404")
+        horarios = rj._parse_schedule("20:30,22:00")
+        sabado_noite = datetime(2026, 1, 3, 23, 0)  # sábado após o último horário
+        ok &= check(rj.next_run(sabado_noite, horarios) == datetime(2026, 1, 5, 20, 30),
+                    "agendador pula o domingo")
+        ok &= check(rj.next_run(datetime(2026, 1, 5, 20, 30), horarios) == datetime(2026, 1, 5, 22, 0),
+                    "agendador avança para o próximo horário do dia")
+    finally:
+        servidor.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("\nVerificação concluída." if ok else "\nVerificação concluída com ERROS.")
+    return ok
+
+
+if __name__ == "__main__":
+    # Adicionar diretório atual ao path para imports funcionarem
+    sys.path.append(os.getcwd())
+    sys.exit(0 if verify() else 1)